@@ -0,0 +1,397 @@
+"""
+Scaling benchmarks of the shipped controllers
+
+Run with `python -m benchmarks.bench_controllers` from the root of the
+repository. Every controller is loaded with synthetic, non-overlapping logs
+of the given sizes, and the operations are reported in operations per
+second together with the peak memory allocated while loading the log (not
+counting the generated entries themselves).
+
+`tracemalloc` only sees the allocations of Python objects, so the memory
+that SQLite allocates and the pages of a mapped segment are missing from
+the peak. The growth of the resident set size (RSS) over the whole run of
+a controller is therefore reported as well. RSS is read from /proc, so it
+is only reported on Linux. It also counts memory that the allocator has
+not returned to the system yet, so treat it as an upper bound.
+
+The wrappers are benchmarked over the controllers they are usually
+combined with: `sharded` partitions a log into monthly in-memory shards,
+`caching` caches a SQLite log, and `history` records the mutations of an
+in-memory log. The narrow and straddling windows are random, so for
+`caching` they measure the overhead of the cache; the repeated wide window
+measures its hits.
+
+The results can be saved as JSON and compared with an earlier run:
+
+    python -m benchmarks.bench_controllers --sizes 1000 100000 -o new.json
+    python -m benchmarks.bench_controllers --compare old.json new.json
+"""
+from logpy.__about__ import __version__
+from logpy.cache import CachingController
+from logpy.history import History
+from logpy.journal import JournalController
+from logpy.memory import MemoryController
+from logpy.model import Entry
+from logpy.segment import SegmentController, write_segment
+from logpy.shard import ShardedController
+from logpy.sqlite import SQLiteController
+
+from argparse import ArgumentParser
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from random import Random
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+
+import json
+import os
+import platform
+import sys
+import tracemalloc
+
+
+START = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+# every entry occupies the first half of its slot, so the logs have gaps
+SLOT = timedelta(minutes=2)
+DURATION = timedelta(minutes=1)
+
+CATEGORIES = ('Work', 'Personal', 'Sleep', 'Exercise', 'Commute')
+
+# the number of times each operation is repeated
+OPERATIONS = 200
+
+
+def synthetic_entries(n: int) -> List[Entry]:
+    """
+    Creates a sorted log of n non-overlapping entries
+
+    :param n: the number of entries
+    :type n: int
+    :return: the entries
+    :rtype: list[model.Entry]
+    """
+
+    return [
+        Entry._trusted(
+            START + i * SLOT,
+            START + i * SLOT + DURATION,
+            CATEGORIES[i % len(CATEGORIES)],
+            f'entry {i}' if i % 10 == 0 else ''
+        )
+        for i in range(n)
+    ]
+
+
+def _memory(entries, directory):
+    return MemoryController(*entries)
+
+
+def _journal(entries, directory):
+    controller = JournalController(Path(directory) / 'journal.jsonl')
+    controller.create_entries(entries)
+
+    return controller
+
+
+def _sqlite(entries, directory):
+    controller = SQLiteController(Path(directory) / 'log.sqlite')
+    controller.create_entries(entries)
+
+    return controller
+
+
+def _segment(entries, directory):
+    path = Path(directory) / 'log.segment'
+
+    write_segment(path, entries)
+
+    return SegmentController(path)
+
+
+def _sharded(entries, directory):
+    controller = ShardedController(lambda start: MemoryController())
+    controller.create_entries(entries)
+
+    return controller
+
+
+def _caching(entries, directory):
+    return CachingController(_sqlite(entries, directory))
+
+
+def _history(entries, directory):
+    controller = _memory(entries, directory)
+
+    # the history is kept alive by the subscription
+    History(controller)
+
+    return controller
+
+
+# the factories of the controllers and whether they are mutable
+CONTROLLERS: Dict[str, tuple] = {
+    'memory': (_memory, True),
+    'journal': (_journal, True),
+    'sqlite': (_sqlite, True),
+    'segment': (_segment, False),
+    'sharded': (_sharded, True),
+    'caching': (_caching, True),
+    'history': (_history, True),
+}
+
+
+def _rss() -> Optional[int]:
+    """
+    Returns the resident set size of the process in bytes, if it is known
+    """
+
+    try:
+        with open('/proc/self/statm') as file:
+            pages = int(file.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+    return pages * os.sysconf('SC_PAGE_SIZE')
+
+
+def _rate(operation: Callable[[int], None], number: int = OPERATIONS) -> float:
+    """
+    Runs the operation `number` times and returns the operations per second
+    """
+
+    start = perf_counter()
+
+    for i in range(number):
+        operation(i)
+
+    return number / (perf_counter() - start)
+
+
+def bench_controller(name: str, n: int, seed: int = 0) -> dict:
+    """
+    Benchmarks one controller with a log of n entries
+
+    :param name: the name of the controller in `CONTROLLERS`
+    :type name: str
+    :param n: the number of entries
+    :type n: int
+    :param seed: the seed of the random windows, defaults to 0
+    :type seed: int
+    :return: the operations per second, the peak memory and the growth of
+        the resident set size (None if it is unknown)
+    :rtype: dict
+    """
+
+    factory, mutable = CONTROLLERS[name]
+
+    random = Random(seed)
+    entries = synthetic_entries(n)
+    end = START + n * SLOT
+
+    with TemporaryDirectory() as directory:
+        rss = _rss()
+
+        tracemalloc.start()
+
+        controller = factory(entries, directory)
+
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        starts = [
+            START + random.randrange(n) * SLOT for _ in range(OPERATIONS)
+        ]
+
+        results = {
+            'get_intersection (narrow)': _rate(
+                lambda i: controller.get_intersection(
+                    starts[i], starts[i] + 5 * SLOT
+                )
+            ),
+            'get_intersection (straddling)': _rate(
+                lambda i: controller.get_intersection(
+                    starts[i] + DURATION / 2,
+                    starts[i] + 5 * SLOT + DURATION / 2
+                )
+            ),
+            'get_intersection (wide)': _rate(
+                lambda i: controller.get_intersection(START, end),
+                number=max(1, min(OPERATIONS, 10 ** 5 // n))
+            ),
+        }
+
+        if mutable:
+            # the new entries fill the gaps of the slots
+            gaps = [
+                Entry(
+                    START + i * SLOT + DURATION,
+                    START + (i + 1) * SLOT,
+                    'Gap'
+                )
+                for i in random.sample(range(n), min(n, OPERATIONS))
+            ]
+
+            results['create_entry'] = _rate(
+                lambda i: controller.create_entry(gaps[i]),
+                number=len(gaps)
+            )
+            results['delete_entry'] = _rate(
+                lambda i: controller.delete_entry(gaps[i]),
+                number=len(gaps)
+            )
+
+        if rss is not None:
+            rss = _rss() - rss
+
+        if hasattr(controller, 'close'):
+            controller.close()
+
+    return {
+        'operations': results,
+        'peak_bytes': peak,
+        'rss_bytes': rss,
+    }
+
+
+def bench_model() -> Dict[str, float]:
+    """
+    Benchmarks the construction and intersection of entries
+
+    :return: the operations per second
+    :rtype: dict[str, float]
+    """
+
+    entry = Entry(START, START + DURATION, 'Work')
+    window = (START + DURATION / 2, START + SLOT)
+
+    number = 100_000
+
+    return {
+        'Entry(...)': _rate(
+            lambda i: Entry(START, START + DURATION, 'Work'), number
+        ),
+        'Entry._trusted(...)': _rate(
+            lambda i: Entry._trusted(START, START + DURATION, 'Work'), number
+        ),
+        'Entry.intersection(...)': _rate(
+            lambda i: entry.intersection(*window), number
+        ),
+    }
+
+
+def run(sizes: List[int], controllers: List[str]) -> dict:
+    """
+    Runs the benchmarks and prints the results
+
+    :param sizes: the sizes of the logs
+    :type sizes: list[int]
+    :param controllers: the names of the controllers
+    :type controllers: list[str]
+    :return: the results
+    :rtype: dict
+    """
+
+    results = {
+        'version': __version__,
+        'python': platform.python_version(),
+        'model': bench_model(),
+        'controllers': {},
+    }
+
+    for operation, rate in results['model'].items():
+        print(f'{"model":<10}{"":>10}  {operation:<32}{rate:>14,.0f} ops/s')
+
+    for name in controllers:
+        results['controllers'][name] = {}
+
+        for n in sizes:
+            result = bench_controller(name, n)
+
+            results['controllers'][name][str(n)] = result
+
+            for operation, rate in result['operations'].items():
+                print(f'{name:<10}{n:>10}  {operation:<32}{rate:>14,.0f} ops/s')
+
+            print(
+                f'{name:<10}{n:>10}  {"peak memory":<32}'
+                f'{result["peak_bytes"] / 2 ** 20:>14,.1f} MiB'
+            )
+
+            if result['rss_bytes'] is not None:
+                print(
+                    f'{name:<10}{n:>10}  {"rss growth":<32}'
+                    f'{result["rss_bytes"] / 2 ** 20:>14,.1f} MiB'
+                )
+
+    return results
+
+
+def compare(old: dict, new: dict):
+    """
+    Prints the ratio of the new to the old operations per second
+
+    :param old: the results of the earlier run
+    :type old: dict
+    :param new: the results of the later run
+    :type new: dict
+    """
+
+    print(f'{old["version"]} -> {new["version"]}')
+
+    for operation, rate in new['model'].items():
+        if operation in old['model']:
+            ratio = rate / old['model'][operation]
+
+            print(f'{"model":<10}{"":>10}  {operation:<32}{ratio:>8.2f}x')
+
+    for name, sizes in new['controllers'].items():
+        for n, result in sizes.items():
+            previous = old['controllers'].get(name, {}).get(n)
+
+            if previous is None:
+                continue
+
+            for operation, rate in result['operations'].items():
+                if operation in previous['operations']:
+                    ratio = rate / previous['operations'][operation]
+
+                    print(f'{name:<10}{n:>10}  {operation:<32}{ratio:>8.2f}x')
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[10 ** 3, 10 ** 4, 10 ** 5],
+        help='the numbers of entries of the logs (up to 10^7)'
+    )
+    parser.add_argument(
+        '--controllers', nargs='+', default=list(CONTROLLERS),
+        choices=list(CONTROLLERS), help='the controllers to benchmark'
+    )
+    parser.add_argument(
+        '-o', '--output', type=Path, help='the JSON file to save results to'
+    )
+    parser.add_argument(
+        '--compare', type=Path, nargs=2, metavar=('OLD', 'NEW'),
+        help='compare two saved results instead of running the benchmarks'
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        old, new = (json.loads(path.read_text()) for path in args.compare)
+
+        compare(old, new)
+
+        return
+
+    results = run(args.sizes, args.controllers)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,82 @@
+"""
+Micro-benchmark of the construction paths of logpy.model.Entry
+
+Run with `python -m benchmarks.bench_entry` from the root of the repository.
+"""
+from logpy.model import Entry, from_epoch_us
+
+from datetime import datetime, timedelta, timezone
+from timeit import repeat
+
+import tracemalloc
+
+
+START = datetime(2022, 1, 1, tzinfo=timezone.utc)
+END = START + timedelta(hours=1)
+
+NUMBER = 100_000
+
+
+def _best(stmt) -> float:
+    """
+    Times the statement and returns the best time per call in nanoseconds
+    """
+
+    return min(repeat(stmt, number=NUMBER, repeat=5)) / NUMBER * 1e9
+
+
+def _bytes_per_entry(n: int = 100_000) -> float:
+    """
+    Measures the memory allocated per Entry (including its datetimes)
+    """
+
+    tracemalloc.start()
+
+    entries = [
+        Entry(
+            START + timedelta(minutes=i),
+            START + timedelta(minutes=i + 1),
+            'Work'
+        )
+        for i in range(n)
+    ]
+
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del entries
+
+    return size / n
+
+
+def main():
+    entry = Entry(START, END, 'Work')
+
+    results = {
+        'Entry(...)': _best(lambda: Entry(START, END, 'Work')),
+        'Entry._trusted(...)': _best(
+            lambda: Entry._trusted(START, END, 'Work')
+        ),
+        # both build their datetimes from integers, as loading from storage
+        # does; compare these two rather than against Entry(...) above
+        'Entry(from_epoch_us(...))': _best(
+            lambda: Entry(
+                from_epoch_us(0), from_epoch_us(3_600_000_000), 'Work'
+            )
+        ),
+        'Entry.from_epoch_us(...)': _best(
+            lambda: Entry.from_epoch_us(0, 3_600_000_000, 'Work')
+        ),
+        'Entry.intersection(...)': _best(
+            lambda: entry.intersection(START + timedelta(minutes=30), END)
+        ),
+    }
+
+    for name, ns in results.items():
+        print(f'{name:<28}{ns:>10.0f} ns')
+
+    print(f'{"bytes per entry":<28}{_bytes_per_entry():>10.0f} B')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+from .cli import main
+
+import sys
+
+
+sys.exit(main())
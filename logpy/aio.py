@@ -0,0 +1,452 @@
+from .controller import Controller, MutatorController
+from .model import Entry
+
+from abc import ABC, abstractmethod
+from asyncio import get_running_loop
+from concurrent.futures import Executor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import (
+    AsyncIterator, FrozenSet, Iterable, Optional, Tuple, Union
+)
+
+
+class AsyncController(ABC):
+    """
+    An abstract base class for asynchronous (read-only) controllers
+
+    This is the asyncio counterpart of `controller.Controller`, for backends
+    whose lookups are I/O bound.
+    """
+    @abstractmethod
+    async def _find_first_after(self, dt: datetime) -> Optional[Entry]:
+        """
+        Finds the first entry that starts after or at the specfied time
+
+        :param dt: The time to search for
+        :type dt: datetime.datetime
+        :raise NotImplementedError: if the method is not implemented by a
+            subclass
+        :return: the first entry that starts after or at the specified time
+        :rtype: model.Entry
+        """
+
+    @abstractmethod
+    async def _find_last_before(self, dt: datetime) -> Optional[Entry]:
+        """
+        Finds that last entry that starts before or at the specified time
+
+        :param dt: The time to search for
+        :type dt: datetime.datetime
+        :raise NotImplementedError: if the method is not implemented by a
+            subclass
+        :return: the last entry that starts before or at the specified time
+        :rtype: model.Entry
+        """
+
+    async def _iter_range(
+        self,
+        start_time: datetime,
+        end_time: datetime
+    ) -> AsyncIterator[Entry]:
+        """
+        Iterates over the entries that intersect with the interval, in order
+        of their start times
+
+        See `controller.Controller._iter_range`; the default implementation
+        walks the log with `_find_last_before` and `_find_first_after`.
+
+        :param start_time: The start time of the interval (must be utc)
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval (must be utc)
+        :type end_time: datetime.datetime
+        :return: An asynchronous iterator over the intersecting entries
+        :rtype: AsyncIterator[model.Entry]
+        """
+
+        # start searching backwards
+        entries = []
+
+        current_dt = start_time - timedelta.resolution
+
+        current_entry = await self._find_last_before(current_dt)
+
+        while (
+            current_entry and
+            current_entry.end_time >= start_time
+        ):
+            # check that an intersection exists
+            if current_entry.end_time > start_time:
+                entries.append(current_entry)
+
+            current_dt = current_entry.start_time - timedelta.resolution
+
+            current_entry = await self._find_last_before(current_dt)
+
+        for entry in reversed(entries):
+            yield entry
+
+        # start searching forwards
+        current_dt = start_time
+
+        current_entry = await self._find_first_after(current_dt)
+
+        while (
+            current_entry and
+            current_entry.start_time < end_time
+        ):
+            yield current_entry
+
+            current_dt = current_entry.end_time
+
+            current_entry = await self._find_first_after(current_dt)
+
+    async def _iter_categories(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        categories: FrozenSet[str]
+    ) -> AsyncIterator[Entry]:
+        """
+        Iterates over the entries of the categories that intersect with the
+        interval, in order of their start times
+
+        See `controller.Controller._iter_categories`; the default
+        implementation filters `_iter_range`.
+
+        :param start_time: The start time of the interval (must be utc)
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval (must be utc)
+        :type end_time: datetime.datetime
+        :param categories: the categories to include
+        :type categories: frozenset[str]
+        :return: An asynchronous iterator over the intersecting entries
+        :rtype: AsyncIterator[model.Entry]
+        """
+
+        async for entry in self._iter_range(start_time, end_time):
+            if entry.category in categories:
+                yield entry
+
+    async def get_intersection(
+        self,
+        start_time,
+        end_time,
+        categories: Optional[Iterable[str]] = None
+    ) -> Tuple[Entry]:
+        """
+        Creates a sorted tuple of entries that intersect with the interval
+
+        :param start_time: The start time of the interval (must be utc)
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval (must be utc)
+        :type end_time: datetime.datetime
+        :param categories: only include the entries of these categories,
+            defaults to None (every category)
+        :type categories: Iterable[str] or None
+        :return: A sorted tuple of entry intersections with the interval
+        :rtype: tuple[model.Entry]
+        """
+
+        # check that start_time is utc
+        if start_time.tzinfo != timezone.utc:
+            raise ValueError('start_time.tzinfo must be utc')
+
+        # check that end_time is utc
+        if end_time.tzinfo != timezone.utc:
+            raise ValueError('end_time.tzinfo must be utc')
+
+        if categories is None:
+            selected = self._iter_range(start_time, end_time)
+        else:
+            selected = self._iter_categories(
+                start_time,
+                end_time,
+                frozenset(categories)
+            )
+
+        entries = []
+
+        async for current_entry in selected:
+            entry = current_entry.intersection(start_time, end_time)
+
+            # check that an intersection exists
+            if entry:
+                entries.append(entry)
+
+        return tuple(sorted(entries))
+
+
+class AsyncMutatorController(AsyncController):
+    """
+    An abstract base class for asynchronous (read-write) controllers
+
+    This is the asyncio counterpart of `controller.MutatorController`.
+    """
+    async def _has_conflict(
+        self,
+        start_time: datetime,
+        end_time: datetime
+    ) -> bool:
+        """
+        Checks if any entry intersects with the interval
+
+        See `controller.MutatorController._has_conflict`.
+
+        :param start_time: The start time of the interval (must be utc)
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval (must be utc)
+        :type end_time: datetime.datetime
+        :return: True if an entry intersects with the interval
+        :rtype: bool
+        """
+
+        entry = await self._find_last_before(end_time - timedelta.resolution)
+
+        return entry is not None and entry.end_time > start_time
+
+    @abstractmethod
+    async def _publish_entry(self, entry: Entry):
+        """
+            Publishes the entry and mutation
+
+            :param entry: the entry to publish
+            :type entry: model.Entry
+            :raise NotImplementedError: if the method is not implemented by a
+                subclass
+        """
+
+    @abstractmethod
+    async def _retract_entry(self, entry: Entry):
+        """
+            Deletes the entry and publishes the respective mutation
+
+            :param entry: the entry to be deleted
+            :type entry: model.Entry
+            :raise NotImplementedError: if the method is not implemented by a
+                subclass
+        """
+
+    async def create_entry(self, entry: Entry):
+        """
+            Tries to create an Entry
+
+            :param entry: The Entry to create
+            :type entry: model.Entry
+            :raise KeyError: If there is an entry that conflicts with the entry
+                to be created
+        """
+
+        if await self._has_conflict(entry.start_time, entry.end_time):
+            # only collect the conflicts for the error message
+            conflicts = await self.get_intersection(
+                entry.start_time,
+                entry.end_time
+            )
+
+            raise KeyError(f'{entry} conflicts with {conflicts}!')
+
+        await self._publish_entry(entry)
+
+    async def delete_entry(self, entry: Entry):
+        """
+        Tries to delete the provided entry
+
+        :param entry: The Entry to be deleted
+        :type entry: model.Entry
+        :raise KeyError: If the entry that is to be deleted does not exist
+        """
+
+        if entry != await self._find_first_after(entry.start_time):
+            raise KeyError(f"{entry} does not exist!")
+
+        await self._retract_entry(entry)
+
+
+class ThreadedController(AsyncController):
+    """
+    Runs a synchronous controller in an executor
+
+    Every public operation runs as a single call in the executor, so e.g.
+    `get_intersection` costs one hop to a thread regardless of how many
+    lookups the wrapped controller makes. The wrapped controller must be
+    safe to call from the threads of the executor; pass an executor with a
+    single worker otherwise.
+
+    :param controller: the controller to wrap
+    :type controller: controller.Controller
+    :param executor: the executor to run the calls in, defaults to the
+        default executor of the event loop
+    :type executor: concurrent.futures.Executor or None
+    """
+
+    def __init__(
+        self,
+        controller: Controller,
+        executor: Optional[Executor] = None
+    ):
+        self.controller = controller
+        self.executor = executor
+
+    async def _run(self, function, *args):
+        """
+        Runs the function in the executor
+
+        :param function: the function to run
+        :type function: Callable
+        :return: the result of the function
+        """
+        return await get_running_loop().run_in_executor(
+            self.executor,
+            partial(function, *args)
+        )
+
+    async def _find_first_after(self, dt: datetime) -> Optional[Entry]:
+        return await self._run(self.controller._find_first_after, dt)
+
+    async def _find_last_before(self, dt: datetime) -> Optional[Entry]:
+        return await self._run(self.controller._find_last_before, dt)
+
+    async def _iter_range(
+        self,
+        start_time: datetime,
+        end_time: datetime
+    ) -> AsyncIterator[Entry]:
+        entries = await self._run(
+            lambda: tuple(self.controller._iter_range(start_time, end_time))
+        )
+
+        for entry in entries:
+            yield entry
+
+    async def _iter_categories(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        categories: FrozenSet[str]
+    ) -> AsyncIterator[Entry]:
+        entries = await self._run(
+            lambda: tuple(self.controller._iter_categories(
+                start_time,
+                end_time,
+                categories
+            ))
+        )
+
+        for entry in entries:
+            yield entry
+
+    async def get_intersection(
+        self,
+        start_time,
+        end_time,
+        categories: Optional[Iterable[str]] = None
+    ) -> Tuple[Entry]:
+        return await self._run(
+            self.controller.get_intersection,
+            start_time,
+            end_time,
+            categories
+        )
+
+
+class ThreadedMutatorController(ThreadedController, AsyncMutatorController):
+    """
+    Runs a synchronous mutator controller in an executor
+
+    See `ThreadedController`. The conflict check and the publish of
+    `create_entry` run as a single call, as do the existence check and the
+    retraction of `delete_entry`.
+
+    :param controller: the controller to wrap
+    :type controller: controller.MutatorController
+    :param executor: the executor to run the calls in, defaults to the
+        default executor of the event loop
+    :type executor: concurrent.futures.Executor or None
+    """
+
+    async def _publish_entry(self, entry: Entry):
+        await self._run(self.controller._publish_entry, entry)
+
+    async def _retract_entry(self, entry: Entry):
+        await self._run(self.controller._retract_entry, entry)
+
+    async def create_entry(self, entry: Entry):
+        await self._run(self.controller.create_entry, entry)
+
+    async def create_entries(self, entries: Iterable[Entry]):
+        """
+            Tries to create all of the provided entries at once
+
+            See `controller.MutatorController.create_entries`.
+
+            :param entries: The entries to create
+            :type entries: Iterable[model.Entry]
+            :raise KeyError: If any entry conflicts with another entry
+        """
+        await self._run(self.controller.create_entries, tuple(entries))
+
+    async def delete_entry(self, entry: Entry):
+        await self._run(self.controller.delete_entry, entry)
+
+    async def delete_entries(self, entries: Iterable[Entry]):
+        """
+        Tries to delete all of the provided entries at once
+
+        See `controller.MutatorController.delete_entries`.
+
+        :param entries: The entries to delete
+        :type entries: Iterable[model.Entry]
+        :raise KeyError: If any entry that is to be deleted does not exist
+        """
+        await self._run(self.controller.delete_entries, tuple(entries))
+
+    async def delete_range(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        categories: Optional[Iterable[str]] = None
+    ) -> Tuple[Entry]:
+        """
+        Deletes the entries that lie within the interval
+
+        See `controller.MutatorController.delete_range`.
+
+        :param start_time: The start time of the interval (must be utc)
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval (must be utc)
+        :type end_time: datetime.datetime
+        :param categories: only delete the entries of these categories,
+            defaults to None (every category)
+        :type categories: Iterable[str] or None
+        :return: The deleted entries, in order of their start times
+        :rtype: tuple[model.Entry]
+        """
+        return await self._run(
+            self.controller.delete_range,
+            start_time,
+            end_time,
+            categories
+        )
+
+
+def to_async(
+    controller: Controller,
+    executor: Optional[Executor] = None
+) -> Union[ThreadedController, ThreadedMutatorController]:
+    """
+    Wraps a synchronous controller in the matching asynchronous adapter
+
+    :param controller: the controller to wrap
+    :type controller: controller.Controller
+    :param executor: the executor to run the calls in, defaults to the
+        default executor of the event loop
+    :type executor: concurrent.futures.Executor or None
+    :return: the adapter
+    :rtype: ThreadedController or ThreadedMutatorController
+    """
+
+    if isinstance(controller, MutatorController):
+        return ThreadedMutatorController(controller, executor)
+
+    return ThreadedController(controller, executor)
@@ -0,0 +1,245 @@
+from .controller import Controller, MutatorController
+from .model import Entry, EntryTable, Mutation
+
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import (
+    Callable, Dict, FrozenSet, Iterable, Iterator, Optional, Tuple, Union
+)
+
+
+class CachingController(Controller):
+    """
+    Memoizes the results of `get_intersection` of another controller
+
+    The results are kept in a bounded LRU cache keyed by the interval (and
+    the categories), so
+    repeated queries of the same windows are answered without touching the
+    wrapped controller. All other calls are delegated. Wrapping a
+    `MutatorController` creates a `CachingMutatorController`, so the cache is
+    always invalidated by the mutations of the wrapped controller.
+
+    :param controller: the controller to wrap
+    :type controller: controller.Controller
+    :param maxsize: the maximum number of cached windows, defaults to 128
+    :type maxsize: int
+    """
+
+    def __new__(cls, controller: Controller, maxsize: int = 128):
+        if cls is CachingController and isinstance(
+            controller,
+            MutatorController
+        ):
+            cls = CachingMutatorController
+
+        return super().__new__(cls)
+
+    def __init__(self, controller: Controller, maxsize: int = 128):
+        self.controller = controller
+        self.maxsize = maxsize
+
+        self._cache: OrderedDict[
+            Tuple[datetime, datetime, Optional[FrozenSet[str]]], Tuple[Entry]
+        ] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        """
+        Empties the cache
+        """
+        self._cache.clear()
+
+    def _find_first_after(self, dt: datetime) -> Optional[Entry]:
+        return self.controller._find_first_after(dt)
+
+    def _find_last_before(self, dt: datetime) -> Optional[Entry]:
+        return self.controller._find_last_before(dt)
+
+    def _iter_range(
+        self,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Iterator[Entry]:
+        return self.controller._iter_range(start_time, end_time)
+
+    def _iter_categories(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        categories: FrozenSet[str]
+    ) -> Iterator[Entry]:
+        return self.controller._iter_categories(
+            start_time,
+            end_time,
+            categories
+        )
+
+    def _search(
+        self,
+        query: str,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Iterator[Entry]:
+        return self.controller._search(query, start_time, end_time)
+
+    def get_intersection(
+        self,
+        start_time,
+        end_time,
+        categories: Optional[Iterable[str]] = None
+    ) -> Tuple[Entry]:
+        if categories is not None:
+            categories = frozenset(categories)
+
+        key = (start_time, end_time, categories)
+
+        entries = self._cache.get(key)
+
+        if entries is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+
+            return entries
+
+        self.misses += 1
+
+        entries = self.controller.get_intersection(
+            start_time,
+            end_time,
+            categories
+        )
+
+        self._cache[key] = entries
+
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+        return entries
+
+    def get_intersection_table(
+        self,
+        start_time,
+        end_time,
+        categories: Optional[Iterable[str]] = None
+    ) -> EntryTable:
+        return self.controller.get_intersection_table(
+            start_time,
+            end_time,
+            categories
+        )
+
+    def total_duration(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        by: Optional[str] = 'category',
+        categories: Optional[Iterable[str]] = None
+    ) -> Union[Dict[str, timedelta], timedelta]:
+        return self.controller.total_duration(
+            start_time,
+            end_time,
+            by,
+            categories
+        )
+
+    def _invalidate(self, entries: Tuple[Entry]):
+        """
+        Removes the cached windows that intersect with any of the entries
+
+        :param entries: the sorted, non-overlapping entries that changed
+        :type entries: tuple[model.Entry]
+        """
+        # the end times are sorted as well, since the entries do not overlap
+        ends = [entry.end_time for entry in entries]
+
+        for key in list(self._cache):
+            start_time, end_time, _ = key
+
+            # the first entry that ends after the window starts
+            i = bisect_right(ends, start_time)
+
+            if i < len(entries) and entries[i].start_time < end_time:
+                del self._cache[key]
+
+
+class CachingMutatorController(CachingController, MutatorController):
+    """
+    Memoizes the results of `get_intersection` of a mutator controller
+
+    See `CachingController`. The cache subscribes to the mutations of the
+    wrapped controller and only invalidates the cached windows that 
+    intersect with the created or deleted entries, so the cached results 
+    stay exact even for mutations made on the wrapped controller directly.
+    The public mutations are delegated as a whole, so their conflict and 
+    existence checks do not evict the cached windows.
+
+    :param controller: the controller to wrap
+    :type controller: controller.MutatorController
+    :param maxsize: the maximum number of cached windows, defaults to 128
+    :type maxsize: int
+    """
+
+    def __init__(self, controller: MutatorController, maxsize: int = 128):
+        super().__init__(controller, maxsize)
+
+        controller.subscribe(self._on_mutations)
+
+    def _on_mutations(self, mutations: Tuple[Mutation]):
+        """
+        Invalidates the windows that intersect with the mutated entries
+
+        :param mutations: the mutations of the wrapped controller
+        :type mutations: tuple[model.Mutation]
+        """
+        self._invalidate(tuple(sorted(
+            mutation.entry for mutation in mutations
+        )))
+
+    def subscribe(self, listener: Callable[[Tuple[Mutation]], None]):
+        self.controller.subscribe(listener)
+
+    def unsubscribe(self, listener: Callable[[Tuple[Mutation]], None]):
+        self.controller.unsubscribe(listener)
+
+    def _publish_entry(self, entry: Entry):
+        self.controller._publish_entry(entry)
+
+        self._invalidate((entry,))
+
+    def _publish_entries(self, entries: Tuple[Entry]):
+        self.controller._publish_entries(entries)
+
+        self._invalidate(entries)
+
+    def _retract_entry(self, entry: Entry):
+        self.controller._retract_entry(entry)
+
+        self._invalidate((entry,))
+
+    def _retract_entries(self, entries: Tuple[Entry]):
+        self.controller._retract_entries(entries)
+
+        self._invalidate(entries)
+
+    def create_entry(self, entry: Entry):
+        self.controller.create_entry(entry)
+
+    def create_entries(self, entries: Iterable[Entry]):
+        self.controller.create_entries(entries)
+
+    def delete_entry(self, entry: Entry):
+        self.controller.delete_entry(entry)
+
+    def delete_entries(self, entries: Iterable[Entry]):
+        self.controller.delete_entries(entries)
+
+    def delete_range(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        categories: Optional[Iterable[str]] = None
+    ) -> Tuple[Entry]:
+        return self.controller.delete_range(start_time, end_time, categories)
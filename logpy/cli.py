@@ -0,0 +1,319 @@
+"""
+The `logpy` command
+
+Only the standard library modules needed to parse the arguments are
+imported at startup; the controllers are imported when a command runs
+locally. If a daemon (see `logpy.daemon`) listens on the socket given by
+`--socket` or the `LOGPY_SOCKET` environment variable and serves the same
+log, the commands are sent to it instead and the log is not loaded at all.
+"""
+from argparse import ArgumentParser
+from typing import List, Optional
+
+import os
+import sys
+
+
+# the default path of the log
+LOG = os.path.join('~', '.logpy', 'journal.jsonl')
+
+
+def open_controller(path: str):
+    """
+    Opens the log, an SQLite database if the path ends with '.sqlite' or
+    '.db' and a journal otherwise
+
+    :param path: the path of the log
+    :type path: str
+    :return: the controller of the log
+    :rtype: controller.MutatorController
+    """
+
+    path = os.path.expanduser(path)
+
+    if path.endswith(('.sqlite', '.db')):
+        from .sqlite import SQLiteController
+
+        return SQLiteController(path)
+
+    from .journal import JournalController
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    return JournalController(path)
+
+
+def execute(controller, request: dict):
+    """
+    Runs a command against a controller
+
+    The requests and results only hold JSON types, so they can be passed
+    to and from a daemon as they are.
+
+    :param controller: the controller to run the command against
+    :type controller: controller.MutatorController
+    :param request: the command and its arguments, as parsed by `parser`
+    :type request: dict
+    :raise KeyError: if an added entry conflicts with another entry or a
+        deleted entry does not exist
+    :raise OSError: if an imported or exported file cannot be opened
+    :raise ValueError: if the command or its arguments are invalid
+    :return: the result of the command
+    :rtype: list, dict, int or None
+    """
+
+    from datetime import timedelta
+
+    from .model import Entry, parse_time
+
+    command = request['command']
+
+    # the liveness probe of the daemon
+    if command == 'ping':
+        return None
+
+    if command in {'add', 'delete'}:
+        entry = Entry(
+            parse_time(request['start']),
+            parse_time(request['end']),
+            request['category'],
+            request.get('description') or ''
+        )
+
+        if command == 'add':
+            controller.create_entry(entry)
+        else:
+            controller.delete_entry(entry)
+
+        return None
+
+    if command == 'import':
+        from .formats import import_entries
+
+        return import_entries(controller, request['path'])
+
+    if command == 'export':
+        from .formats import export_entries
+
+        return export_entries(
+            controller,
+            request['path'],
+            parse_time(request['start']) if request.get('start') else None,
+            parse_time(request['end']) if request.get('end') else None
+        )
+
+    start_time = parse_time(request['start'])
+    end_time = parse_time(request['end'])
+
+    if command == 'query':
+        return [
+            [
+                entry.start_time.isoformat(),
+                entry.end_time.isoformat(),
+                entry.category,
+                entry.description
+            ]
+            for entry in controller.iter_intersection(start_time, end_time)
+        ]
+
+    if command == 'summary':
+        totals = controller.total_duration(start_time, end_time)
+
+        return {
+            category: total / timedelta(seconds=1)
+            for category, total in sorted(totals.items())
+        }
+
+    raise ValueError(f'unknown command {command!r}')
+
+
+def respond(controller, request: dict) -> dict:
+    """
+    Runs a command against a controller, catching the errors
+
+    :param controller: the controller to run the command against
+    :type controller: controller.MutatorController
+    :param request: the command and its arguments, see `execute`
+    :type request: dict
+    :return: the response, with either a 'result' or an 'error'
+    :rtype: dict
+    """
+
+    try:
+        return {'result': execute(controller, request)}
+    except KeyError as error:
+        return {'error': error.args[0] if error.args else 'KeyError'}
+    except (OSError, TypeError, ValueError) as error:
+        return {'error': str(error)}
+
+
+def parser() -> ArgumentParser:
+    """
+    Creates the parser of the arguments
+
+    :return: the parser
+    :rtype: argparse.ArgumentParser
+    """
+
+    parser = ArgumentParser(prog='logpy', description='Log your life.')
+    parser.add_argument(
+        '--log', default=os.environ.get('LOGPY_LOG', LOG),
+        help='the path of the log, an SQLite database if it ends with '
+        '.sqlite or .db (default: $LOGPY_LOG or %(default)s)'
+    )
+    parser.add_argument(
+        '--socket', default=os.environ.get('LOGPY_SOCKET'),
+        help='the socket of a running daemon (default: $LOGPY_SOCKET)'
+    )
+    parser.add_argument(
+        '--timeout', type=float,
+        help='the seconds to wait for the daemon to respond (default: 60)'
+    )
+
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    for command, help in (
+        ('add', 'create an entry'),
+        ('delete', 'delete an entry'),
+    ):
+        subparser = commands.add_parser(command, help=help)
+        subparser.add_argument('start', help='the ISO 8601 start time')
+        subparser.add_argument('end', help='the ISO 8601 end time')
+        subparser.add_argument('category')
+        subparser.add_argument('description', nargs='?', default='')
+
+    for command, help in (
+        ('query', 'print the entries within an interval'),
+        ('summary', 'print the time per category within an interval'),
+    ):
+        subparser = commands.add_parser(command, help=help)
+        subparser.add_argument('start', help='the ISO 8601 start time')
+        subparser.add_argument('end', help='the ISO 8601 end time')
+
+    subparser = commands.add_parser(
+        'import',
+        help='create the entries of a .csv, .jsonl or .ics file'
+    )
+    subparser.add_argument('path')
+
+    subparser = commands.add_parser(
+        'export',
+        help='write the entries to a .csv, .jsonl or .ics file'
+    )
+    subparser.add_argument('path')
+    subparser.add_argument(
+        '--start', help='the ISO 8601 start time (default: the first entry)'
+    )
+    subparser.add_argument(
+        '--end', help='the ISO 8601 end time (default: the last entry)'
+    )
+
+    commands.add_parser(
+        'daemon',
+        help='keep the log loaded and serve the commands on --socket'
+    )
+
+    return parser
+
+
+def _print(command: str, result):
+    """
+    Prints the result of a command
+    """
+
+    if command == 'query':
+        for row in result:
+            print('\t'.join(row))
+    elif command == 'summary':
+        for category, seconds in result.items():
+            minutes, seconds = divmod(round(seconds), 60)
+            hours, minutes = divmod(minutes, 60)
+
+            print(f'{category}\t{hours}:{minutes:02}:{seconds:02}')
+    elif command in {'import', 'export'}:
+        print(result)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the `logpy` command
+
+    :param argv: the arguments, defaults to `sys.argv[1:]`
+    :type argv: list[str] or None
+    :return: the exit status
+    :rtype: int
+    """
+
+    args = parser().parse_args(argv)
+
+    # the daemon checks that it serves the same log
+    log = os.path.realpath(os.path.expanduser(args.log))
+
+    request = {
+        key: value
+        for key, value in vars(args).items()
+        if key not in {'log', 'socket', 'timeout'}
+    }
+    request['log'] = log
+
+    # the daemon may run in another working directory
+    if args.command in {'import', 'export'}:
+        request['path'] = os.path.abspath(args.path)
+
+    if args.command == 'daemon':
+        if not args.socket:
+            print('logpy: the daemon needs --socket', file=sys.stderr)
+
+            return 2
+
+        from .daemon import serve
+
+        serve(open_controller(args.log), args.socket, log)
+
+        return 0
+
+    response = None
+
+    if args.socket:
+        from .daemon import TIMEOUT, send
+
+        try:
+            response = send(
+                args.socket,
+                request,
+                TIMEOUT if args.timeout is None else args.timeout
+            )
+        except TimeoutError:
+            # the command may still run, so it is not run locally as well
+            print(
+                f'logpy: the daemon on {args.socket} did not respond',
+                file=sys.stderr
+            )
+
+            return 1
+
+    # fall back to loading the log if no daemon is running, or if it serves
+    # another log
+    if response is None or 'log' in response:
+        try:
+            # the log may be held by a daemon that is not on the socket
+            controller = open_controller(args.log)
+        except (OSError, ValueError) as error:
+            print(f'logpy: {error}', file=sys.stderr)
+
+            return 1
+
+        try:
+            response = respond(controller, request)
+        finally:
+            if hasattr(controller, 'close'):
+                controller.close()
+
+    if 'error' in response:
+        print(f'logpy: {response["error"]}', file=sys.stderr)
+
+        return 1
+
+    _print(args.command, response['result'])
+
+    return 0
@@ -1,8 +1,21 @@
-from .model import Entry
+from .model import Entry, EntryTable, Mutation
+from .search import entry_tokens, tokenize
 
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta, timezone
-from typing import Tuple
+from typing import (
+    TYPE_CHECKING, Callable, Dict, FrozenSet, Iterable, Iterator, Optional,
+    Tuple, Union
+)
+
+if TYPE_CHECKING:
+    from .histogram import Histogram
+
+
+# the bounds of the unbounded intervals, the default `_iter_range` steps 
+# back a microsecond from the start time
+MIN_TIME = datetime.min.replace(tzinfo=timezone.utc) + timedelta.resolution
+MAX_TIME = datetime.max.replace(tzinfo=timezone.utc)
 
 
 class Controller(ABC):
@@ -35,29 +48,49 @@ class Controller(ABC):
         :rtype: model.Entry
         """
 
-    def get_intersection(self, start_time, end_time) -> Tuple[Entry]:
+    def _iter_range(
+        self,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Iterator[Entry]:
         """
-        Creates a sorted tuple of entries that intersect with the interval
+        Iterates over the entries that intersect with the interval, in order
+        of their start times
+
+        The entries are not clipped to the interval. Backends that can scan
+        a range in one pass (e.g. a single query) should override this hook;
+        the default implementation walks the log with `_find_last_before` 
+        and `_find_first_after`, which costs one call per entry.
 
         :param start_time: The start time of the interval (must be utc)
         :type start_time: datetime.datetime
         :param end_time: The end time of the interval (must be utc)
         :type end_time: datetime.datetime
-        :return: A sorted tuple of entry intersections with the interval
-        :rtype: tuple[model.Entry]
+        :return: An iterator over the intersecting entries
+        :rtype: Iterator[model.Entry]
         """
-        
-        # check that start_time is utc
-        if start_time.tzinfo != timezone.utc:
-            raise ValueError('start_time.tzinfo must be utc')
-
-        # check that end_time is utc
-        if end_time.tzinfo != timezone.utc:
-            raise ValueError('end_time.tzinfo must be utcc')
 
-        # the list of entries to be returned
+        # start searching backwards
         entries = []
-        
+
+        current_dt = start_time - timedelta.resolution
+
+        current_entry = self._find_last_before(current_dt)
+
+        while (
+            current_entry and
+            current_entry.end_time >= start_time
+        ):
+            # check that an intersection exists
+            if current_entry.end_time > start_time:
+                entries.append(current_entry)
+
+            current_dt = current_entry.start_time - timedelta.resolution
+
+            current_entry = self._find_last_before(current_dt)
+
+        yield from reversed(entries)
+
         # start searching forwards
 
         # the pointer to the current datetime
@@ -70,42 +103,447 @@ class Controller(ABC):
             current_entry and 
             current_entry.start_time < end_time
         ):
-            entry = current_entry.intersection(start_time, end_time)
-
-            # check that an intersection exists
-            if entry:
-                entries.append(entry)
+            yield current_entry
 
             current_dt = current_entry.end_time
 
             current_entry = self._find_first_after(current_dt)
 
-        # start searching backwards
-        current_dt = start_time - timedelta.resolution
+    def _iter_categories(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        categories: FrozenSet[str]
+    ) -> Iterator[Entry]:
+        """
+        Iterates over the entries of the categories that intersect with the
+        interval, in order of their start times
 
-        current_entry = self._find_last_before(current_dt)
+        Backends that index the entries by category should override this
+        hook, so the entries of the other categories are never scanned; the
+        default implementation filters `_iter_range`.
 
-        while (
-            current_entry and
-            current_entry.end_time >= start_time
-        ):
-            entry = current_entry.intersection(start_time, end_time)
+        :param start_time: The start time of the interval (must be utc)
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval (must be utc)
+        :type end_time: datetime.datetime
+        :param categories: the categories to include
+        :type categories: frozenset[str]
+        :return: An iterator over the intersecting entries
+        :rtype: Iterator[model.Entry]
+        """
 
-            if entry:
-                entries.append(entry)
+        for entry in self._iter_range(start_time, end_time):
+            if entry.category in categories:
+                yield entry
 
-            current_dt = current_entry.start_time - timedelta.resolution
+    def _select(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        categories: Optional[Iterable[str]]
+    ) -> Iterator[Entry]:
+        """
+        Iterates over the entries that intersect with the interval, with
+        `_iter_categories` if the categories are given and with
+        `_iter_range` otherwise
+        """
 
-            current_entry = self._find_last_before(current_dt)
-        
-        # convert the list to a tuple before returning
-        return tuple(sorted(entries))
+        if categories is None:
+            return self._iter_range(start_time, end_time)
+
+        return self._iter_categories(
+            start_time,
+            end_time,
+            frozenset(categories)
+        )
+
+    def iter_intersection(
+        self, 
+        start_time: datetime, 
+        end_time: datetime,
+        categories: Optional[Iterable[str]] = None
+    ) -> Iterator[Entry]:
+        """
+        Lazily yields the entries that intersect with the interval
+
+        The entries are clipped to the interval and yielded in order of their
+        start times as the backend produces them, so the memory use does not
+        grow with the size of the interval. The times are validated right 
+        away, not on the first iteration.
+
+        :param start_time: The start time of the interval (must be utc)
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval (must be utc)
+        :type end_time: datetime.datetime
+        :param categories: only include the entries of these categories,
+            defaults to None (every category)
+        :type categories: Iterable[str] or None
+        :return: An iterator over the entry intersections with the interval
+        :rtype: Iterator[model.Entry]
+        """
+
+        # check that start_time is utc
+        if start_time.tzinfo != timezone.utc:
+            raise ValueError('start_time.tzinfo must be utc')
+
+        # check that end_time is utc
+        if end_time.tzinfo != timezone.utc:
+            raise ValueError('end_time.tzinfo must be utc')
+
+        return self._iter_intersection(start_time, end_time, categories)
+
+    def _iter_intersection(
+        self, 
+        start_time: datetime, 
+        end_time: datetime,
+        categories: Optional[Iterable[str]]
+    ) -> Iterator[Entry]:
+        """
+        The generator of `iter_intersection`, without the validation
+        """
+
+        for entry in self._select(start_time, end_time, categories):
+            # only clip the entries that straddle the interval
+            if entry.start_time < start_time or entry.end_time > end_time:
+                entry = entry.intersection(start_time, end_time)
+
+            yield entry
+
+    def find_gaps(
+        self, 
+        start_time: datetime, 
+        end_time: datetime, 
+        min_duration: timedelta = timedelta(),
+        categories: Optional[Iterable[str]] = None
+    ) -> Iterator[Tuple[datetime, datetime]]:
+        """
+        Lazily yields the intervals within the interval that no entry covers
+
+        The gaps are found between consecutive entries of `_iter_range`, so
+        the entries are never materialized. The times are validated right 
+        away, not on the first iteration.
+
+        :param start_time: The start time of the interval (must be utc)
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval (must be utc)
+        :type end_time: datetime.datetime
+        :param min_duration: the minimum duration of the yielded gaps, 
+            defaults to timedelta()
+        :type min_duration: datetime.timedelta
+        :param categories: only count the entries of these categories as
+            covering the time, defaults to None (every category)
+        :type categories: Iterable[str] or None
+        :return: An iterator over the (start time, end time) of the gaps, in
+            order
+        :rtype: Iterator[tuple[datetime.datetime, datetime.datetime]]
+        """
+
+        # check that start_time is utc
+        if start_time.tzinfo != timezone.utc:
+            raise ValueError('start_time.tzinfo must be utc')
+
+        # check that end_time is utc
+        if end_time.tzinfo != timezone.utc:
+            raise ValueError('end_time.tzinfo must be utc')
+
+        return self._find_gaps(start_time, end_time, min_duration, categories)
+
+    def _find_gaps(
+        self, 
+        start_time: datetime, 
+        end_time: datetime, 
+        min_duration: timedelta,
+        categories: Optional[Iterable[str]]
+    ) -> Iterator[Tuple[datetime, datetime]]:
+        """
+        The generator of `find_gaps`, without the validation
+        """
+
+        # the end of the time covered so far
+        current_dt = start_time
+
+        for entry in self._select(start_time, end_time, categories):
+            if (
+                entry.start_time > current_dt and
+                entry.start_time - current_dt >= min_duration
+            ):
+                yield current_dt, entry.start_time
+
+            current_dt = max(current_dt, entry.end_time)
+
+        if end_time > current_dt and end_time - current_dt >= min_duration:
+            yield current_dt, end_time
+
+    def _search(
+        self, 
+        query: str, 
+        start_time: datetime, 
+        end_time: datetime
+    ) -> Iterator[Entry]:
+        """
+        Iterates over the entries that contain every token of the query and
+        intersect with the interval, in order of their start times
+
+        Backends that maintain an inverted index should override this; the
+        default implementation scans the interval with `_iter_range`.
+
+        :param query: the text to search for
+        :type query: str
+        :param start_time: The start time of the interval (must be utc)
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval (must be utc)
+        :type end_time: datetime.datetime
+        :return: An iterator over the matching entries
+        :rtype: Iterator[model.Entry]
+        """
+
+        tokens = set(tokenize(query))
+
+        if not tokens:
+            return
+
+        for entry in self._iter_range(start_time, end_time):
+            if tokens <= entry_tokens(entry):
+                yield entry
+
+    def search(
+        self, 
+        query: str, 
+        start_time: Optional[datetime] = None, 
+        end_time: Optional[datetime] = None
+    ) -> Tuple[Entry]:
+        """
+        Finds the entries whose category and description contain every 
+        token of the query
+
+        The tokens are the lowercase runs of letters and digits, see 
+        `search.tokenize`. The entries are not clipped to the interval.
+
+        :param query: the text to search for
+        :type query: str
+        :param start_time: The start time of the interval (must be utc), 
+            defaults to None (the beginning of time)
+        :type start_time: datetime.datetime or None
+        :param end_time: The end time of the interval (must be utc), 
+            defaults to None (the end of time)
+        :type end_time: datetime.datetime or None
+        :return: The matching entries that intersect with the interval, in 
+            order of their start times
+        :rtype: tuple[model.Entry]
+        """
+
+        if start_time is None:
+            start_time = MIN_TIME
+
+        if end_time is None:
+            end_time = MAX_TIME
+
+        # check that start_time is utc
+        if start_time.tzinfo != timezone.utc:
+            raise ValueError('start_time.tzinfo must be utc')
+
+        # check that end_time is utc
+        if end_time.tzinfo != timezone.utc:
+            raise ValueError('end_time.tzinfo must be utc')
+
+        return tuple(self._search(query, start_time, end_time))
+
+    def get_intersection(
+        self,
+        start_time,
+        end_time,
+        categories: Optional[Iterable[str]] = None
+    ) -> Tuple[Entry]:
+        """
+        Creates a sorted tuple of entries that intersect with the interval
+
+        :param start_time: The start time of the interval (must be utc)
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval (must be utc)
+        :type end_time: datetime.datetime
+        :param categories: only include the entries of these categories,
+            defaults to None (every category)
+        :type categories: Iterable[str] or None
+        :return: A sorted tuple of entry intersections with the interval
+        :rtype: tuple[model.Entry]
+        """
+
+        # the entries are already (almost always) sorted, which makes the
+        # sort linear
+        return tuple(sorted(
+            self.iter_intersection(start_time, end_time, categories)
+        ))
+
+    def get_intersection_table(
+        self,
+        start_time,
+        end_time,
+        categories: Optional[Iterable[str]] = None
+    ) -> EntryTable:
+        """
+        Creates a columnar table of entries that intersect with the interval
+
+        This is the compact counterpart of `get_intersection`; the rows are
+        ordered by start time and only the entries on the boundaries of the
+        interval are clipped.
+
+        :param start_time: The start time of the interval (must be utc)
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval (must be utc)
+        :type end_time: datetime.datetime
+        :param categories: only include the entries of these categories,
+            defaults to None (every category)
+        :type categories: Iterable[str] or None
+        :return: A table of entry intersections with the interval
+        :rtype: model.EntryTable
+        """
+
+        return EntryTable(
+            self.iter_intersection(start_time, end_time, categories)
+        )
+
+    def total_duration(
+        self, 
+        start_time: datetime, 
+        end_time: datetime, 
+        by: Optional[str] = 'category',
+        categories: Optional[Iterable[str]] = None
+    ) -> Union[Dict[str, timedelta], timedelta]:
+        """
+        Sums the durations of the entries within the interval
+
+        Entries that straddle the interval only count with the part that 
+        intersects it. Backends that maintain aggregates should override
+        this; the default implementation scans the interval.
+
+        :param start_time: The start time of the interval (must be utc)
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval (must be utc)
+        :type end_time: datetime.datetime
+        :param by: 'category' to sum per category, or None for a single 
+            total, defaults to 'category'
+        :type by: 'category' or None
+        :param categories: only include the entries of these categories,
+            defaults to None (every category)
+        :type categories: Iterable[str] or None
+        :raise ValueError: if `by` is not 'category' nor None
+        :return: the total duration per category, or the total duration
+        :rtype: dict[str, datetime.timedelta] or datetime.timedelta
+        """
+
+        # check that start_time is utc
+        if start_time.tzinfo != timezone.utc:
+            raise ValueError('start_time.tzinfo must be utc')
+
+        # check that end_time is utc
+        if end_time.tzinfo != timezone.utc:
+            raise ValueError('end_time.tzinfo must be utc')
+
+        if by not in {'category', None}:
+            raise ValueError('by must be \'category\' or None')
+
+        totals = {}
+
+        for entry in self._select(start_time, end_time, categories):
+            duration = (
+                min(entry.end_time, end_time) - 
+                max(entry.start_time, start_time)
+            )
+
+            totals[entry.category] = (
+                totals.get(entry.category, timedelta()) + duration
+            )
+
+        if by is None:
+            return sum(totals.values(), timedelta())
+
+        return totals
+
+    def histogram(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        bucket: timedelta = timedelta(hours=1),
+        by: Optional[str] = 'category',
+        categories: Optional[Iterable[str]] = None
+    ) -> 'Histogram':
+        """
+        Splits the durations of the entries within the interval into buckets
+
+        The interval is divided into consecutive buckets starting at 
+        `start_time`, and every entry is split across the buckets it 
+        intersects with, in a single sweep over `get_intersection_table`.
+        The matrix is computed with NumPy if it is installed.
+
+        :param start_time: The start time of the interval (must be utc)
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval (must be utc)
+        :type end_time: datetime.datetime
+        :param bucket: the length of the buckets, defaults to an hour
+        :type bucket: datetime.timedelta
+        :param by: 'category' to split the durations per category, or None 
+            for a single column, defaults to 'category'
+        :type by: 'category' or None
+        :param categories: only include the entries of these categories,
+            defaults to None (every category)
+        :type categories: Iterable[str] or None
+        :raise ValueError: if the bucket is not positive, or `by` is not 
+            'category' nor None
+        :return: the durations per bucket (and category)
+        :rtype: histogram.Histogram
+        """
+
+        # imported here, since it imports NumPy if it is installed
+        from .histogram import histogram
+
+        if bucket <= timedelta():
+            raise ValueError('bucket must be positive')
+
+        if by not in {'category', None}:
+            raise ValueError('by must be \'category\' or None')
+
+        return histogram(
+            self.get_intersection_table(start_time, end_time, categories),
+            start_time,
+            end_time,
+            bucket,
+            by
+        )
 
 
 class MutatorController(Controller):
     """
     An abstract base class for (read-write) controllers
+
+    Listeners registered with `subscribe` receive the mutations of every
+    successful `create_entry`, `create_entries`, `delete_entry`,
+    `delete_entries` and `delete_range` call.
     """
+    # the registered listeners, replaced (not mutated) on every change
+    _listeners: Tuple[Callable[[Tuple[Mutation]], None]] = ()
+
+    def _has_conflict(self, start_time: datetime, end_time: datetime) -> bool:
+        """
+        Checks if any entry intersects with the interval
+
+        The entries do not overlap, so only the last entry that starts before
+        the end of the interval can reach into it, which makes this a single
+        `_find_last_before` probe. Backends may override this hook with a
+        cheaper existence check.
+
+        :param start_time: The start time of the interval (must be utc)
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval (must be utc)
+        :type end_time: datetime.datetime
+        :return: True if an entry intersects with the interval
+        :rtype: bool
+        """
+
+        entry = self._find_last_before(end_time - timedelta.resolution)
+
+        return entry is not None and entry.end_time > start_time
+
     @abstractmethod
     def _publish_entry(self, entry: Entry):
         """
@@ -128,6 +566,75 @@ class MutatorController(Controller):
                 subclass
         """
 
+    def subscribe(self, listener: Callable[[Tuple[Mutation]], None]):
+        """
+        Registers a listener for the mutations of this controller
+
+        The listener is called once per successful public mutation with the
+        tuple of its mutations (e.g. all the creators of `create_entries`),
+        after the mutation has been published.
+
+        :param listener: the listener to register
+        :type listener: Callable[[tuple[model.Mutation]], None]
+        """
+
+        self._listeners = self._listeners + (listener,)
+
+    def unsubscribe(self, listener: Callable[[Tuple[Mutation]], None]):
+        """
+        Removes a registered listener
+
+        :param listener: the listener to remove
+        :type listener: Callable[[tuple[model.Mutation]], None]
+        :raise ValueError: if the listener is not registered
+        """
+
+        listeners = list(self._listeners)
+        listeners.remove(listener)
+
+        self._listeners = tuple(listeners)
+
+    def _notify(self, mutations: Tuple[Mutation]):
+        """
+        Delivers the mutations to the registered listeners
+
+        :param mutations: the mutations to deliver
+        :type mutations: tuple[model.Mutation]
+        """
+
+        for listener in self._listeners:
+            listener(mutations)
+
+    def _publish_entries(self, entries: Tuple[Entry]):
+        """
+            Publishes the entries and their mutations
+
+            Backends that can write in one transaction should override this 
+            hook; the default implementation publishes the entries one at a
+            time with `_publish_entry`.
+
+            :param entries: the sorted, non-conflicting entries to publish
+            :type entries: tuple[model.Entry]
+        """
+
+        for entry in entries:
+            self._publish_entry(entry)
+
+    def _retract_entries(self, entries: Tuple[Entry]):
+        """
+            Deletes the entries and publishes their mutations
+
+            Backends that can write in one transaction should override this
+            hook; the default implementation retracts the entries one at a
+            time with `_retract_entry`.
+
+            :param entries: the sorted, existing entries to delete
+            :type entries: tuple[model.Entry]
+        """
+
+        for entry in entries:
+            self._retract_entry(entry)
+
     def create_entry(self, entry: Entry):
         """
             Tries to create an Entry
@@ -138,13 +645,80 @@ class MutatorController(Controller):
                 to be created
         """
 
-        conflicts = self.get_intersection(entry.start_time, entry.end_time)
+        if self._has_conflict(entry.start_time, entry.end_time):
+            # only collect the conflicts for the error message
+            conflicts = self.get_intersection(
+                entry.start_time,
+                entry.end_time
+            )
 
-        if conflicts:
             raise KeyError(f'{entry} conflicts with {conflicts}!')
-        
+
         self._publish_entry(entry)
 
+        self._notify((Mutation('creator', entry),))
+
+    def create_entries(self, entries: Iterable[Entry]):
+        """
+            Tries to create all of the provided entries at once
+
+            The entries are sorted once and checked for conflicts, both 
+            between themselves and against the existing entries, in a single
+            merge sweep. Either all of the entries are created or none are.
+
+            :param entries: The entries to create
+            :type entries: Iterable[model.Entry]
+            :raise KeyError: If any entry conflicts with another entry
+        """
+
+        entries = sorted(entries)
+
+        if not entries:
+            return
+
+        conflicts = []
+
+        # check the entries against each other
+        for previous, entry in zip(entries, entries[1:]):
+            if entry.start_time < previous.end_time:
+                conflicts.append((previous, entry))
+
+        # check the entries against the existing entries
+        i = 0
+
+        for existing in self._iter_range(
+            entries[0].start_time, 
+            max(entry.end_time for entry in entries)
+        ):
+            # skip the entries that end before the existing entry starts
+            while (
+                i < len(entries) and 
+                entries[i].end_time <= existing.start_time
+            ):
+                i += 1
+
+            j = i
+
+            while (
+                j < len(entries) and 
+                entries[j].start_time < existing.end_time
+            ):
+                conflicts.append((entries[j], existing))
+
+                j += 1
+
+        if conflicts:
+            entry, conflict = conflicts[0]
+
+            raise KeyError(
+                f'{entry} conflicts with {conflict} '
+                f'({len(conflicts)} conflicts in total)!'
+            )
+
+        self._publish_entries(tuple(entries))
+
+        self._notify(tuple(Mutation('creator', entry) for entry in entries))
+
     def delete_entry(self, entry: Entry):
         """
         Tries to delete the provided entry
@@ -158,4 +732,96 @@ class MutatorController(Controller):
             raise KeyError(f"{entry} does not exist!")
 
         self._retract_entry(entry)
+
+        self._notify((Mutation('destroyer', entry),))
+
+    def delete_entries(self, entries: Iterable[Entry]):
+        """
+        Tries to delete all of the provided entries at once
+
+        The entries are sorted once and checked for existence in a single
+        sweep over the range they span. Either all of the entries are
+        deleted or none are; duplicates are deleted once.
+
+        :param entries: The entries to delete
+        :type entries: Iterable[model.Entry]
+        :raise KeyError: If any entry that is to be deleted does not exist
+        """
+
+        entries = sorted(set(entries))
+
+        if not entries:
+            return
+
+        missing = []
+
+        existing = self._iter_range(
+            entries[0].start_time,
+            entries[-1].end_time
+        )
+
+        current = next(existing, None)
+
+        for entry in entries:
+            # skip the existing entries that sort before the entry
+            while current is not None and current < entry:
+                current = next(existing, None)
+
+            if current != entry:
+                missing.append(entry)
+
+        if missing:
+            raise KeyError(
+                f'{missing[0]} does not exist! '
+                f'({len(missing)} missing entries in total)'
+            )
+
+        self._retract_entries(tuple(entries))
+
+        self._notify(tuple(Mutation('destroyer', entry) for entry in entries))
+
+    def delete_range(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        categories: Optional[Iterable[str]] = None
+    ) -> Tuple[Entry]:
+        """
+        Deletes the entries that lie within the interval
+
+        The entries that only partly overlap with the interval are kept.
+
+        :param start_time: The start time of the interval (must be utc)
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval (must be utc)
+        :type end_time: datetime.datetime
+        :param categories: only delete the entries of these categories,
+            defaults to None (every category)
+        :type categories: Iterable[str] or None
+        :return: The deleted entries, in order of their start times
+        :rtype: tuple[model.Entry]
+        """
+
+        # check that start_time is utc
+        if start_time.tzinfo != timezone.utc:
+            raise ValueError('start_time.tzinfo must be utc')
+
+        # check that end_time is utc
+        if end_time.tzinfo != timezone.utc:
+            raise ValueError('end_time.tzinfo must be utc')
+
+        entries = tuple(
+            entry
+            for entry in self._select(start_time, end_time, categories)
+            if start_time <= entry.start_time and entry.end_time <= end_time
+        )
+
+        if entries:
+            self._retract_entries(entries)
+
+            self._notify(tuple(
+                Mutation('destroyer', entry) for entry in entries
+            ))
+
+        return entries
     
\ No newline at end of file
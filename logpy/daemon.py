@@ -0,0 +1,158 @@
+"""
+The resident daemon of the `logpy` command
+
+The daemon keeps a controller loaded and serves the commands of `logpy.cli`
+over a Unix socket, one JSON line per request and response, so repeated
+invocations do not reload the log. The requests are served one at a time.
+A request names the log it is meant for, and the daemon refuses the
+requests for any other log, so that the client can run them itself.
+"""
+from typing import Optional
+
+import json
+import os
+import socket
+
+
+# the seconds a client waits for the daemon to respond
+TIMEOUT = 60.0
+
+
+def send(
+    path: str,
+    request: dict,
+    timeout: Optional[float] = TIMEOUT
+) -> Optional[dict]:
+    """
+    Sends a request to the daemon listening on the socket
+
+    :param path: the path of the socket
+    :type path: str
+    :param request: the request, see `cli.execute`
+    :type request: dict
+    :param timeout: the seconds to wait for the daemon, defaults to
+        `TIMEOUT` (None waits forever)
+    :type timeout: float or None
+    :raise TimeoutError: if the daemon does not respond in time
+    :return: the response, with either a 'result' or an 'error', or None if
+        no daemon is listening on the socket
+    :rtype: dict or None
+    """
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+
+    try:
+        client.connect(path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        client.close()
+
+        return None
+
+    with client, client.makefile('rwb') as file:
+        file.write(json.dumps(request).encode('utf-8') + b'\n')
+        file.flush()
+
+        return json.loads(file.readline())
+
+
+def serve(controller, path: str, log: Optional[str] = None):
+    """
+    Serves the requests on the socket until interrupted
+
+    A stale socket file (of a daemon that is no longer running) is replaced.
+    The socket is only accessible by the current user. An error while
+    serving a request is sent back as its response (or dropped if the
+    client is gone), and the daemon moves on to the next request. A client
+    that does not send its request within `TIMEOUT` seconds is dropped.
+
+    :param controller: the controller of the log
+    :type controller: controller.MutatorController
+    :param path: the path of the socket
+    :type path: str
+    :param log: the resolved path of the log, the requests for other logs
+        are refused; defaults to None (every request is served)
+    :type log: str or None
+    :raise OSError: if another daemon is already listening on the socket
+    """
+
+    if send(path, {'command': 'ping'}) is not None:
+        raise OSError(f'a daemon is already listening on {path}')
+
+    if os.path.exists(path):
+        os.unlink(path)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    # the socket is created with the permissions of the umask
+    umask = os.umask(0o177)
+
+    try:
+        server.bind(path)
+    finally:
+        os.umask(umask)
+
+    server.listen()
+
+    try:
+        while True:
+            connection, _ = server.accept()
+
+            # a client that sends no request line would block the daemon
+            connection.settimeout(TIMEOUT)
+
+            try:
+                with connection, connection.makefile('rwb') as file:
+                    line = file.readline()
+
+                    if not line:
+                        continue
+
+                    response = _respond(controller, line, log)
+
+                    file.write(json.dumps(response).encode('utf-8') + b'\n')
+            except OSError:
+                # the client went away or timed out before the response was
+                # written
+                pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        os.unlink(path)
+
+        if hasattr(controller, 'close'):
+            controller.close()
+
+
+def _respond(controller, line: bytes, log: Optional[str]) -> dict:
+    """
+    Responds to a request line of a client
+
+    :param controller: the controller of the log
+    :type controller: controller.MutatorController
+    :param line: the JSON request
+    :type line: bytes
+    :param log: the resolved path of the log, or None to serve every log
+    :type log: str or None
+    :return: the response, with either a 'result' or an 'error'; the
+        refusals of requests for other logs also hold the 'log' of the
+        daemon
+    :rtype: dict
+    """
+    from .cli import respond
+
+    try:
+        request = json.loads(line)
+
+        # the requests without a log, such as the pings, are served
+        if log is not None and request.get('log', log) != log:
+            return {
+                'error': f'the daemon serves {log}, not {request["log"]}',
+                'log': log
+            }
+
+        return respond(controller, request)
+    except Exception as error:
+        # neither an invalid request nor a failing command stops the daemon
+        return {'error': f'{type(error).__name__}: {error}'}
@@ -0,0 +1,568 @@
+"""
+Streaming import and export of entries as CSV, JSON Lines and iCalendar
+
+The readers parse their file one line at a time and the writers write one
+entry at a time, so files of any size are converted with flat memory.
+`import_entries` creates the entries in chunks of `create_entries` calls
+and `export_entries` streams them from `iter_intersection`.
+
+The formats are picked by the suffix of the path:
+
+- '.csv': a header of `start,end,category,description` and a row per
+  entry, with ISO 8601 times
+- '.jsonl': an object with the same keys per line
+- '.ics': a VEVENT per entry, with the category as the SUMMARY and the
+  description as the DESCRIPTION
+
+Times without a timezone are taken to be utc.
+"""
+from .controller import MAX_TIME, MIN_TIME, Controller, MutatorController
+from .model import Entry, parse_time, to_epoch_us
+
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import (
+    Callable, Dict, Iterable, Iterator, Optional, TextIO, Tuple, Union
+)
+from zoneinfo import ZoneInfo
+
+import csv
+import json
+import re
+
+
+# the columns of a csv file, the description is optional
+_COLUMNS = ('start', 'end', 'category', 'description')
+
+# a content line of an iCalendar file: the name, the parameters and the
+# value, the parameter values may be quoted
+_CONTENT_LINE = re.compile(
+    r'([^:;]+)((?:;[^:;=]+=(?:"[^"]*"|[^:;"]*))*):(.*)'
+)
+
+_PARAMETER = re.compile(r';([^:;=]+)=("[^"]*"|[^:;"]*)')
+
+# the fractional seconds of a DATE-TIME, an extension of iCalendar that
+# keeps the times of the entries exact
+_ICS_FRACTION = re.compile(r'\.(\d{1,6})')
+
+_ICS_ESCAPED = re.compile(r'\\([\\;,nN])')
+
+
+def read_csv(file: TextIO) -> Iterator[Entry]:
+    """
+    Reads the entries of a csv file
+
+    :param file: the file, opened with `newline=''`
+    :type file: TextIO
+    :raise ValueError: if the header or a row is invalid
+    :return: an iterator over the entries, in the order of the file
+    :rtype: Iterator[model.Entry]
+    """
+
+    reader = csv.reader(file)
+
+    header = next(reader, None)
+
+    if header is None:
+        return
+
+    columns = {name.strip().lower(): i for i, name in enumerate(header)}
+
+    for name in _COLUMNS[:3]:
+        if name not in columns:
+            raise ValueError(f'line 1: the {name} column is missing')
+
+    start, end, category = (columns[name] for name in _COLUMNS[:3])
+    description = columns.get('description')
+
+    for row in reader:
+        # skip blank lines
+        if not row:
+            continue
+
+        try:
+            yield Entry(
+                parse_time(row[start]),
+                parse_time(row[end]),
+                row[category],
+                row[description] if description is not None else ''
+            )
+        except (IndexError, ValueError) as error:
+            raise ValueError(
+                f'line {reader.line_num}: {error!r}'
+            ) from error
+
+
+def write_csv(file: TextIO, entries: Iterable[Entry]) -> int:
+    """
+    Writes the entries to a csv file
+
+    :param file: the file, opened with `newline=''`
+    :type file: TextIO
+    :param entries: the entries to write
+    :type entries: Iterable[model.Entry]
+    :return: the number of written entries
+    :rtype: int
+    """
+
+    writer = csv.writer(file, lineterminator='\n')
+    writer.writerow(_COLUMNS)
+
+    count = 0
+
+    for entry in entries:
+        writer.writerow((
+            entry.start_time.isoformat(),
+            entry.end_time.isoformat(),
+            entry.category,
+            entry.description
+        ))
+
+        count += 1
+
+    return count
+
+
+def read_jsonl(file: TextIO) -> Iterator[Entry]:
+    """
+    Reads the entries of a JSON Lines file
+
+    :param file: the file
+    :type file: TextIO
+    :raise ValueError: if a line is invalid
+    :return: an iterator over the entries, in the order of the file
+    :rtype: Iterator[model.Entry]
+    """
+
+    for line_num, line in enumerate(file, 1):
+        # skip blank lines
+        if not line.strip():
+            continue
+
+        try:
+            item = json.loads(line)
+
+            yield Entry(
+                parse_time(item['start']),
+                parse_time(item['end']),
+                item['category'],
+                item.get('description') or ''
+            )
+        except (KeyError, TypeError, ValueError) as error:
+            raise ValueError(f'line {line_num}: {error!r}') from error
+
+
+def write_jsonl(file: TextIO, entries: Iterable[Entry]) -> int:
+    """
+    Writes the entries to a JSON Lines file
+
+    :param file: the file
+    :type file: TextIO
+    :param entries: the entries to write
+    :type entries: Iterable[model.Entry]
+    :return: the number of written entries
+    :rtype: int
+    """
+
+    count = 0
+
+    for entry in entries:
+        file.write(json.dumps({
+            'start': entry.start_time.isoformat(),
+            'end': entry.end_time.isoformat(),
+            'category': entry.category,
+            'description': entry.description
+        }) + '\n')
+
+        count += 1
+
+    return count
+
+
+def _unfold(file: TextIO) -> Iterator[Tuple[int, str]]:
+    """
+    Joins the folded content lines of an iCalendar file
+
+    :return: an iterator over the line numbers and the content lines
+    """
+
+    line_num, line = 0, None
+
+    for i, physical in enumerate(file, 1):
+        physical = physical.rstrip('\r\n')
+
+        if physical[:1] in {' ', '\t'} and line is not None:
+            line += physical[1:]
+
+            continue
+
+        if line:
+            yield line_num, line
+
+        line_num, line = i, physical
+
+    if line:
+        yield line_num, line
+
+
+def _parse_ics_time(value: str, parameters: Dict[str, str]) -> datetime:
+    """
+    Parses an iCalendar DATE or DATE-TIME, dates are taken to start at
+    midnight and floating times are taken to be utc (DATE-TIMEs may have
+    fractional seconds, as written by `write_ics`)
+    """
+
+    dt = datetime(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+
+    if parameters.get('VALUE') != 'DATE':
+        if len(value) < 15 or value[8] != 'T':
+            raise ValueError(f'invalid DATE-TIME {value!r}')
+
+        fraction = value[15:].removesuffix('Z')
+        microsecond = 0
+
+        if fraction:
+            match = _ICS_FRACTION.fullmatch(fraction)
+
+            if match is None:
+                raise ValueError(f'invalid DATE-TIME {value!r}')
+
+            microsecond = int(match[1].ljust(6, '0'))
+
+        dt = dt.replace(
+            hour=int(value[9:11]),
+            minute=int(value[11:13]),
+            second=int(value[13:15]),
+            microsecond=microsecond
+        )
+
+        if value.endswith('Z'):
+            return dt.replace(tzinfo=timezone.utc)
+
+        if 'TZID' in parameters:
+            dt = dt.replace(tzinfo=ZoneInfo(parameters['TZID']))
+
+            return dt.astimezone(timezone.utc)
+
+    return dt.replace(tzinfo=timezone.utc)
+
+
+def _unescape(value: str) -> str:
+    """
+    Unescapes an iCalendar TEXT value
+    """
+    return _ICS_ESCAPED.sub(
+        lambda match: '\n' if match[1] in 'nN' else match[1],
+        value
+    )
+
+
+def read_ics(file: TextIO) -> Iterator[Entry]:
+    """
+    Reads the events of an iCalendar file as entries
+
+    Only the DTSTART, DTEND, SUMMARY and DESCRIPTION of the VEVENT
+    components are read; the other components (and the components nested
+    in the events, such as alarms) are skipped.
+
+    :param file: the file
+    :type file: TextIO
+    :raise ValueError: if an event is invalid
+    :return: an iterator over the entries, in the order of the file
+    :rtype: Iterator[model.Entry]
+    """
+
+    # the properties of the current event, None outside of events
+    event: Optional[Dict[str, Tuple[Dict[str, str], str]]] = None
+    event_line_num = 0
+
+    # the depth of the components nested in the current event
+    nested = 0
+
+    for line_num, line in _unfold(file):
+        match = _CONTENT_LINE.fullmatch(line)
+
+        if match is None:
+            raise ValueError(f'line {line_num}: invalid content line')
+
+        name, parameters, value = match.groups()
+        name = name.upper()
+
+        if name == 'BEGIN':
+            if event is not None:
+                nested += 1
+            elif value.upper() == 'VEVENT':
+                event, event_line_num = {}, line_num
+        elif name == 'END':
+            if nested:
+                nested -= 1
+            elif event is not None and value.upper() == 'VEVENT':
+                try:
+                    yield _event_entry(event)
+                except (KeyError, ValueError) as error:
+                    raise ValueError(
+                        f'line {event_line_num}: {error!r}'
+                    ) from error
+
+                event = None
+        elif event is not None and not nested:
+            event[name] = (
+                {
+                    key.upper(): value.strip('"')
+                    for key, value in _PARAMETER.findall(parameters)
+                },
+                value
+            )
+
+
+def _event_entry(event: Dict[str, Tuple[Dict[str, str], str]]) -> Entry:
+    """
+    Creates the entry of an event from its properties
+    """
+
+    if 'DTEND' not in event:
+        raise ValueError('the event has no DTEND')
+
+    start_parameters, start = event['DTSTART']
+    end_parameters, end = event['DTEND']
+
+    return Entry(
+        _parse_ics_time(start, start_parameters),
+        _parse_ics_time(end, end_parameters),
+        _unescape(event.get('SUMMARY', ({}, ''))[1]),
+        _unescape(event.get('DESCRIPTION', ({}, ''))[1])
+    )
+
+
+def _escape(value: str) -> str:
+    """
+    Escapes an iCalendar TEXT value
+    """
+    return (
+        value.replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def _fold(line: str) -> str:
+    """
+    Folds an iCalendar content line into lines of at most 75 octets
+    """
+
+    if len(line) <= 75 and line.isascii():
+        return line + '\r\n'
+
+    folded = []
+
+    limit = 75
+
+    while len(line.encode('utf-8')) > limit:
+        # cut at a character boundary
+        part = line.encode('utf-8')[:limit].decode('utf-8', 'ignore')
+
+        folded.append(part)
+
+        line = line[len(part):]
+
+        # the continuation lines start with a space
+        limit = 74
+
+    folded.append(line)
+
+    return '\r\n '.join(folded) + '\r\n'
+
+
+def _format_ics_time(dt: datetime) -> str:
+    """
+    Formats a utc time as an iCalendar DATE-TIME, with fractional seconds
+    only if the time has microseconds
+    """
+
+    if dt.microsecond:
+        return dt.strftime('%Y%m%dT%H%M%S.%fZ')
+
+    return dt.strftime('%Y%m%dT%H%M%SZ')
+
+
+def write_ics(file: TextIO, entries: Iterable[Entry]) -> int:
+    """
+    Writes the entries to an iCalendar file, as events
+
+    Times with microseconds are written with fractional seconds, which
+    iCalendar itself does not allow, so that the entries are read back
+    exactly; other calendars may reject such times. The UID of an event is
+    derived from its start time, which is unique since the entries do not
+    overlap.
+
+    :param file: the file, opened with `newline=''`
+    :type file: TextIO
+    :param entries: the entries to write
+    :type entries: Iterable[model.Entry]
+    :return: the number of written entries
+    :rtype: int
+    """
+
+    file.write(
+        'BEGIN:VCALENDAR\r\n'
+        'VERSION:2.0\r\n'
+        'PRODID:-//logpy//logpy//EN\r\n'
+    )
+
+    stamp = _format_ics_time(
+        datetime.now(timezone.utc).replace(microsecond=0)
+    )
+
+    count = 0
+
+    for entry in entries:
+        file.write(
+            'BEGIN:VEVENT\r\n'
+            f'UID:{to_epoch_us(entry.start_time)}@logpy\r\n'
+            f'DTSTAMP:{stamp}\r\n'
+            f'DTSTART:{_format_ics_time(entry.start_time)}\r\n'
+            f'DTEND:{_format_ics_time(entry.end_time)}\r\n'
+        )
+        file.write(_fold(f'SUMMARY:{_escape(entry.category)}'))
+
+        if entry.description:
+            file.write(_fold(f'DESCRIPTION:{_escape(entry.description)}'))
+
+        file.write('END:VEVENT\r\n')
+
+        count += 1
+
+    file.write('END:VCALENDAR\r\n')
+
+    return count
+
+
+# the readers and writers by the suffix of the file
+FORMATS: Dict[
+    str,
+    Tuple[
+        Callable[[TextIO], Iterator[Entry]],
+        Callable[[TextIO, Iterable[Entry]], int]
+    ]
+] = {
+    '.csv': (read_csv, write_csv),
+    '.jsonl': (read_jsonl, write_jsonl),
+    '.ics': (read_ics, write_ics),
+}
+
+
+def _format(path: Union[str, Path], format: Optional[str]) -> tuple:
+    """
+    Finds the reader and writer of the format, or of the suffix of the path
+    """
+
+    if format is None:
+        format = Path(path).suffix.lower()
+
+    if format not in FORMATS:
+        raise ValueError(
+            f'unknown format {format!r}, must be one of {", ".join(FORMATS)}'
+        )
+
+    return FORMATS[format]
+
+
+def import_entries(
+    controller: MutatorController,
+    path: Union[str, Path],
+    chunk_size: int = 10_000,
+    format: Optional[str] = None
+) -> int:
+    """
+    Creates the entries of a file
+
+    The file is read and validated one chunk at a time and every chunk is
+    created with one `create_entries` call, so at most a chunk of entries
+    is held in memory. The chunks are checked for conflicts against the
+    entries created before them, but a failing chunk does not undo the
+    chunks before it.
+
+    :param controller: the controller to create the entries in
+    :type controller: controller.MutatorController
+    :param path: the path of the file
+    :type path: str or pathlib.Path
+    :param chunk_size: the number of entries per chunk, defaults to 10_000
+    :type chunk_size: int
+    :param format: the format of the file, one of the keys of `FORMATS`,
+        defaults to None (the suffix of the path)
+    :type format: str or None
+    :raise ValueError: if the format is unknown or the file is invalid
+    :raise KeyError: if an entry conflicts with another entry
+    :return: the number of created entries
+    :rtype: int
+    """
+
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be positive')
+
+    read, _ = _format(path, format)
+
+    count = 0
+
+    # utf-8-sig skips the byte order mark that spreadsheets often add
+    with open(path, newline='', encoding='utf-8-sig') as file:
+        entries = read(file)
+
+        while chunk := list(islice(entries, chunk_size)):
+            controller.create_entries(chunk)
+
+            count += len(chunk)
+
+    return count
+
+
+def export_entries(
+    controller: Controller,
+    path: Union[str, Path],
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    categories: Optional[Iterable[str]] = None,
+    format: Optional[str] = None
+) -> int:
+    """
+    Writes the entries that intersect with the interval to a file
+
+    The entries are streamed from `iter_intersection` in order of their
+    start times, so the entries on the boundaries of the interval are
+    clipped.
+
+    :param controller: the controller to export the entries of
+    :type controller: controller.Controller
+    :param path: the path of the file
+    :type path: str or pathlib.Path
+    :param start_time: The start time of the interval (must be utc),
+        defaults to None (the beginning of time)
+    :type start_time: datetime.datetime or None
+    :param end_time: The end time of the interval (must be utc),
+        defaults to None (the end of time)
+    :type end_time: datetime.datetime or None
+    :param categories: only include the entries of these categories,
+        defaults to None (every category)
+    :type categories: Iterable[str] or None
+    :param format: the format of the file, one of the keys of `FORMATS`,
+        defaults to None (the suffix of the path)
+    :type format: str or None
+    :raise ValueError: if the format is unknown or the times are not utc
+    :return: the number of written entries
+    :rtype: int
+    """
+
+    _, write = _format(path, format)
+
+    entries = controller.iter_intersection(
+        MIN_TIME if start_time is None else start_time,
+        MAX_TIME if end_time is None else end_time,
+        categories
+    )
+
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        return write(file, entries)
@@ -0,0 +1,247 @@
+from .model import EntryTable, to_epoch_us
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy
+except ImportError:  # no cov
+    numpy = None
+
+
+@dataclass(frozen=True)
+class Histogram:
+    """
+    Dataclass holding the durations of the entries per time bucket
+
+    `durations[i][j]` is the time (in microseconds) that the entries of
+    `categories[j]` take up within the i-th bucket, which starts at
+    `start_time + i * bucket`. The last bucket is cut short by the end of
+    the interval if the interval is not a multiple of the bucket.
+
+    :param start_time: the start time of the first bucket
+    :type start_time: datetime.datetime
+    :param end_time: the end time of the interval
+    :type end_time: datetime.datetime
+    :param bucket: the length of the buckets
+    :type bucket: datetime.timedelta
+    :param categories: the categories of the columns, a single None if the
+        durations are not split by category
+    :type categories: tuple[str] or tuple[None]
+    :param durations: the dense matrix of durations in microseconds, a
+        `numpy.ndarray` of shape (buckets, categories) if NumPy is
+        installed, otherwise a list of rows
+    :type durations: numpy.ndarray or list[list[int]]
+    """
+    start_time: datetime
+    end_time: datetime
+    bucket: timedelta
+    categories: Tuple[Optional[str], ...]
+    durations: Any
+
+    def __len__(self) -> int:
+        return len(self.durations)
+
+    def edges(self) -> Tuple[datetime, ...]:
+        """
+        The start times of the buckets
+
+        :return: the start times of the buckets
+        :rtype: tuple[datetime.datetime]
+        """
+
+        return tuple(
+            self.start_time + i * self.bucket for i in range(len(self))
+        )
+
+    def totals(self, i: int) -> Dict[Optional[str], timedelta]:
+        """
+        The duration per category of the i-th bucket
+
+        :param i: the index of the bucket
+        :type i: int
+        :return: the duration per category, without empty categories
+        :rtype: dict[str, datetime.timedelta]
+        """
+
+        return {
+            category: timedelta(microseconds=int(duration))
+            for category, duration in zip(self.categories, self.durations[i])
+            if duration
+        }
+
+
+def histogram(
+    table: EntryTable,
+    start_time: datetime,
+    end_time: datetime,
+    bucket: timedelta,
+    by: Optional[str] = 'category'
+) -> Histogram:
+    """
+    Splits the entries of the table across the buckets of the interval
+
+    :param table: the entries, clipped to the interval and sorted by their
+        start times
+    :type table: model.EntryTable
+    :param start_time: The start time of the interval (must be utc)
+    :type start_time: datetime.datetime
+    :param end_time: The end time of the interval (must be utc)
+    :type end_time: datetime.datetime
+    :param bucket: the length of the buckets
+    :type bucket: datetime.timedelta
+    :param by: 'category' to split the durations per category, or None for
+        a single column, defaults to 'category'
+    :type by: 'category' or None
+    :raise ValueError: if the bucket is not positive, or `by` is not
+        'category' nor None
+    :return: the histogram
+    :rtype: Histogram
+    """
+
+    if bucket <= timedelta():
+        raise ValueError('bucket must be positive')
+
+    if by not in {'category', None}:
+        raise ValueError('by must be \'category\' or None')
+
+    start_us = to_epoch_us(start_time)
+    end_us = to_epoch_us(end_time)
+    bucket_us = bucket // timedelta.resolution
+
+    # the number of buckets, including a last partial bucket
+    buckets = max(0, -((start_us - end_us) // bucket_us))
+
+    if by is None:
+        categories = (None,)
+    else:
+        categories = tuple(table.categories)
+
+    if numpy is not None:
+        durations = _numpy_durations(
+            table, start_us, end_us, bucket_us, buckets, by
+        )
+    else:
+        durations = _python_durations(
+            table, start_us, end_us, bucket_us, buckets, by
+        )
+
+    return Histogram(
+        start_time,
+        end_time,
+        bucket,
+        categories,
+        durations
+    )
+
+
+def _python_durations(
+    table: EntryTable,
+    start_us: int,
+    end_us: int,
+    bucket_us: int,
+    buckets: int,
+    by: Optional[str]
+) -> List[List[int]]:
+    """
+    Computes the durations in a single sweep over the entries
+
+    Every entry only visits the buckets it intersects with.
+    """
+
+    columns = len(table.categories) if by is not None else 1
+
+    durations = [[0] * columns for _ in range(buckets)]
+
+    for start, end, category_id in zip(
+        table.start_us,
+        table.end_us,
+        table.category_ids
+    ):
+        j = category_id if by is not None else 0
+
+        i = (start - start_us) // bucket_us
+
+        # the end of the bucket the current part of the entry falls in
+        boundary = start_us + (i + 1) * bucket_us
+
+        while boundary < end:
+            durations[i][j] += boundary - start
+
+            start = boundary
+            boundary += bucket_us
+            i += 1
+
+        durations[i][j] += end - start
+
+    return durations
+
+
+def _numpy_durations(
+    table: EntryTable,
+    start_us: int,
+    end_us: int,
+    bucket_us: int,
+    buckets: int,
+    by: Optional[str]
+):
+    """
+    Computes the durations with vectorized operations
+
+    The covered time up to every bucket edge is found by a binary search
+    over the end times and the cumulative durations of the entries; the
+    durations of the buckets are the differences between consecutive edges.
+    """
+
+    starts = numpy.frombuffer(table.start_us, dtype=numpy.int64)
+    ends = numpy.frombuffer(table.end_us, dtype=numpy.int64)
+
+    edges = numpy.minimum(
+        start_us + bucket_us * numpy.arange(buckets + 1, dtype=numpy.int64),
+        end_us
+    )
+
+    if by is None:
+        groups = [numpy.arange(len(starts))]
+    else:
+        category_ids = numpy.frombuffer(
+            table.category_ids,
+            dtype=numpy.uint32
+        )
+
+        groups = [
+            numpy.flatnonzero(category_ids == category_id)
+            for category_id in range(len(table.categories))
+        ]
+
+    durations = numpy.zeros((buckets, len(groups)), dtype=numpy.int64)
+
+    for j, indices in enumerate(groups):
+        if not len(indices):
+            continue
+
+        group_starts = starts[indices]
+        group_ends = ends[indices]
+
+        # the covered time before each entry
+        covered = numpy.concatenate((
+            numpy.zeros(1, dtype=numpy.int64),
+            numpy.cumsum(group_ends - group_starts)
+        ))
+
+        # the first entry that ends after each edge
+        k = numpy.searchsorted(group_ends, edges, side='right')
+
+        partial = numpy.zeros(len(edges), dtype=numpy.int64)
+
+        inside = k < len(indices)
+
+        partial[inside] = numpy.maximum(
+            edges[inside] - group_starts[k[inside]],
+            0
+        )
+
+        durations[:, j] = numpy.diff(covered[k] + partial)
+
+    return durations
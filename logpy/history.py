@@ -0,0 +1,287 @@
+from .controller import MAX_TIME, MIN_TIME, Controller, MutatorController
+from .memory import MemoryController
+from .model import Entry, Mutation
+
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from operator import attrgetter
+from typing import (
+    Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple,
+    Union
+)
+
+
+class HistoricalController(Controller):
+    """
+    A read-only view of a log as it was at a point in time
+
+    Created by `History.as_of`. The entries are held in memory, so the view
+    stays valid after the log changes.
+
+    :param timestamp: the point in time of the view
+    :type timestamp: datetime.datetime
+    :param controller: the reconstructed log
+    :type controller: memory.MemoryController
+    """
+
+    def __init__(self, timestamp: datetime, controller: MemoryController):
+        self.timestamp = timestamp
+        self.controller = controller
+
+    def __len__(self) -> int:
+        return len(self.controller)
+
+    def __iter__(self) -> Iterator[Entry]:
+        return iter(self.controller)
+
+    def _find_first_after(self, dt: datetime) -> Optional[Entry]:
+        return self.controller._find_first_after(dt)
+
+    def _find_last_before(self, dt: datetime) -> Optional[Entry]:
+        return self.controller._find_last_before(dt)
+
+    def _iter_range(
+        self,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Iterator[Entry]:
+        return self.controller._iter_range(start_time, end_time)
+
+    def _iter_categories(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        categories: FrozenSet[str]
+    ) -> Iterator[Entry]:
+        return self.controller._iter_categories(
+            start_time,
+            end_time,
+            categories
+        )
+
+    def _search(
+        self,
+        query: str,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Iterator[Entry]:
+        return self.controller._search(query, start_time, end_time)
+
+    def total_duration(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        by: Optional[str] = 'category',
+        categories: Optional[Iterable[str]] = None
+    ) -> Union[Dict[str, timedelta], timedelta]:
+        return self.controller.total_duration(
+            start_time,
+            end_time,
+            by,
+            categories
+        )
+
+
+class History:
+    """
+    Records the mutations of a controller to reconstruct past versions of
+    the log
+
+    The history subscribes to the mutations of the controller and stamps
+    them with the time they were made. The log is copied once, when the
+    history starts; after that, every `checkpoint_every` mutations a
+    checkpoint stores the net change of the log since the previous
+    checkpoint (the entries that were added and removed), so the memory of
+    the history grows with the number of mutations and not with the size
+    of the log. `as_of` applies the changes of the checkpoints before the
+    requested time to the copy and then only replays the mutations made
+    since the nearest of them. Besides building the view, which takes time
+    linear in the size of the log, a reconstruction costs a dict lookup
+    per entry that changed up to the checkpoint plus at most
+    `checkpoint_every` replayed mutations.
+
+    The stamps never go backwards: if the clock does (e.g. the system clock
+    is set back), the mutations are stamped with the time of the mutation
+    before them, so the history stays in order.
+
+    :param controller: the controller to record
+    :type controller: controller.MutatorController
+    :param checkpoint_every: the number of mutations between checkpoints,
+        defaults to 10_000
+    :type checkpoint_every: int
+    :param clock: returns the current (utc) time, defaults to the system
+        clock
+    :type clock: Callable[[], datetime.datetime] or None
+    """
+
+    def __init__(
+        self,
+        controller: MutatorController,
+        checkpoint_every: int = 10_000,
+        clock: Optional[Callable[[], datetime]] = None
+    ):
+        self.controller = controller
+        self.checkpoint_every = checkpoint_every
+        self.clock = clock or (lambda: datetime.now(timezone.utc))
+
+        # the mutations and the times they were made (parallel lists)
+        self._mutations: List[Mutation] = []
+        self._timestamps: List[datetime] = []
+
+        # the log when the history started
+        self._base = tuple(controller._iter_range(MIN_TIME, MAX_TIME))
+
+        self.start_time = self.clock()
+
+        # the number of mutations before each checkpoint, and the entries
+        # added and removed since the checkpoint before it
+        self._checkpoints: List[Tuple[int, Tuple[Entry], Tuple[Entry]]] = [
+            (0, (), ())
+        ]
+
+        # the net change since the last checkpoint
+        self._added: Dict[datetime, Entry] = {}
+        self._removed: Dict[datetime, Entry] = {}
+
+        controller.subscribe(self)
+
+    def close(self):
+        """
+        Stops recording the mutations of the controller
+        """
+        self.controller.unsubscribe(self)
+
+    def __len__(self) -> int:
+        return len(self._mutations)
+
+    def __call__(self, mutations: Tuple[Mutation]):
+        # keep the stamps sorted, even if the clock goes backwards
+        timestamp = max(
+            self.clock(),
+            self._timestamps[-1] if self._timestamps else self.start_time
+        )
+
+        for mutation in mutations:
+            self._mutations.append(mutation)
+            self._timestamps.append(timestamp)
+
+            _change(
+                self._added,
+                self._removed,
+                mutation.entry,
+                mutation.mutation_class == 'creator'
+            )
+
+            if len(self._mutations) % self.checkpoint_every == 0:
+                self._checkpoints.append((
+                    len(self._mutations),
+                    tuple(self._added.values()),
+                    tuple(self._removed.values())
+                ))
+
+                self._added.clear()
+                self._removed.clear()
+
+    def as_of(self, timestamp: datetime) -> HistoricalController:
+        """
+        Reconstructs the log as it was at the time
+
+        :param timestamp: the time (must be utc)
+        :type timestamp: datetime.datetime
+        :raise ValueError: if the time is not utc, or before the history
+            started
+        :return: a read-only view of the log at the time
+        :rtype: HistoricalController
+        """
+
+        if timestamp.tzinfo != timezone.utc:
+            raise ValueError('timestamp.tzinfo must be utc')
+
+        if timestamp < self.start_time:
+            raise ValueError(
+                f'the history starts at {self.start_time}, not before!'
+            )
+
+        # the number of mutations made at or before the time
+        n = bisect_right(self._timestamps, timestamp)
+
+        # the last checkpoint at or before the n-th mutation
+        k = bisect_right(
+            self._checkpoints,
+            n,
+            key=lambda checkpoint: checkpoint[0]
+        ) - 1
+
+        # the net change of the log from its start to the checkpoint
+        added: Dict[datetime, Entry] = {}
+        removed: Dict[datetime, Entry] = {}
+
+        for _, checkpoint_added, checkpoint_removed in self._checkpoints[
+            1:k + 1
+        ]:
+            for entry in checkpoint_removed:
+                _change(added, removed, entry, False)
+
+            for entry in checkpoint_added:
+                _change(added, removed, entry, True)
+
+        entries = [
+            entry
+            for entry in self._base
+            if entry.start_time not in removed
+            or removed[entry.start_time] != entry
+        ]
+
+        # both parts are sorted, so the sort merges them in linear time; the
+        # entries do not overlap, so they are ordered by their start times
+        entries.extend(
+            added[start_time] for start_time in sorted(added)
+        )
+        entries.sort(key=attrgetter('start_time'))
+
+        controller = MemoryController()
+        controller._load_sorted(entries)
+
+        for mutation in self._mutations[self._checkpoints[k][0]:n]:
+            _apply(controller, mutation)
+
+        return HistoricalController(timestamp, controller)
+
+
+def _change(
+    added: Dict[datetime, Entry],
+    removed: Dict[datetime, Entry],
+    entry: Entry,
+    created: bool
+):
+    """
+    Adds the creation or deletion of the entry to a net change of the log
+
+    An entry that is created and deleted again (or the other way around)
+    cancels out. The entries of one version of the log do not overlap, so
+    the added and removed entries are keyed by their start times, which
+    are cheaper to hash than the entries.
+    """
+
+    start_time = entry.start_time
+
+    if created:
+        if start_time in removed and removed[start_time] == entry:
+            del removed[start_time]
+        else:
+            added[start_time] = entry
+    else:
+        if start_time in added and added[start_time] == entry:
+            del added[start_time]
+        else:
+            removed[start_time] = entry
+
+
+def _apply(controller: MemoryController, mutation: Mutation):
+    """
+    Applies the mutation to the controller, without notifying its listeners
+    """
+    if mutation.mutation_class == 'creator':
+        controller._insert(mutation.entry)
+    else:
+        controller._remove(mutation.entry)
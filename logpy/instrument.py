@@ -0,0 +1,360 @@
+from .controller import Controller
+
+from dataclasses import dataclass, field
+from functools import wraps
+from threading import local
+from time import perf_counter
+from typing import Callable, Dict, Optional
+
+
+# the backend hooks that are counted and timed
+HOOKS = (
+    '_find_first_after',
+    '_find_last_before',
+    '_iter_range',
+    '_iter_categories',
+    '_search',
+    '_has_conflict',
+    '_publish_entry',
+    '_publish_entries',
+    '_retract_entry',
+    '_retract_entries',
+)
+
+# the public operations that the hook calls are attributed to
+OPERATIONS = (
+    'get_intersection',
+    'get_intersection_table',
+    'iter_intersection',
+    'find_gaps',
+    'search',
+    'total_duration',
+    'create_entry',
+    'create_entries',
+    'delete_entry',
+    'delete_entries',
+    'delete_range',
+)
+
+# the public operations that return lazy iterators
+ITERATOR_OPERATIONS = (
+    'iter_intersection',
+    'find_gaps',
+)
+
+
+@dataclass
+class Call:
+    """
+    Dataclass recording a single call of a public operation
+
+    :param operation: the name of the public operation
+    :type operation: str
+    :param seconds: the wall time of the call
+    :type seconds: float
+    :param hook_calls: the number of calls per hook
+    :type hook_calls: dict[str, int]
+    :param hook_seconds: the time spent per hook
+    :type hook_seconds: dict[str, float]
+    :param scanned: the number of entries produced by the hooks
+    :type scanned: int
+    :param returned: the number of entries returned by the operation
+    :type returned: int
+    """
+    operation: str
+    seconds: float = 0.0
+    hook_calls: Dict[str, int] = field(default_factory=dict)
+    hook_seconds: Dict[str, float] = field(default_factory=dict)
+    scanned: int = 0
+    returned: int = 0
+
+    def _record_hook(self, hook: str, seconds: float, calls: int = 1):
+        self.hook_calls[hook] = self.hook_calls.get(hook, 0) + calls
+        self.hook_seconds[hook] = self.hook_seconds.get(hook, 0.0) + seconds
+
+
+@dataclass
+class Stats:
+    """
+    Dataclass aggregating the calls of the public operations
+
+    :param calls: the aggregated calls per public operation, every field
+        holds the total over all calls of the operation
+    :type calls: dict[str, Call]
+    :param counts: the number of calls per public operation
+    :type counts: dict[str, int]
+    """
+    calls: Dict[str, Call] = field(default_factory=dict)
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    def _record(self, call: Call):
+        total = self.calls.setdefault(call.operation, Call(call.operation))
+
+        total.seconds += call.seconds
+        total.scanned += call.scanned
+        total.returned += call.returned
+
+        for hook, calls in call.hook_calls.items():
+            total._record_hook(hook, call.hook_seconds[hook], calls)
+
+        self.counts[call.operation] = self.counts.get(call.operation, 0) + 1
+
+    def reset(self):
+        """
+        Forgets all of the recorded calls
+        """
+        self.calls.clear()
+        self.counts.clear()
+
+
+def instrument(
+    controller: Controller,
+    callback: Optional[Callable[[Call], None]] = None
+) -> Stats:
+    """
+    Counts and times the hook calls of every public operation of a controller
+
+    The hooks and public operations are wrapped on the instance only, so
+    controllers that are not instrumented pay nothing. Hook calls are
+    attributed to the outermost running public operation (e.g. the conflict
+    check of `create_entry` counts towards `create_entry`); hook calls made
+    outside of a public operation are not recorded.
+
+    :param controller: the controller to instrument
+    :type controller: controller.Controller
+    :param callback: called with the `Call` record after every successful
+        public operation, defaults to None
+    :type callback: Callable[[Call], None] or None
+    :return: the statistics, which are updated as the controller is used
+    :rtype: Stats
+    """
+
+    uninstrument(controller)
+
+    stats = Stats()
+
+    # the running public operation of each thread
+    state = local()
+
+    for name in HOOKS:
+        hook = getattr(controller, name, None)
+
+        if hook is None:
+            continue
+
+        if name in {'_iter_range', '_iter_categories', '_search'}:
+            wrapper = _wrap_iterator_hook(name, hook, state)
+        else:
+            wrapper = _wrap_hook(name, hook, state)
+
+        setattr(controller, name, wrapper)
+
+    for name in OPERATIONS:
+        operation = getattr(controller, name, None)
+
+        if operation is None:
+            continue
+
+        if name in ITERATOR_OPERATIONS:
+            wrapper = _wrap_iterator_operation(
+                name, operation, state, stats, callback
+            )
+        else:
+            wrapper = _wrap_operation(name, operation, state, stats, callback)
+
+        setattr(controller, name, wrapper)
+
+    return stats
+
+
+def uninstrument(controller: Controller):
+    """
+    Removes the instrumentation from a controller
+
+    :param controller: the instrumented controller
+    :type controller: controller.Controller
+    """
+
+    for name in HOOKS + OPERATIONS:
+        controller.__dict__.pop(name, None)
+
+
+def _wrap_hook(name: str, hook: Callable, state: local) -> Callable:
+    """
+    Wraps a hook that returns an entry (or nothing) to record its calls
+    """
+
+    @wraps(hook)
+    def wrapper(*args, **kwargs):
+        call = getattr(state, 'call', None)
+
+        if call is None:
+            return hook(*args, **kwargs)
+
+        start = perf_counter()
+
+        result = hook(*args, **kwargs)
+
+        call._record_hook(name, perf_counter() - start)
+
+        if result is not None and name.startswith('_find'):
+            call.scanned += 1
+
+        return result
+
+    return wrapper
+
+
+def _wrap_iterator_hook(name: str, hook: Callable, state: local) -> Callable:
+    """
+    Wraps a hook that returns an iterator to record its calls, including the
+    time spent producing every entry
+    """
+
+    @wraps(hook)
+    def wrapper(*args, **kwargs):
+        call = getattr(state, 'call', None)
+
+        if call is None:
+            return hook(*args, **kwargs)
+
+        return _record_iterator(name, hook(*args, **kwargs), call)
+
+    return wrapper
+
+
+def _record_iterator(name: str, iterator, call: Call):
+    """
+    Yields the entries of the iterator, recording the time spent on each
+    """
+    start = perf_counter()
+
+    iterator = iter(iterator)
+
+    call._record_hook(name, perf_counter() - start)
+
+    while True:
+        start = perf_counter()
+
+        try:
+            entry = next(iterator)
+        except StopIteration:
+            call._record_hook(name, perf_counter() - start, calls=0)
+
+            return
+
+        call._record_hook(name, perf_counter() - start, calls=0)
+        call.scanned += 1
+
+        yield entry
+
+
+def _wrap_operation(
+    name: str,
+    operation: Callable,
+    state: local,
+    stats: Stats,
+    callback: Optional[Callable[[Call], None]]
+) -> Callable:
+    """
+    Wraps a public operation to collect the hook calls made during it
+    """
+
+    @wraps(operation)
+    def wrapper(*args, **kwargs):
+        # nested operations count towards the outermost one
+        if getattr(state, 'call', None) is not None:
+            return operation(*args, **kwargs)
+
+        call = state.call = Call(name)
+
+        start = perf_counter()
+
+        try:
+            result = operation(*args, **kwargs)
+        finally:
+            call.seconds = perf_counter() - start
+            state.call = None
+
+        if name.startswith('get_intersection') or name == 'search':
+            call.returned = len(result)
+
+        stats._record(call)
+
+        if callback is not None:
+            callback(call)
+
+        return result
+
+    return wrapper
+
+
+def _wrap_iterator_operation(
+    name: str,
+    operation: Callable,
+    state: local,
+    stats: Stats,
+    callback: Optional[Callable[[Call], None]]
+) -> Callable:
+    """
+    Wraps a public operation that returns an iterator to collect the hook
+    calls made while the iterator is consumed
+    """
+
+    @wraps(operation)
+    def wrapper(*args, **kwargs):
+        # nested operations count towards the outermost one
+        if getattr(state, 'call', None) is not None:
+            return operation(*args, **kwargs)
+
+        call = state.call = Call(name)
+
+        start = perf_counter()
+
+        try:
+            iterator = iter(operation(*args, **kwargs))
+        finally:
+            call.seconds = perf_counter() - start
+            state.call = None
+
+        return _record_operation(iterator, call, state, stats, callback)
+
+    return wrapper
+
+
+def _record_operation(
+    iterator,
+    call: Call,
+    state: local,
+    stats: Stats,
+    callback: Optional[Callable[[Call], None]]
+):
+    """
+    Yields the entries of the iterator, attributing the hook calls made for
+    each of them to the call, and records the call once it is exhausted
+    """
+
+    while True:
+        # the iterator may be consumed within another operation
+        outer = getattr(state, 'call', None)
+
+        state.call = call
+
+        start = perf_counter()
+
+        try:
+            entry = next(iterator)
+        except StopIteration:
+            break
+        finally:
+            call.seconds += perf_counter() - start
+            state.call = outer
+
+        call.returned += 1
+
+        yield entry
+
+    stats._record(call)
+
+    if callback is not None:
+        callback(call)
@@ -0,0 +1,300 @@
+from .memory import MemoryController
+from .model import Entry, Mutation, to_epoch_us
+
+from pathlib import Path
+from typing import Tuple, Union
+
+import json
+import os
+
+try:
+    import fcntl
+except ImportError:  # no cov
+    fcntl = None
+
+
+class JournalController(MemoryController):
+    """
+    A file-backed controller that appends every mutation to a journal
+
+    The journal is a JSON Lines file with one mutation per line, written
+    before the in-memory index is updated. Every `snapshot_every` mutations
+    the entries are written to a snapshot file and the journal is started
+    anew, so creator/destroyer pairs cancel out and opening the controller
+    only loads the snapshot and replays the mutations since then.
+
+    Both files start with a header that holds their generation. A snapshot
+    with a newer generation than the journal already contains the journal,
+    which makes the compaction safe to interrupt at any point.
+
+    Only one controller can open a journal at a time, it holds an exclusive
+    lock on a '.lock' file next to the journal until it is closed. The
+    journal itself is replaced on every snapshot, so it cannot hold the lock.
+
+    :param path: the path of the journal, the snapshot is stored next to it
+        with a '.snapshot' suffix
+    :type path: str or pathlib.Path
+    :param snapshot_every: the number of mutations after which a snapshot
+        is taken, None disables automatic snapshots, defaults to 10000
+    :type snapshot_every: int or None
+    :param fsync: whether to fsync the journal after every write, defaults
+        to False
+    :type fsync: bool
+    :raise OSError: if the journal is opened by another controller
+    :raise ValueError: if the journal is newer than the snapshot
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        snapshot_every: int = 10_000,
+        fsync: bool = False
+    ):
+        super().__init__()
+
+        self.path = Path(path)
+        self.snapshot_path = self.path.with_name(self.path.name + '.snapshot')
+
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+
+        # the number of mutations in the journal
+        self._journal_len = 0
+
+        self._lock()
+
+        try:
+            self._open()
+        except BaseException:
+            self._lock_file.close()
+
+            raise
+
+    def _lock(self):
+        """
+        Takes an exclusive lock on the journal or fails if it is held
+        """
+        self._lock_file = open(
+            self.path.with_name(self.path.name + '.lock'), 'a'
+        )
+
+        if fcntl is None:  # no cov
+            return
+
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError as error:
+            self._lock_file.close()
+
+            raise OSError(
+                f'{self.path} is opened by another controller'
+            ) from error
+
+    def _open(self):
+        """
+        Loads the snapshot, replays the journal and opens it for appending
+        """
+        # the generation of the snapshot
+        self._generation = 0
+
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, encoding='utf-8') as file:
+                self._generation = json.loads(file.readline())['generation']
+
+                self._load_sorted([_load_entry(line) for line in file])
+
+        if self.path.exists():
+            data = self.path.read_bytes()
+
+            # drop the last line if its write was interrupted
+            end = data.rfind(b'\n') + 1
+            lines = data[:end].decode('utf-8').splitlines()
+
+            generation = json.loads(lines[0])['generation'] if lines else 0
+
+            if generation > self._generation:
+                raise ValueError(
+                    f'{self.path} is newer than its snapshot'
+                )
+
+            # otherwise the journal is already contained in a newer snapshot
+            if lines and generation == self._generation:
+                for line in lines[1:]:
+                    self._replay(_load_mutation(line))
+
+                if end < len(data):
+                    os.truncate(self.path, end)
+
+                self._file = open(self.path, 'a', encoding='utf-8')
+
+                return
+
+        self._file = _create_journal(self.path, self._generation)
+
+    def _replay(self, mutation: Mutation):
+        """
+        Applies a journaled mutation to the in-memory index
+
+        :param mutation: the mutation to apply
+        :type mutation: model.Mutation
+        """
+        if mutation.mutation_class == 'creator':
+            self._insert(mutation.entry)
+        else:
+            self._remove(mutation.entry)
+
+        self._journal_len += 1
+
+    def close(self):
+        """
+        Closes the journal and releases its lock
+        """
+        self._file.close()
+        self._lock_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _append(self, mutations: Tuple[Mutation]):
+        """
+        Appends the mutations to the journal
+
+        :param mutations: the mutations to append
+        :type mutations: tuple[model.Mutation]
+        """
+        self._file.write(''.join(_dump_mutation(m) for m in mutations))
+        self._file.flush()
+
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+        self._journal_len += len(mutations)
+
+    def _maybe_snapshot(self):
+        """
+        Takes a snapshot if enough mutations have been journaled
+        """
+        if (
+            self.snapshot_every is not None and
+            self._journal_len >= self.snapshot_every
+        ):
+            self.snapshot()
+
+    def _publish_entry(self, entry: Entry):
+        self._append((Mutation('creator', entry),))
+
+        super()._publish_entry(entry)
+
+        self._maybe_snapshot()
+
+    def _publish_entries(self, entries: Tuple[Entry]):
+        self._append(tuple(Mutation('creator', entry) for entry in entries))
+
+        super()._publish_entries(entries)
+
+        self._maybe_snapshot()
+
+    def _retract_entry(self, entry: Entry):
+        self._append((Mutation('destroyer', entry),))
+
+        super()._retract_entry(entry)
+
+        self._maybe_snapshot()
+
+    def _retract_entries(self, entries: Tuple[Entry]):
+        self._append(tuple(Mutation('destroyer', entry) for entry in entries))
+
+        super()._retract_entries(entries)
+
+        self._maybe_snapshot()
+
+    def snapshot(self):
+        """
+        Writes the entries to the snapshot and starts an empty journal
+
+        The snapshot is written to a temporary file and renamed over the
+        old one, so a crash leaves either the old or the new snapshot.
+        """
+        generation = self._generation + 1
+
+        temporary = self.snapshot_path.with_name(
+            self.snapshot_path.name + '.tmp'
+        )
+
+        with open(temporary, 'w', encoding='utf-8') as file:
+            file.write(json.dumps({'generation': generation}) + '\n')
+
+            for entry in self:
+                file.write(_dump_entry(entry))
+
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temporary, self.snapshot_path)
+
+        self._generation = generation
+
+        self._file.close()
+        self._file = _create_journal(self.path, generation)
+        self._journal_len = 0
+
+
+def _dump_entry(entry: Entry) -> str:
+    """
+    Serializes the entry as a line of JSON
+    """
+    return json.dumps([
+        to_epoch_us(entry.start_time),
+        to_epoch_us(entry.end_time),
+        entry.category,
+        entry.description
+    ]) + '\n'
+
+
+def _load_entry(line: str) -> Entry:
+    """
+    Deserializes an entry from a line of JSON
+    """
+    return Entry.from_epoch_us(*json.loads(line))
+
+
+def _dump_mutation(mutation: Mutation) -> str:
+    """
+    Serializes the mutation as a line of JSON
+    """
+    return json.dumps([
+        mutation.mutation_class,
+        to_epoch_us(mutation.entry.start_time),
+        to_epoch_us(mutation.entry.end_time),
+        mutation.entry.category,
+        mutation.entry.description
+    ]) + '\n'
+
+
+def _load_mutation(line: str) -> Mutation:
+    """
+    Deserializes a mutation from a line of JSON
+    """
+    mutation_class, *fields = json.loads(line)
+
+    return Mutation(mutation_class, Entry.from_epoch_us(*fields))
+
+
+def _create_journal(path: Path, generation: int):
+    """
+    Atomically creates an empty journal and opens it for appending
+    """
+    temporary = path.with_name(path.name + '.tmp')
+
+    with open(temporary, 'w', encoding='utf-8') as file:
+        file.write(json.dumps({'generation': generation}) + '\n')
+
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(temporary, path)
+
+    return open(path, 'a', encoding='utf-8')
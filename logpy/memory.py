@@ -0,0 +1,566 @@
+from .controller import MutatorController
+from .model import Entry
+from .search import CategoryIndex, TokenIndex
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from heapq import merge
+from typing import (
+    Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Union
+)
+
+
+class MemoryController(MutatorController):
+    """
+    An in-memory controller that keeps its entries sorted by start time
+
+    The entries are stored as a sorted list of blocks. Each block holds a
+    sorted list of entries together with a parallel list of their start
+    times, and the last start time of every block is kept in `_maxes`.
+    Lookups bisect `_maxes` to find the block and then bisect the block, so
+    they are O(log n). Inserts and deletes only shift one block, which makes
+    them amortized O(sqrt n).
+
+    The total duration per category of every block is maintained as well, 
+    and a Fenwick tree over these totals answers `total_duration` by only
+    scanning the two blocks on the boundaries of the interval.
+
+    :param entries: the initial entries of the controller
+    :type entries: model.Entry
+    """
+    # the preferred number of entries in a block
+    _load = 1000
+
+    def __init__(self, *entries: Entry):
+        self._clear()
+        self._load_sorted(sorted(entries))
+
+    def _clear(self):
+        """
+        Removes all of the entries from the controller
+        """
+        # the entries of each block
+        self._entries: List[List[Entry]] = []
+
+        # the start times of each block (parallel to `_entries`)
+        self._starts: List[List[datetime]] = []
+
+        # the last start time of each block
+        self._maxes: List[datetime] = []
+
+        # the total duration (in microseconds) per category of each block
+        self._totals: List[Dict[str, int]] = []
+
+        # the Fenwick tree over `_totals`, rebuilt after blocks change
+        self._tree: Optional[List[Dict[str, int]]] = None
+
+        # the inverted index of the tokens, built on the first search
+        self._index: Optional[TokenIndex] = None
+
+        # the index of the categories, built on the first filtered query
+        self._category_index: Optional[CategoryIndex] = None
+
+        self._len = 0
+
+    def _load_sorted(self, entries: List[Entry]):
+        """
+        Replaces the blocks with the provided sorted entries
+
+        :param entries: the sorted entries to load
+        :type entries: list[model.Entry]
+        """
+        self._clear()
+
+        for i in range(0, len(entries), self._load):
+            block = entries[i:i + self._load]
+
+            self._entries.append(block)
+            self._starts.append([entry.start_time for entry in block])
+            self._maxes.append(block[-1].start_time)
+            self._totals.append(_totals(block))
+
+        self._len = len(entries)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Entry]:
+        for block in self._entries:
+            yield from block
+
+    def _position(self, dt: datetime) -> Tuple[int, int]:
+        """
+        Finds the position of the first entry that starts at or after dt
+
+        :param dt: The time to search for
+        :type dt: datetime.datetime
+        :return: the index of the block and the index within the block, or
+            (number of blocks, 0) if there is no such entry
+        :rtype: tuple[int, int]
+        """
+        i = bisect_left(self._maxes, dt)
+
+        if i == len(self._maxes):
+            return i, 0
+
+        return i, bisect_left(self._starts[i], dt)
+
+    def _find_first_after(self, dt: datetime) -> Optional[Entry]:
+        if dt.tzinfo != timezone.utc:
+            raise ValueError('dt.tzinfo must be utc')
+
+        i = bisect_left(self._maxes, dt)
+
+        if i == len(self._maxes):
+            return None
+
+        return self._entries[i][bisect_left(self._starts[i], dt)]
+
+    def _find_last_before(self, dt: datetime) -> Optional[Entry]:
+        if dt.tzinfo != timezone.utc:
+            raise ValueError('dt.tzinfo must be utc')
+
+        # every block before i ends at or before dt
+        i = bisect_right(self._maxes, dt)
+
+        if i < len(self._maxes):
+            j = bisect_right(self._starts[i], dt)
+
+            if j:
+                return self._entries[i][j - 1]
+
+        if i:
+            return self._entries[i - 1][-1]
+
+        return None
+
+    def _iter_range(
+        self,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Iterator[Entry]:
+        # the position of the first entry that starts at or after start_time
+        i, j = self._position(start_time)
+
+        # walk backwards over the entries that start before start_time
+        entries = []
+
+        bi, bj = i, j - 1
+
+        while True:
+            if bj < 0:
+                bi -= 1
+
+                if bi < 0:
+                    break
+
+                bj = len(self._entries[bi]) - 1
+
+            entry = self._entries[bi][bj]
+
+            if entry.end_time < start_time:
+                break
+
+            if entry.end_time > start_time:
+                entries.append(entry)
+
+            bj -= 1
+
+        yield from reversed(entries)
+
+        # walk forwards over the entries that start before end_time
+        for block in self._entries[i:]:
+            for entry in block[j:]:
+                if entry.start_time >= end_time:
+                    return
+
+                yield entry
+
+            j = 0
+
+    def _iter_categories(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        categories: FrozenSet[str]
+    ) -> Iterator[Entry]:
+        if self._category_index is None:
+            self._category_index = CategoryIndex(self)
+
+        return self._category_index.iter_range(
+            start_time,
+            end_time,
+            categories
+        )
+
+    def _search(
+        self,
+        query: str,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Iterator[Entry]:
+        if self._index is None:
+            self._index = TokenIndex(self)
+
+        return self._index.search(query, start_time, end_time)
+
+    def _publish_entry(self, entry: Entry):
+        self._insert(entry)
+
+    def _publish_entries(self, entries: Tuple[Entry]):
+        # inserting costs about one block per entry, so merging everything
+        # in one pass is cheaper for large batches
+        if len(entries) * self._load < self._len:
+            for entry in entries:
+                self._insert(entry)
+
+            return
+
+        self._load_sorted(list(merge(self, entries)))
+
+    def _retract_entry(self, entry: Entry):
+        self._remove(entry)
+
+    def _retract_entries(self, entries: Tuple[Entry]):
+        # removing costs about one block per entry, so filtering everything
+        # in one pass is cheaper for large batches
+        if len(entries) * self._load < self._len:
+            for entry in entries:
+                self._remove(entry)
+
+            return
+
+        removed = set(entries)
+
+        self._load_sorted([entry for entry in self if entry not in removed])
+
+    def _insert(self, entry: Entry):
+        """
+        Inserts the entry into its block
+
+        :param entry: the entry to insert
+        :type entry: model.Entry
+        """
+        if self._index is not None:
+            self._index.add(entry)
+
+        if self._category_index is not None:
+            self._category_index.add(entry)
+
+        if not self._maxes:
+            self._entries.append([entry])
+            self._starts.append([entry.start_time])
+            self._maxes.append(entry.start_time)
+            self._totals.append(_totals([entry]))
+            self._tree = None
+            self._len += 1
+
+            return
+
+        # the first block that could contain the start time
+        i = min(
+            bisect_left(self._maxes, entry.start_time),
+            len(self._maxes) - 1
+        )
+
+        block = self._entries[i]
+        j = bisect_right(block, entry)
+
+        block.insert(j, entry)
+        self._starts[i].insert(j, entry.start_time)
+        self._maxes[i] = self._starts[i][-1]
+        self._add_total(i, entry.category, _duration_us(entry))
+        self._len += 1
+
+        if len(block) > 2 * self._load:
+            self._split(i)
+
+    def _remove(self, entry: Entry):
+        """
+        Removes the entry from its block
+
+        :param entry: the entry to remove
+        :type entry: model.Entry
+        :raise KeyError: if the entry does not exist
+        """
+        i = bisect_left(self._maxes, entry.start_time)
+
+        # entries with the same start time may span several blocks
+        while i < len(self._maxes) and self._starts[i][0] <= entry.start_time:
+            block = self._entries[i]
+            j = bisect_left(block, entry)
+
+            if j < len(block) and block[j] == entry:
+                if self._index is not None:
+                    self._index.remove(entry)
+
+                if self._category_index is not None:
+                    self._category_index.remove(entry)
+
+                del block[j]
+                del self._starts[i][j]
+                self._add_total(i, entry.category, -_duration_us(entry))
+                self._len -= 1
+
+                if block:
+                    self._maxes[i] = self._starts[i][-1]
+
+                self._rebalance(i)
+
+                return
+
+            i += 1
+
+        raise KeyError(f'{entry} does not exist!')
+
+    def _split(self, i: int):
+        """
+        Splits the i-th block in two halves
+
+        :param i: the index of the block
+        :type i: int
+        """
+        block = self._entries[i]
+        starts = self._starts[i]
+        half = len(block) // 2
+
+        self._entries[i:i + 1] = [block[:half], block[half:]]
+        self._starts[i:i + 1] = [starts[:half], starts[half:]]
+        self._maxes[i:i + 1] = [starts[half - 1], starts[-1]]
+        self._totals[i:i + 1] = [_totals(block[:half]), _totals(block[half:])]
+        self._tree = None
+
+    def _rebalance(self, i: int):
+        """
+        Removes or merges the i-th block if it has become too small
+
+        :param i: the index of the block
+        :type i: int
+        """
+        if not self._entries[i]:
+            del self._entries[i]
+            del self._starts[i]
+            del self._maxes[i]
+            del self._totals[i]
+            self._tree = None
+
+            return
+
+        if len(self._entries[i]) >= self._load // 2 or len(self._maxes) == 1:
+            return
+
+        # merge with the previous block, unless this is the first one
+        if i == 0:
+            i = 1
+
+        self._entries[i - 1] += self._entries.pop(i)
+        self._starts[i - 1] += self._starts.pop(i)
+        self._maxes[i - 1] = self._maxes.pop(i)
+        _add_totals(self._totals[i - 1], self._totals.pop(i))
+        self._tree = None
+
+        if len(self._entries[i - 1]) > 2 * self._load:
+            self._split(i - 1)
+
+    def _add_total(self, i: int, category: str, duration: int):
+        """
+        Adds the duration to the totals of the i-th block
+
+        :param i: the index of the block
+        :type i: int
+        :param category: the category of the duration
+        :type category: str
+        :param duration: the duration in microseconds (may be negative)
+        :type duration: int
+        """
+        totals = self._totals[i]
+        totals[category] = totals.get(category, 0) + duration
+
+        if self._tree is None:
+            return
+
+        while i < len(self._tree):
+            totals = self._tree[i]
+            totals[category] = totals.get(category, 0) + duration
+
+            i |= i + 1
+
+    def _prefix_totals(self, k: int) -> Dict[str, int]:
+        """
+        Sums the totals of the first k blocks with the Fenwick tree
+
+        :param k: the number of blocks
+        :type k: int
+        :return: the total duration (in microseconds) per category
+        :rtype: dict[str, int]
+        """
+        if self._tree is None:
+            self._tree = [dict(totals) for totals in self._totals]
+
+            for i, totals in enumerate(self._tree):
+                parent = i | (i + 1)
+
+                if parent < len(self._tree):
+                    _add_totals(self._tree[parent], totals)
+
+        result = {}
+
+        k -= 1
+
+        while k >= 0:
+            _add_totals(result, self._tree[k])
+
+            k = (k & (k + 1)) - 1
+
+        return result
+
+    def total_duration(
+        self, 
+        start_time: datetime, 
+        end_time: datetime, 
+        by: Optional[str] = 'category',
+        categories: Optional[Iterable[str]] = None
+    ) -> Union[Dict[str, timedelta], timedelta]:
+        """
+        Sums the durations of the entries within the interval
+
+        The blocks that are fully inside the interval are summed with the
+        Fenwick tree, so only the two boundary blocks are scanned and only
+        the two boundary entries are clipped. The totals are kept per
+        category, so filtering the categories costs nothing extra. The
+        entries are assumed not to overlap, as enforced by `create_entry`.
+
+        :param start_time: The start time of the interval (must be utc)
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval (must be utc)
+        :type end_time: datetime.datetime
+        :param by: 'category' to sum per category, or None for a single 
+            total, defaults to 'category'
+        :type by: 'category' or None
+        :param categories: only include the entries of these categories,
+            defaults to None (every category)
+        :type categories: Iterable[str] or None
+        :raise ValueError: if `by` is not 'category' nor None
+        :return: the total duration per category, or the total duration
+        :rtype: dict[str, datetime.timedelta] or datetime.timedelta
+        """
+        if start_time.tzinfo != timezone.utc:
+            raise ValueError('start_time.tzinfo must be utc')
+
+        if end_time.tzinfo != timezone.utc:
+            raise ValueError('end_time.tzinfo must be utc')
+
+        if by not in {'category', None}:
+            raise ValueError('by must be \'category\' or None')
+
+        totals = {}
+
+        # the entries from (i, j) up to (k, l) start within the interval
+        i, j = self._position(start_time)
+        k, l = self._position(end_time)
+
+        if (i, j) < (k, l):
+            if i == k:
+                _add_totals(totals, _totals(self._entries[i][j:l]))
+            else:
+                _add_totals(totals, _totals(self._entries[i][j:]))
+
+                if i + 1 < k:
+                    _add_totals(totals, self._prefix_totals(k))
+                    _sub_totals(totals, self._prefix_totals(i + 1))
+
+                if l:
+                    _add_totals(totals, _totals(self._entries[k][:l]))
+
+            # clip the last entry that starts within the interval
+            last = self._before(k, l)
+
+            if last.end_time > end_time:
+                _add_totals(totals, {
+                    last.category: 
+                        -((last.end_time - end_time) // timedelta.resolution)
+                })
+
+        # add the entry that straddles the start of the interval
+        previous = self._before(i, j)
+
+        if previous and previous.end_time > start_time:
+            _add_totals(totals, {
+                previous.category: (
+                    min(previous.end_time, end_time) - start_time
+                ) // timedelta.resolution
+            })
+
+        if categories is not None:
+            categories = frozenset(categories)
+
+            totals = {
+                category: total
+                for category, total in totals.items()
+                if category in categories
+            }
+
+        if by is None:
+            return timedelta(microseconds=sum(totals.values()))
+
+        return {
+            category: timedelta(microseconds=total)
+            for category, total in totals.items()
+            if total
+        }
+
+    def _before(self, i: int, j: int) -> Optional[Entry]:
+        """
+        Finds the entry before the position
+
+        :param i: the index of the block
+        :type i: int
+        :param j: the index within the block
+        :type j: int
+        :return: the entry before the position, or None at the start
+        :rtype: model.Entry or None
+        """
+        if j:
+            return self._entries[i][j - 1]
+
+        if i:
+            return self._entries[i - 1][-1]
+
+        return None
+
+
+def _duration_us(entry: Entry) -> int:
+    """
+    The duration of the entry in microseconds
+    """
+    return (entry.end_time - entry.start_time) // timedelta.resolution
+
+
+def _totals(entries: Iterable[Entry]) -> Dict[str, int]:
+    """
+    Sums the durations (in microseconds) of the entries per category
+    """
+    totals = {}
+
+    for entry in entries:
+        totals[entry.category] = (
+            totals.get(entry.category, 0) + _duration_us(entry)
+        )
+
+    return totals
+
+
+def _add_totals(totals: Dict[str, int], other: Dict[str, int]):
+    """
+    Adds the other totals to the totals in place
+    """
+    for category, total in other.items():
+        totals[category] = totals.get(category, 0) + total
+
+
+def _sub_totals(totals: Dict[str, int], other: Dict[str, int]):
+    """
+    Subtracts the other totals from the totals in place
+    """
+    for category, total in other.items():
+        totals[category] = totals.get(category, 0) - total
@@ -1,9 +1,64 @@
+from array import array
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Self, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Self, Union
 
 
-@dataclass(frozen=True, order=True)
+# the start of the unix epoch, the origin of epoch microsecond timestamps
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def to_epoch_us(dt: datetime) -> int:
+    """
+    Converts a datetime to microseconds since the unix epoch
+
+    :param dt: the datetime to convert (must be utc)
+    :type dt: datetime.datetime
+    :raise ValueError: if `dt` is not UTC
+    :return: the number of microseconds since the unix epoch
+    :rtype: int
+    """
+
+    if dt.tzinfo != timezone.utc:
+        raise ValueError("dt.tzinfo must be datetime.timezone.utc")
+
+    return (dt - EPOCH) // timedelta.resolution
+
+
+def from_epoch_us(us: int) -> datetime:
+    """
+    Converts microseconds since the unix epoch to a UTC datetime
+
+    :param us: the number of microseconds since the unix epoch
+    :type us: int
+    :return: the respective datetime in UTC
+    :rtype: datetime.datetime
+    """
+
+    # the positional form skips the keyword parsing of timedelta
+    return EPOCH + timedelta(0, 0, us)
+
+
+def parse_time(value: str) -> datetime:
+    """
+    Parses an ISO 8601 time, times without a timezone are taken to be utc
+
+    :param value: the time to parse
+    :type value: str
+    :raise ValueError: if `value` is not an ISO 8601 time
+    :return: the time in utc
+    :rtype: datetime.datetime
+    """
+
+    dt = datetime.fromisoformat(value)
+
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+
+    return dt.astimezone(timezone.utc)
+
+
+@dataclass(frozen=True, order=True, slots=True)
 class Entry:
     """
     Frozen dataclass for log entries
@@ -42,6 +97,82 @@ class Entry:
         if self.end_time <= self.start_time:
             raise ValueError("end_time must be after start_time")
         
+    @classmethod
+    def _trusted(
+        cls,
+        start_time: datetime,
+        end_time: datetime,
+        category: str,
+        description: str = ''
+    ) -> Self:
+        """
+        Creates an Entry without validating it
+
+        Only use this for values that are already known to be valid, e.g. 
+        values that were validated once before being stored.
+
+        :param start_time: the start time of the entry (must be utc)
+        :type start_time: datetime.datetime
+        :param end_time: the end time of the entry (must be utc)
+        :type end_time: datetime.datetime
+        :param category: the category of the entry
+        :type category: str
+        :param description: the description of the entry, defaults to ''
+        :type description: str
+        :return: the entry
+        :rtype: Entry
+        """
+
+        entry = _new(cls)
+
+        _set_start_time(entry, start_time)
+        _set_end_time(entry, end_time)
+        _set_category(entry, category)
+        _set_description(entry, description)
+
+        return entry
+
+    @classmethod
+    def from_epoch_us(
+        cls,
+        start_us: int,
+        end_us: int,
+        category: str,
+        description: str = ''
+    ) -> Self:
+        """
+        Creates an Entry from start and end times in epoch microseconds
+
+        The times are UTC by construction, so only their order is checked.
+        Converting the integers to datetimes still costs more than the checks
+        it saves; this is the path for data that is stored as integers, not a
+        faster replacement for `Entry(...)` when the datetimes already exist.
+
+        :param start_us: the start time in epoch microseconds
+        :type start_us: int
+        :param end_us: the end time in epoch microseconds
+        :type end_us: int
+        :param category: the category of the entry
+        :type category: str
+        :param description: the description of the entry, defaults to ''
+        :type description: str
+        :raise ValueError: if `end_us` is not after `start_us`
+        :return: the entry
+        :rtype: Entry
+        """
+
+        if end_us <= start_us:
+            raise ValueError("end_us must be after start_us")
+
+        entry = _new(cls)
+
+        _set_start_time(entry, EPOCH + timedelta(0, 0, start_us))
+        _set_end_time(entry, EPOCH + timedelta(0, 0, end_us))
+        _set_category(entry, category)
+        _set_description(entry, description)
+
+        return entry
+
     def intersection(
         self, 
         start_time: datetime, 
@@ -80,7 +211,8 @@ class Entry:
         if end_time <= self.start_time: 
             return None
 
-        return Entry(
+        # the interval is validated above, so the result is valid too
+        return Entry._trusted(
             max(self.start_time, start_time), 
             min(self.end_time, end_time), 
             self.category, 
@@ -102,7 +234,16 @@ class Entry:
         return self.end_time - self.start_time
 
 
-@dataclass(frozen=True)
+# the slot descriptors of Entry set the fields directly, bypassing the frozen
+# __setattr__, which makes them the cheapest way to fill a new instance
+_new = object.__new__
+_set_start_time = Entry.start_time.__set__
+_set_end_time = Entry.end_time.__set__
+_set_category = Entry.category.__set__
+_set_description = Entry.description.__set__
+
+
+@dataclass(frozen=True, slots=True)
 class Mutation:
     """
     Forzen dataclass representing a mutation (an action that modifies the log)
@@ -122,3 +263,162 @@ class Mutation:
             raise ValueError(
                 'mutation_class must be \'creator\' or \'destroyer\''
             )
+
+
+class EntryTable:
+    """
+    A columnar table of entries
+
+    The start and end times are stored as epoch microseconds in `array` 
+    buffers (`start_us` and `end_us`, typecode 'q'), and the categories are
+    dictionary-encoded as small integers (`category_ids`). Entry objects are
+    only created on demand, when the table is indexed or iterated.
+
+    The buffers support the buffer protocol, so they can be wrapped without
+    copying, e.g. with `numpy.frombuffer(table.start_us, dtype='int64')`.
+
+    :param entries: the initial entries of the table, defaults to ()
+    :type entries: Iterable[model.Entry]
+    """
+
+    def __init__(self, entries: Iterable[Entry] = ()):
+        self.start_us = array('q')
+        self.end_us = array('q')
+        self.category_ids = array('I')
+        self.descriptions: List[str] = []
+
+        # the dictionary of the categories
+        self.categories: List[str] = []
+        self._category_ids: Dict[str, int] = {}
+
+        self.extend(entries)
+
+    def _encode_category(self, category: str) -> int:
+        """
+        Finds the id of the category, adding it to the dictionary if needed
+
+        :param category: the category to encode
+        :type category: str
+        :return: the id of the category
+        :rtype: int
+        """
+
+        category_id = self._category_ids.get(category)
+
+        if category_id is None:
+            category_id = len(self.categories)
+
+            self.categories.append(category)
+            self._category_ids[category] = category_id
+
+        return category_id
+
+    def append(self, entry: Entry):
+        """
+        Appends an entry to the end of the table
+
+        :param entry: the entry to append
+        :type entry: model.Entry
+        """
+
+        self.append_us(
+            to_epoch_us(entry.start_time),
+            to_epoch_us(entry.end_time),
+            entry.category,
+            entry.description
+        )
+
+    def append_us(
+        self,
+        start_us: int,
+        end_us: int,
+        category: str,
+        description: str = ''
+    ):
+        """
+        Appends a row, given in epoch microseconds, to the end of the table
+
+        :param start_us: the start time in epoch microseconds
+        :type start_us: int
+        :param end_us: the end time in epoch microseconds
+        :type end_us: int
+        :param category: the category of the entry
+        :type category: str
+        :param description: the description of the entry, defaults to ''
+        :type description: str
+        :raise ValueError: if `end_us` is not after `start_us`
+        """
+
+        if end_us <= start_us:
+            raise ValueError("end_us must be after start_us")
+
+        self.start_us.append(start_us)
+        self.end_us.append(end_us)
+        self.category_ids.append(self._encode_category(category))
+        self.descriptions.append(description)
+
+    def extend(self, entries: Iterable[Entry]):
+        """
+        Appends the entries to the end of the table
+
+        :param entries: the entries to append
+        :type entries: Iterable[model.Entry]
+        """
+
+        for entry in entries:
+            self.append(entry)
+
+    def _entry(self, i: int) -> Entry:
+        """
+        Creates the Entry object of the i-th row
+
+        :param i: the index of the row
+        :type i: int
+        :return: the entry of the row
+        :rtype: model.Entry
+        """
+
+        # the rows are validated when they are appended
+        return Entry._trusted(
+            from_epoch_us(self.start_us[i]),
+            from_epoch_us(self.end_us[i]),
+            self.categories[self.category_ids[i]],
+            self.descriptions[i]
+        )
+
+    def __len__(self) -> int:
+        return len(self.start_us)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Entry, Self]:
+        if isinstance(key, slice):
+            table = EntryTable()
+
+            table.start_us = self.start_us[key]
+            table.end_us = self.end_us[key]
+            table.category_ids = self.category_ids[key]
+            table.descriptions = self.descriptions[key]
+            table.categories = list(self.categories)
+            table._category_ids = dict(self._category_ids)
+
+            return table
+
+        if key < 0:
+            key += len(self)
+
+        if not 0 <= key < len(self):
+            raise IndexError('EntryTable index out of range')
+
+        return self._entry(key)
+
+    def __iter__(self) -> Iterator[Entry]:
+        for i in range(len(self)):
+            yield self._entry(i)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, EntryTable):
+            return NotImplemented
+
+        return tuple(self) == tuple(other)
+
+    def __repr__(self) -> str:
+        return f'EntryTable({len(self)} entries)'
@@ -0,0 +1,220 @@
+from .model import Entry
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from heapq import merge
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Set
+
+import re
+
+
+_TOKEN = re.compile(r'[^\W_]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits the text into lowercase tokens of letters and digits
+
+    :param text: the text to split
+    :type text: str
+    :return: the tokens, in order
+    :rtype: list[str]
+    """
+    return _TOKEN.findall(text.lower())
+
+
+def entry_tokens(entry: Entry) -> Set[str]:
+    """
+    The tokens of the category and description of the entry
+
+    :param entry: the entry
+    :type entry: model.Entry
+    :return: the tokens
+    :rtype: set[str]
+    """
+    return set(tokenize(entry.category)) | set(tokenize(entry.description))
+
+
+class PostingIndex(ABC):
+    """
+    An abstract base class for indexes from keys to the entries that have them
+
+    Every posting list is sorted by start time, so the entries within an
+    interval are found by bisection. The bisection by end time assumes that
+    the entries do not overlap.
+
+    :param entries: the initial entries of the index, defaults to ()
+    :type entries: Iterable[model.Entry]
+    """
+
+    def __init__(self, entries: Iterable[Entry] = ()):
+        self._postings: Dict[str, List[Entry]] = {}
+
+        for entry in entries:
+            self.add(entry)
+
+    @abstractmethod
+    def _keys(self, entry: Entry) -> Iterable[str]:
+        """
+        The keys of the entry
+
+        :param entry: the entry
+        :type entry: model.Entry
+        :raise NotImplementedError: if the method is not implemented by a
+            subclass
+        :return: the keys of the entry
+        :rtype: Iterable[str]
+        """
+
+    def add(self, entry: Entry):
+        """
+        Adds the entry to the posting lists of its keys
+
+        :param entry: the entry to add
+        :type entry: model.Entry
+        """
+
+        for key in self._keys(entry):
+            postings = self._postings.setdefault(key, [])
+
+            # appending is the common case, as entries are logged in order
+            if not postings or postings[-1] < entry:
+                postings.append(entry)
+            else:
+                insort(postings, entry)
+
+    def remove(self, entry: Entry):
+        """
+        Removes the entry from the posting lists of its keys
+
+        :param entry: the entry to remove
+        :type entry: model.Entry
+        """
+
+        for key in self._keys(entry):
+            postings = self._postings[key]
+
+            del postings[bisect_left(postings, entry)]
+
+            if not postings:
+                del self._postings[key]
+
+    def _window(
+        self,
+        postings: List[Entry],
+        start_time: datetime,
+        end_time: datetime
+    ) -> List[Entry]:
+        """
+        The entries of the posting list that intersect with the interval
+        """
+
+        # the first entry that ends after the start of the interval
+        i = bisect_right(
+            postings,
+            start_time,
+            key=lambda entry: entry.end_time
+        )
+
+        # the first entry that starts at or after the end of the interval
+        j = bisect_left(
+            postings,
+            end_time,
+            key=lambda entry: entry.start_time
+        )
+
+        return postings[i:j]
+
+
+class TokenIndex(PostingIndex):
+    """
+    An inverted index from tokens to the entries that contain them
+
+    A query only walks the posting list of its rarest token and checks the
+    other tokens on the entries themselves.
+
+    :param entries: the initial entries of the index, defaults to ()
+    :type entries: Iterable[model.Entry]
+    """
+
+    def _keys(self, entry: Entry) -> Set[str]:
+        return entry_tokens(entry)
+
+    def search(
+        self,
+        query: str,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Iterator[Entry]:
+        """
+        Finds the entries that contain every token of the query and
+        intersect with the interval
+
+        :param query: the text to search for
+        :type query: str
+        :param start_time: The start time of the interval
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval
+        :type end_time: datetime.datetime
+        :return: An iterator over the matching entries, in order of their
+            start times
+        :rtype: Iterator[model.Entry]
+        """
+
+        tokens = set(tokenize(query))
+
+        if not tokens:
+            return
+
+        postings = []
+
+        for token in tokens:
+            if token not in self._postings:
+                return
+
+            postings.append(self._postings[token])
+
+        rarest = min(postings, key=len)
+
+        for entry in self._window(rarest, start_time, end_time):
+            if len(tokens) == 1 or tokens <= entry_tokens(entry):
+                yield entry
+
+
+class CategoryIndex(PostingIndex):
+    """
+    An index from categories to their entries
+
+    :param entries: the initial entries of the index, defaults to ()
+    :type entries: Iterable[model.Entry]
+    """
+
+    def _keys(self, entry: Entry) -> Iterable[str]:
+        return (entry.category,)
+
+    def iter_range(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        categories: FrozenSet[str]
+    ) -> Iterator[Entry]:
+        """
+        Iterates over the entries of the categories that intersect with the
+        interval, without touching the entries of other categories
+
+        :param start_time: The start time of the interval
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval
+        :type end_time: datetime.datetime
+        :param categories: the categories to include
+        :type categories: frozenset[str]
+        :return: An iterator over the entries, in order of their start times
+        :rtype: Iterator[model.Entry]
+        """
+
+        return merge(*(
+            self._window(self._postings[category], start_time, end_time)
+            for category in categories
+            if category in self._postings
+        ))
@@ -0,0 +1,394 @@
+from .controller import Controller
+from .model import Entry, EntryTable, from_epoch_us, to_epoch_us
+
+from datetime import datetime, timezone
+from pathlib import Path
+from tempfile import TemporaryFile
+from typing import Dict, FrozenSet, Iterable, Iterator, Optional, Union
+
+import json
+import mmap
+import shutil
+import struct
+
+
+# magic (with the format version), number of records, categories offset
+_HEADER = struct.Struct('<8sQQ')
+
+# start_us, end_us, description offset, description length, category id
+_RECORD = struct.Struct('<qqQII')
+
+# the start_us field at the beginning of a record
+_START = struct.Struct('<q')
+
+_MAGIC = b'LOGPYSG1'
+
+
+def write_segment(path: Union[str, Path], entries: Iterable[Entry]):
+    """
+    Writes the entries to a segment file
+
+    A segment starts with a header, followed by one fixed-width record per
+    entry (sorted by start time), the utf-8 encoded descriptions and finally
+    the JSON encoded list of categories. The entries are streamed, so they
+    are never held in memory all at once.
+
+    :param path: the path of the segment file
+    :type path: str or pathlib.Path
+    :param entries: the entries, sorted by start time
+    :type entries: Iterable[model.Entry]
+    :raise ValueError: if the entries are not sorted by start time
+    """
+
+    categories: Dict[str, int] = {}
+
+    count = 0
+    previous_us = None
+
+    with open(path, 'wb') as file, TemporaryFile() as descriptions:
+        # reserve the space of the header
+        file.write(bytes(_HEADER.size))
+
+        description_offset = 0
+
+        for entry in entries:
+            start_us = to_epoch_us(entry.start_time)
+
+            if previous_us is not None and start_us < previous_us:
+                raise ValueError('entries must be sorted by start time')
+
+            previous_us = start_us
+
+            description = entry.description.encode('utf-8')
+
+            file.write(_RECORD.pack(
+                start_us,
+                to_epoch_us(entry.end_time),
+                description_offset,
+                len(description),
+                categories.setdefault(entry.category, len(categories))
+            ))
+
+            descriptions.write(description)
+            description_offset += len(description)
+
+            count += 1
+
+        descriptions.seek(0)
+        shutil.copyfileobj(descriptions, file)
+
+        categories_offset = file.tell()
+
+        file.write(json.dumps(list(categories)).encode('utf-8'))
+
+        file.seek(0)
+        file.write(_HEADER.pack(_MAGIC, count, categories_offset))
+
+
+class SegmentController(Controller):
+    """
+    A read-only controller over a memory-mapped segment file
+
+    The records are bisected directly in the mapped buffer, so opening the
+    segment does not parse it and only the pages of the queried records are
+    loaded. Segments are written with `write_segment`.
+
+    :param path: the path of the segment file
+    :type path: str or pathlib.Path
+    :raise ValueError: if the file is not a segment
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self._len, categories_offset = _HEADER.unpack_from(self._map)
+
+        if magic != _MAGIC:
+            self.close()
+
+            raise ValueError(f'{path} is not a segment file')
+
+        # the descriptions are stored right after the records
+        self._descriptions_offset = _HEADER.size + self._len * _RECORD.size
+
+        self._categories = json.loads(
+            self._map[categories_offset:].decode('utf-8')
+        )
+
+    def close(self):
+        """
+        Closes the segment file
+        """
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _record(self, i: int):
+        """
+        Unpacks the i-th record
+
+        :param i: the index of the record
+        :type i: int
+        :return: the start_us, end_us, description offset, description
+            length and category id of the record
+        :rtype: tuple
+        """
+        return _RECORD.unpack_from(self._map, _HEADER.size + i * _RECORD.size)
+
+    def _start_us(self, i: int) -> int:
+        """
+        Unpacks the start time of the i-th record
+
+        :param i: the index of the record
+        :type i: int
+        :return: the start time in epoch microseconds
+        :rtype: int
+        """
+        return _START.unpack_from(
+            self._map, _HEADER.size + i * _RECORD.size
+        )[0]
+
+    def _entry(self, i: int) -> Entry:
+        """
+        Creates the Entry of the i-th record
+
+        :param i: the index of the record
+        :type i: int
+        :return: the entry of the record
+        :rtype: model.Entry
+        """
+        start_us, end_us, offset, length, category_id = self._record(i)
+
+        # the records were validated when the segment was written
+        return Entry._trusted(
+            from_epoch_us(start_us),
+            from_epoch_us(end_us),
+            self._categories[category_id],
+            self._description(offset, length)
+        )
+
+    def _description(self, offset: int, length: int) -> str:
+        """
+        Decodes a description
+
+        :param offset: the offset of the description
+        :type offset: int
+        :param length: the length of the encoded description
+        :type length: int
+        :return: the description
+        :rtype: str
+        """
+        offset += self._descriptions_offset
+
+        return self._map[offset:offset + length].decode('utf-8')
+
+    def _bisect_left(self, us: int) -> int:
+        """
+        Finds the index of the first record that starts at or after us
+
+        :param us: the time in epoch microseconds
+        :type us: int
+        :return: the index of the record, or the number of records
+        :rtype: int
+        """
+        lo, hi = 0, self._len
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+
+            if self._start_us(mid) < us:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        return lo
+
+    def _bisect_right(self, us: int) -> int:
+        """
+        Finds the index of the first record that starts after us
+
+        :param us: the time in epoch microseconds
+        :type us: int
+        :return: the index of the record, or the number of records
+        :rtype: int
+        """
+        lo, hi = 0, self._len
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+
+            if us < self._start_us(mid):
+                hi = mid
+            else:
+                lo = mid + 1
+
+        return lo
+
+    def _find_first_after(self, dt: datetime) -> Optional[Entry]:
+        i = self._bisect_left(to_epoch_us(dt))
+
+        if i == self._len:
+            return None
+
+        return self._entry(i)
+
+    def _find_last_before(self, dt: datetime) -> Optional[Entry]:
+        i = self._bisect_right(to_epoch_us(dt))
+
+        if i == 0:
+            return None
+
+        return self._entry(i - 1)
+
+    def _iter_range_indices(
+        self, 
+        start_us: int, 
+        end_us: int
+    ) -> Iterator[int]:
+        """
+        Iterates over the indices of the records that intersect with the
+        interval, in order of their start times
+
+        :param start_us: the start of the interval in epoch microseconds
+        :type start_us: int
+        :param end_us: the end of the interval in epoch microseconds
+        :type end_us: int
+        :return: an iterator over the indices
+        :rtype: Iterator[int]
+        """
+        first = self._bisect_left(start_us)
+
+        # walk backwards over the records that start before start_us
+        indices = []
+
+        i = first - 1
+
+        while i >= 0:
+            record_end_us = self._record(i)[1]
+
+            if record_end_us < start_us:
+                break
+
+            if record_end_us > start_us:
+                indices.append(i)
+
+            i -= 1
+
+        yield from reversed(indices)
+
+        # walk forwards over the records that start before end_us
+        i = first
+
+        while i < self._len and self._start_us(i) < end_us:
+            yield i
+
+            i += 1
+
+    def _iter_range(
+        self,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Iterator[Entry]:
+        for i in self._iter_range_indices(
+            to_epoch_us(start_time),
+            to_epoch_us(end_time)
+        ):
+            yield self._entry(i)
+
+    def _category_ids(self, categories: Iterable[str]) -> FrozenSet[int]:
+        """
+        Finds the ids of the categories in the segment
+
+        :param categories: the categories
+        :type categories: Iterable[str]
+        :return: the ids of the categories that occur in the segment
+        :rtype: frozenset[int]
+        """
+        return frozenset(
+            category_id
+            for category_id, category in enumerate(self._categories)
+            if category in categories
+        )
+
+    def _iter_categories(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        categories: FrozenSet[str]
+    ) -> Iterator[Entry]:
+        category_ids = self._category_ids(categories)
+
+        # the records of other categories are skipped without decoding them
+        for i in self._iter_range_indices(
+            to_epoch_us(start_time),
+            to_epoch_us(end_time)
+        ):
+            if self._record(i)[4] in category_ids:
+                yield self._entry(i)
+
+    def get_intersection_table(
+        self,
+        start_time,
+        end_time,
+        categories: Optional[Iterable[str]] = None
+    ) -> EntryTable:
+        """
+        Creates a columnar table of entries that intersect with the interval
+
+        The records are clipped and copied into the table directly, without
+        creating Entry objects.
+
+        :param start_time: The start time of the interval (must be utc)
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval (must be utc)
+        :type end_time: datetime.datetime
+        :param categories: only include the entries of these categories,
+            defaults to None (every category)
+        :type categories: Iterable[str] or None
+        :return: A table of entry intersections with the interval
+        :rtype: model.EntryTable
+        """
+
+        # check that start_time is utc
+        if start_time.tzinfo != timezone.utc:
+            raise ValueError('start_time.tzinfo must be utc')
+
+        # check that end_time is utc
+        if end_time.tzinfo != timezone.utc:
+            raise ValueError('end_time.tzinfo must be utc')
+
+        start_us = to_epoch_us(start_time)
+        end_us = to_epoch_us(end_time)
+
+        category_ids = None
+
+        if categories is not None:
+            category_ids = self._category_ids(frozenset(categories))
+
+        table = EntryTable()
+
+        for i in self._iter_range_indices(start_us, end_us):
+            (
+                record_start_us, record_end_us, offset, length, category_id
+            ) = self._record(i)
+
+            if category_ids is not None and category_id not in category_ids:
+                continue
+
+            table.append_us(
+                max(record_start_us, start_us),
+                min(record_end_us, end_us),
+                self._categories[category_id],
+                self._description(offset, length)
+            )
+
+        return table
@@ -0,0 +1,514 @@
+from .controller import MutatorController
+from .model import Entry, EntryTable
+from .search import entry_tokens, tokenize
+
+from bisect import bisect_left, bisect_right
+from concurrent.futures import Executor
+from datetime import datetime, timedelta, timezone
+from itertools import groupby, repeat
+from typing import (
+    Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple,
+    Union
+)
+
+
+# the queries of a single shard, run in the workers of the executor
+def _get_intersection(
+    shard: MutatorController,
+    start_time: datetime,
+    end_time: datetime,
+    categories: Optional[FrozenSet[str]]
+) -> Tuple[Entry]:
+    return shard.get_intersection(start_time, end_time, categories)
+
+
+def _get_intersection_table(
+    shard: MutatorController,
+    start_time: datetime,
+    end_time: datetime,
+    categories: Optional[FrozenSet[str]]
+) -> EntryTable:
+    return shard.get_intersection_table(start_time, end_time, categories)
+
+
+def _total_duration(
+    shard: MutatorController,
+    start_time: datetime,
+    end_time: datetime,
+    categories: Optional[FrozenSet[str]]
+) -> Dict[str, timedelta]:
+    return shard.total_duration(start_time, end_time, categories=categories)
+
+
+def by_month(dt: datetime) -> datetime:
+    """
+    The start of the (UTC) month of the time
+
+    :param dt: the time
+    :type dt: datetime.datetime
+    :return: the start of the month
+    :rtype: datetime.datetime
+    """
+    return datetime(dt.year, dt.month, 1, tzinfo=timezone.utc)
+
+
+def by_year(dt: datetime) -> datetime:
+    """
+    The start of the (UTC) year of the time
+
+    :param dt: the time
+    :type dt: datetime.datetime
+    :return: the start of the year
+    :rtype: datetime.datetime
+    """
+    return datetime(dt.year, 1, 1, tzinfo=timezone.utc)
+
+
+class ShardedController(MutatorController):
+    """
+    A controller that partitions the entries across child controllers by
+    time range
+
+    Every entry is owned by the shard of its start time, so an entry that
+    crosses the boundary of its shard is stored once, in the shard it starts
+    in. The shards are created with the factory on the first entry that
+    falls into them. Lookups are routed to the owning shard and only move on
+    to the neighbouring shards if it has no matching entry.
+
+    `get_intersection`, `get_intersection_table` and `total_duration` query
+    every shard of the interval, in parallel if an executor is provided, and
+    concatenate the results: the shards partition the start times, so the
+    results of consecutive shards are already in order. The executor must
+    share the shards with the controller, i.e. be a
+    `concurrent.futures.ThreadPoolExecutor`, and only the work of the shards
+    that releases the GIL runs in parallel, such as the aggregate query of
+    `sqlite.SQLiteController.total_duration`. Shards that hold the GIL, such
+    as `memory.MemoryController`, are best queried without an executor.
+
+    The batch mutations are all or nothing across the shards as well: if a
+    shard fails, the shards that were already written are restored.
+
+    Range queries assume that the entries do not overlap, as enforced by
+    `create_entry`.
+
+    :param factory: creates the (empty) controller of the shard starting at
+        the given time
+    :type factory: Callable[[datetime.datetime], controller.MutatorController]
+    :param key: maps a time to the start of its shard, defaults to `by_month`
+    :type key: Callable[[datetime.datetime], datetime.datetime]
+    :param executor: the executor to query the shards in, defaults to None
+        (the shards are queried one after the other)
+    :type executor: concurrent.futures.Executor or None
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[datetime], MutatorController],
+        key: Callable[[datetime], datetime] = by_month,
+        executor: Optional[Executor] = None
+    ):
+        self.factory = factory
+        self.key = key
+        self.executor = executor
+
+        # the shards by the start of their time range
+        self.shards: Dict[datetime, MutatorController] = {}
+
+        # the sorted starts of the shards
+        self._keys: List[datetime] = []
+
+    def close(self):
+        """
+        Closes the shards that can be closed
+        """
+        for shard in self.shards.values():
+            if hasattr(shard, 'close'):
+                shard.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self.shards.values())
+
+    def _shard(self, dt: datetime) -> MutatorController:
+        """
+        Finds the shard of the time, creating it if it does not exist
+
+        :param dt: the time
+        :type dt: datetime.datetime
+        :return: the shard
+        :rtype: controller.MutatorController
+        """
+
+        key = self.key(dt)
+
+        shard = self.shards.get(key)
+
+        if shard is None:
+            shard = self.shards[key] = self.factory(key)
+
+            self._keys.insert(bisect_left(self._keys, key), key)
+
+        return shard
+
+    def _find_first_after(self, dt: datetime) -> Optional[Entry]:
+        if dt.tzinfo != timezone.utc:
+            raise ValueError('dt.tzinfo must be utc')
+
+        # the shards that own start times after or at dt
+        for key in self._keys[bisect_left(self._keys, self.key(dt)):]:
+            entry = self.shards[key]._find_first_after(dt)
+
+            if entry is not None:
+                return entry
+
+        return None
+
+    def _find_last_before(self, dt: datetime) -> Optional[Entry]:
+        if dt.tzinfo != timezone.utc:
+            raise ValueError('dt.tzinfo must be utc')
+
+        # the shards that own start times before or at dt
+        for key in reversed(self._keys[:bisect_right(self._keys, dt)]):
+            entry = self.shards[key]._find_last_before(dt)
+
+            if entry is not None:
+                return entry
+
+        return None
+
+    def _split(
+        self,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Tuple[Optional[Entry], List[Tuple[MutatorController, datetime]]]:
+        """
+        Splits an interval by the shards
+
+        :param start_time: The start time of the interval
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval
+        :type end_time: datetime.datetime
+        :return: the entry of an earlier shard that crosses into the
+            interval (if any), and the shards that own start times within
+            the interval, each with the start of its part of the interval
+        :rtype: tuple
+        """
+
+        i = bisect_left(self._keys, self.key(start_time))
+        j = bisect_left(self._keys, end_time)
+
+        parts = [
+            (self.shards[key], max(key, start_time))
+            for key in self._keys[i:j]
+        ]
+
+        # only the last entry of an earlier shard can cross into the interval
+        straddler = None
+
+        for key in reversed(self._keys[:i]):
+            entry = self.shards[key]._find_last_before(start_time)
+
+            if entry is not None:
+                if entry.end_time > start_time:
+                    straddler = entry
+
+                break
+
+        return straddler, parts
+
+    def _includes(
+        self,
+        straddler: Optional[Entry],
+        categories: Optional[FrozenSet[str]]
+    ) -> bool:
+        """
+        Checks if the straddler of `_split` belongs in the result
+
+        :param straddler: the straddler, if any
+        :type straddler: model.Entry or None
+        :param categories: the categories to include, or None for every
+            category
+        :type categories: frozenset[str] or None
+        :return: True if there is a straddler of the categories
+        :rtype: bool
+        """
+
+        if straddler is None:
+            return False
+
+        return categories is None or straddler.category in categories
+
+    def _map(
+        self,
+        function: Callable,
+        parts: List[Tuple[MutatorController, datetime]],
+        end_time: datetime,
+        categories: Optional[FrozenSet[str]]
+    ) -> list:
+        """
+        Queries every part, in the executor if there is one
+
+        :param function: the module-level query of a shard, called with the
+            shard, the start and end of its part and the categories
+        :type function: Callable
+        :param parts: the shards and the starts of their parts, as returned
+            by `_split`
+        :type parts: list[tuple]
+        :param end_time: the end of the interval
+        :type end_time: datetime.datetime
+        :param categories: the categories to include, or None for every
+            category
+        :type categories: frozenset[str] or None
+        :return: the results, in the order of the parts
+        :rtype: list
+        """
+
+        if self.executor is None or len(parts) < 2:
+            return [
+                function(shard, part_start, end_time, categories)
+                for shard, part_start in parts
+            ]
+
+        return list(self.executor.map(
+            function,
+            *zip(*parts),
+            repeat(end_time, len(parts)),
+            repeat(categories, len(parts))
+        ))
+
+    def _iter_range(
+        self,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Iterator[Entry]:
+        straddler, parts = self._split(start_time, end_time)
+
+        if straddler is not None:
+            yield straddler
+
+        for shard, part_start in parts:
+            yield from shard._iter_range(part_start, end_time)
+
+    def _iter_categories(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        categories: FrozenSet[str]
+    ) -> Iterator[Entry]:
+        straddler, parts = self._split(start_time, end_time)
+
+        if straddler is not None and straddler.category in categories:
+            yield straddler
+
+        for shard, part_start in parts:
+            yield from shard._iter_categories(part_start, end_time, categories)
+
+    def _search(
+        self,
+        query: str,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Iterator[Entry]:
+        tokens = set(tokenize(query))
+
+        if not tokens:
+            return
+
+        straddler, parts = self._split(start_time, end_time)
+
+        if straddler is not None and tokens <= entry_tokens(straddler):
+            yield straddler
+
+        for shard, part_start in parts:
+            yield from shard._search(query, part_start, end_time)
+
+    def get_intersection(
+        self,
+        start_time,
+        end_time,
+        categories: Optional[Iterable[str]] = None
+    ) -> Tuple[Entry]:
+        # check that start_time is utc
+        if start_time.tzinfo != timezone.utc:
+            raise ValueError('start_time.tzinfo must be utc')
+
+        # check that end_time is utc
+        if end_time.tzinfo != timezone.utc:
+            raise ValueError('end_time.tzinfo must be utc')
+
+        if categories is not None:
+            categories = frozenset(categories)
+
+        straddler, parts = self._split(start_time, end_time)
+
+        entries = []
+
+        if self._includes(straddler, categories):
+            entries.append(straddler.intersection(start_time, end_time))
+
+        for result in self._map(
+            _get_intersection,
+            parts,
+            end_time,
+            categories
+        ):
+            entries.extend(result)
+
+        return tuple(entries)
+
+    def get_intersection_table(
+        self,
+        start_time,
+        end_time,
+        categories: Optional[Iterable[str]] = None
+    ) -> EntryTable:
+        # check that start_time is utc
+        if start_time.tzinfo != timezone.utc:
+            raise ValueError('start_time.tzinfo must be utc')
+
+        # check that end_time is utc
+        if end_time.tzinfo != timezone.utc:
+            raise ValueError('end_time.tzinfo must be utc')
+
+        if categories is not None:
+            categories = frozenset(categories)
+
+        straddler, parts = self._split(start_time, end_time)
+
+        table = EntryTable()
+
+        if self._includes(straddler, categories):
+            table.append(straddler.intersection(start_time, end_time))
+
+        for result in self._map(
+            _get_intersection_table,
+            parts,
+            end_time,
+            categories
+        ):
+            table.extend(result)
+
+        return table
+
+    def total_duration(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        by: Optional[str] = 'category',
+        categories: Optional[Iterable[str]] = None
+    ) -> Union[Dict[str, timedelta], timedelta]:
+        # check that start_time is utc
+        if start_time.tzinfo != timezone.utc:
+            raise ValueError('start_time.tzinfo must be utc')
+
+        # check that end_time is utc
+        if end_time.tzinfo != timezone.utc:
+            raise ValueError('end_time.tzinfo must be utc')
+
+        if by not in {'category', None}:
+            raise ValueError('by must be \'category\' or None')
+
+        if categories is not None:
+            categories = frozenset(categories)
+
+        straddler, parts = self._split(start_time, end_time)
+
+        totals = {}
+
+        if self._includes(straddler, categories):
+            totals[straddler.category] = (
+                min(straddler.end_time, end_time) - start_time
+            )
+
+        for result in self._map(
+            _total_duration,
+            parts,
+            end_time,
+            categories
+        ):
+            for category, duration in result.items():
+                totals[category] = (
+                    totals.get(category, timedelta()) + duration
+                )
+
+        if by is None:
+            return sum(totals.values(), timedelta())
+
+        return totals
+
+    def _publish_entry(self, entry: Entry):
+        self._shard(entry.start_time)._publish_entry(entry)
+
+    def _groups(
+        self,
+        entries: Tuple[Entry]
+    ) -> List[Tuple[datetime, Tuple[Entry]]]:
+        """
+        Splits the entries by their shards
+
+        :param entries: the sorted entries
+        :type entries: tuple[model.Entry]
+        :return: the keys of the shards, each with the entries of the shard
+        :rtype: list[tuple]
+        """
+
+        # the entries are sorted, so the entries of a shard are consecutive
+        return [
+            (key, tuple(group))
+            for key, group in groupby(
+                entries,
+                lambda entry: self.key(entry.start_time)
+            )
+        ]
+
+    def _publish_entries(self, entries: Tuple[Entry]):
+        # the conflicts are checked across the shards by `create_entries`
+        # before any shard is written
+        published = []
+
+        try:
+            for key, group in self._groups(entries):
+                self._shard(key)._publish_entries(group)
+
+                published.append((key, group))
+        except BaseException:
+            # restore the shards that were already written
+            for key, group in reversed(published):
+                self.shards[key]._retract_entries(group)
+
+            raise
+
+    def _retract_entry(self, entry: Entry):
+        shard = self.shards.get(self.key(entry.start_time))
+
+        if shard is None:
+            raise KeyError(f'{entry} does not exist!')
+
+        shard._retract_entry(entry)
+
+    def _retract_entries(self, entries: Tuple[Entry]):
+        groups = self._groups(entries)
+
+        # check every shard before any of them is written
+        for key, group in groups:
+            if key not in self.shards:
+                raise KeyError(f'{group[0]} does not exist!')
+
+        retracted = []
+
+        try:
+            for key, group in groups:
+                self.shards[key]._retract_entries(group)
+
+                retracted.append((key, group))
+        except BaseException:
+            # restore the shards that were already written
+            for key, group in reversed(retracted):
+                self.shards[key]._publish_entries(group)
+
+            raise
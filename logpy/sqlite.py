@@ -0,0 +1,440 @@
+from .controller import MutatorController
+from .model import Entry, from_epoch_us, to_epoch_us
+from .search import tokenize
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from heapq import merge
+from pathlib import Path
+from threading import Lock
+from typing import (
+    Dict, FrozenSet, Iterable, Iterator, Optional, Tuple, Union
+)
+
+import sqlite3
+
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS entries (
+    start_us INTEGER NOT NULL,
+    end_us INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    description TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_start_us ON entries (start_us, end_us);
+CREATE INDEX IF NOT EXISTS entries_end_us ON entries (end_us);
+CREATE INDEX IF NOT EXISTS entries_category ON entries (category, start_us);
+'''
+
+# the full-text index of the categories and descriptions (FTS5 is an
+# optional extension of SQLite), the deleted rows are removed by the trigger
+# and the inserted rows are added by `_publish_entries` with one statement
+# per batch, which is several times faster than a trigger per row
+_FTS_SCHEMA = '''
+CREATE VIRTUAL TABLE entries_fts USING fts5(
+    category,
+    description,
+    content='entries',
+    tokenize='unicode61 remove_diacritics 0'
+);
+CREATE TRIGGER entries_fts_delete AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, category, description)
+    VALUES ('delete', old.rowid, old.category, old.description);
+END;
+INSERT INTO entries_fts (entries_fts) VALUES ('rebuild');
+'''
+
+_COLUMNS = 'start_us, end_us, category, description'
+
+_ORDER = 'start_us, end_us, category, description'
+
+# the entries intersecting with the interval are the last entry that starts
+# before it (if it ends within the interval) and the entries that start
+# within it, so both index lookups are bounded by the start_us index
+_RANGE = '''
+WHERE start_us >= coalesce(
+    (SELECT max(start_us) FROM entries WHERE start_us < :start), :start
+)
+AND start_us < :end
+AND end_us > :start
+'''
+
+# the entries of the interval after the chunk that ends with the entry that
+# starts at :after, which all start within the interval
+_AFTER = 'WHERE start_us > :after AND start_us < :end'
+
+
+class SQLiteController(MutatorController):
+    """
+    A controller that stores the entries in an SQLite database
+
+    The start and end times are stored as epoch microseconds and both are
+    indexed. The lookups are single indexed `LIMIT 1` queries, range scans
+    are fetched in bounded chunks and every publish or retract runs in a
+    transaction. File databases use write-ahead logging, so readers in other
+    connections are not blocked by writes. The connection is reused for every
+    call and guarded by a lock, so the controller may be shared between
+    threads.
+
+    Range queries assume that the entries do not overlap, as enforced by
+    `create_entry`.
+
+    :param path: the path of the database, defaults to ':memory:'
+    :type path: str or pathlib.Path
+    """
+
+    # the number of rows fetched at a time by range scans
+    _chunk_size = 1000
+
+    def __init__(self, path: Union[str, Path] = ':memory:'):
+        self._connection = sqlite3.connect(
+            str(path),
+            check_same_thread=False,
+            isolation_level=None
+        )
+        self._lock = Lock()
+
+        with self._lock:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.executescript(_SCHEMA)
+
+            # whether the full-text index exists
+            self._fts = bool(self._connection.execute(
+                'SELECT 1 FROM sqlite_master WHERE name = \'entries_fts\''
+            ).fetchone())
+
+            if not self._fts:
+                try:
+                    self._connection.executescript(
+                        f'BEGIN; {_FTS_SCHEMA} COMMIT;'
+                    )
+                except sqlite3.OperationalError:
+                    # FTS5 is not compiled in, searches scan the entries
+                    self._connection.execute('ROLLBACK')
+                else:
+                    self._fts = True
+
+    def close(self):
+        """
+        Closes the connection to the database
+        """
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                'SELECT count(*) FROM entries'
+            ).fetchone()[0]
+
+    @contextmanager
+    def _write(self):
+        """
+        Holds the lock and runs the statements of the block in one
+        transaction, which is rolled back if the block raises
+        """
+        with self._lock:
+            self._connection.execute('BEGIN')
+
+            try:
+                yield
+            except BaseException:
+                self._connection.execute('ROLLBACK')
+
+                raise
+
+            self._connection.execute('COMMIT')
+
+    def _find_one(self, sql: str, parameters) -> Optional[Entry]:
+        """
+        Executes the query and returns the first entry
+
+        :param sql: the query to execute
+        :type sql: str
+        :param parameters: the parameters of the query
+        :type parameters: tuple or dict
+        :return: the first entry, or None if there is none
+        :rtype: model.Entry or None
+        """
+        with self._lock:
+            row = self._connection.execute(sql, parameters).fetchone()
+
+        return _load_entry(row) if row else None
+
+    def _find_first_after(self, dt: datetime) -> Optional[Entry]:
+        return self._find_one(
+            f'SELECT {_COLUMNS} FROM entries WHERE start_us >= ? '
+            f'ORDER BY {_ORDER} LIMIT 1',
+            (to_epoch_us(dt),)
+        )
+
+    def _find_last_before(self, dt: datetime) -> Optional[Entry]:
+        return self._find_one(
+            f'SELECT {_COLUMNS} FROM entries WHERE start_us <= ? '
+            'ORDER BY start_us DESC, end_us DESC, category DESC, '
+            'description DESC LIMIT 1',
+            (to_epoch_us(dt),)
+        )
+
+    def _has_conflict(self, start_time: datetime, end_time: datetime) -> bool:
+        # answered from the (start_us, end_us) index alone
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT end_us FROM entries WHERE start_us < ? '
+                'ORDER BY start_us DESC LIMIT 1',
+                (to_epoch_us(end_time),)
+            ).fetchone()
+
+        return row is not None and row[0] > to_epoch_us(start_time)
+
+    def _iter_range(
+        self,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Iterator[Entry]:
+        return self._iter_rows('', {
+            'start': to_epoch_us(start_time),
+            'end': to_epoch_us(end_time)
+        })
+
+    def _iter_categories(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        categories: FrozenSet[str]
+    ) -> Iterator[Entry]:
+        parameters = {
+            'start': to_epoch_us(start_time),
+            'end': to_epoch_us(end_time)
+        }
+
+        # one scan of the category index per category, since the rows of an
+        # IN list are not in order of their start times and sorting them
+        # would read the rest of the interval for every chunk
+        return merge(*(
+            self._iter_rows(
+                'AND category = :category',
+                {**parameters, 'category': category}
+            )
+            for category in categories
+        ))
+
+    def _iter_rows(self, condition: str, parameters: dict) -> Iterator[Entry]:
+        """
+        Iterates over the entries within the interval in chunks
+
+        :param condition: the additional condition of the rows, starting
+            with 'AND'
+        :type condition: str
+        :param parameters: the parameters of the query, including the start
+            and end of the interval
+        :type parameters: dict
+        :return: An iterator over the intersecting entries
+        :rtype: Iterator[model.Entry]
+        """
+
+        parameters = {**parameters, 'limit': self._chunk_size}
+
+        where = _RANGE
+
+        # the rows are fetched in chunks, each chunk continuing after the
+        # start time of the last row (the start times are unique since the
+        # entries do not overlap), so the lock is not held while the caller
+        # consumes the entries; the later chunks are a plain range of the
+        # start_us index, or of the category index for a single category
+        while True:
+            with self._lock:
+                rows = self._connection.execute(
+                    f'SELECT {_COLUMNS} FROM entries {where} {condition} '
+                    f'ORDER BY {_ORDER} LIMIT :limit',
+                    parameters
+                ).fetchall()
+
+            for row in rows:
+                yield _load_entry(row)
+
+            if len(rows) < self._chunk_size:
+                return
+
+            where = _AFTER
+            parameters['after'] = rows[-1][0]
+
+    def _search(
+        self,
+        query: str,
+        start_time: datetime,
+        end_time: datetime
+    ) -> Iterator[Entry]:
+        if not self._fts:
+            return super()._search(query, start_time, end_time)
+
+        tokens = set(tokenize(query))
+
+        if not tokens:
+            return iter(())
+
+        with self._lock:
+            rows = self._connection.execute(
+                f'SELECT {_COLUMNS} FROM entries {_RANGE} AND rowid IN ('
+                'SELECT rowid FROM entries_fts WHERE entries_fts MATCH :query'
+                f') ORDER BY {_ORDER}',
+                {
+                    'start': to_epoch_us(start_time),
+                    'end': to_epoch_us(end_time),
+                    'query': ' AND '.join(f'"{token}"' for token in tokens)
+                }
+            ).fetchall()
+
+        return map(_load_entry, rows)
+
+    def total_duration(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        by: Optional[str] = 'category',
+        categories: Optional[Iterable[str]] = None
+    ) -> Union[Dict[str, timedelta], timedelta]:
+        """
+        Sums the durations of the entries within the interval
+
+        The entries are clipped and summed by a single aggregate query.
+
+        :param start_time: The start time of the interval (must be utc)
+        :type start_time: datetime.datetime
+        :param end_time: The end time of the interval (must be utc)
+        :type end_time: datetime.datetime
+        :param by: 'category' to sum per category, or None for a single
+            total, defaults to 'category'
+        :type by: 'category' or None
+        :param categories: only include the entries of these categories,
+            defaults to None (every category)
+        :type categories: Iterable[str] or None
+        :raise ValueError: if `by` is not 'category' nor None
+        :return: the total duration per category, or the total duration
+        :rtype: dict[str, datetime.timedelta] or datetime.timedelta
+        """
+        if start_time.tzinfo != timezone.utc:
+            raise ValueError('start_time.tzinfo must be utc')
+
+        if end_time.tzinfo != timezone.utc:
+            raise ValueError('end_time.tzinfo must be utc')
+
+        if by not in {'category', None}:
+            raise ValueError('by must be \'category\' or None')
+
+        condition, parameters = '', {}
+
+        if categories is not None:
+            condition, parameters = _in_categories(frozenset(categories))
+
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT category, '
+                'sum(min(end_us, :end) - max(start_us, :start)) '
+                f'FROM entries {_RANGE} {condition} GROUP BY category',
+                {
+                    'start': to_epoch_us(start_time),
+                    'end': to_epoch_us(end_time),
+                    **parameters
+                }
+            ).fetchall()
+
+        totals = {
+            category: timedelta(microseconds=total)
+            for category, total in rows
+        }
+
+        if by is None:
+            return sum(totals.values(), timedelta())
+
+        return totals
+
+    def _publish_entry(self, entry: Entry):
+        self._publish_entries((entry,))
+
+    def _publish_entries(self, entries: Tuple[Entry]):
+        with self._write():
+            # the inserted rows get the rowids after the current maximum
+            last = self._connection.execute(
+                'SELECT coalesce(max(rowid), 0) FROM entries'
+            ).fetchone()[0]
+
+            self._connection.executemany(
+                f'INSERT INTO entries ({_COLUMNS}) VALUES (?, ?, ?, ?)',
+                map(_dump_entry, entries)
+            )
+
+            if self._fts:
+                self._connection.execute(
+                    'INSERT INTO entries_fts (rowid, category, description) '
+                    'SELECT rowid, category, description FROM entries '
+                    'WHERE rowid > ?',
+                    (last,)
+                )
+
+    def _retract_entry(self, entry: Entry):
+        self._retract_entries((entry,))
+
+    def _retract_entries(self, entries: Tuple[Entry]):
+        with self._write():
+            deleted = self._connection.executemany(
+                'DELETE FROM entries WHERE start_us = ? AND end_us = ? '
+                'AND category = ? AND description = ?',
+                map(_dump_entry, entries)
+            ).rowcount
+
+            # raising rolls the deletions back
+            if deleted != len(entries):
+                raise KeyError(
+                    f'{entries[0]} does not exist!' if len(entries) == 1
+                    else f'{len(entries) - deleted} entries do not exist!'
+                )
+
+
+def _in_categories(categories: FrozenSet[str]) -> Tuple[str, dict]:
+    """
+    Creates the condition (and its parameters) of a category filter
+    """
+    parameters = {
+        f'category{i}': category for i, category in enumerate(categories)
+    }
+
+    if not parameters:
+        return 'AND 0', parameters
+
+    return (
+        f'AND category IN ({", ".join(":" + name for name in parameters)})',
+        parameters
+    )
+
+
+def _dump_entry(entry: Entry) -> Tuple[int, int, str, str]:
+    """
+    Converts the entry to a row
+    """
+    return (
+        to_epoch_us(entry.start_time),
+        to_epoch_us(entry.end_time),
+        entry.category,
+        entry.description
+    )
+
+
+def _load_entry(row: Tuple[int, int, str, str]) -> Entry:
+    """
+    Converts a row to an entry
+    """
+    start_us, end_us, category, description = row
+
+    # the rows were validated when they were inserted
+    return Entry._trusted(
+        from_epoch_us(start_us),
+        from_epoch_us(end_us),
+        category,
+        description
+    )
@@ -0,0 +1,186 @@
+from .model import Entry, Mutation
+
+from abc import ABC, abstractmethod
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, Tuple
+
+
+class MaterializedView(ABC):
+    """
+    An abstract base class for summaries that are maintained incrementally
+
+    A view is a listener for `controller.MutatorController.subscribe`; it
+    adds every created entry and subtracts every deleted entry, so it never
+    needs to scan the log after it has been built with `rebuild`.
+    """
+
+    def __call__(self, mutations: Tuple[Mutation]):
+        for mutation in mutations:
+            if mutation.mutation_class == 'creator':
+                self._apply(mutation.entry, 1)
+            else:
+                self._apply(mutation.entry, -1)
+
+    @abstractmethod
+    def _apply(self, entry: Entry, sign: int):
+        """
+        Adds (sign=1) or subtracts (sign=-1) the entry to the view
+
+        :param entry: the entry to add or subtract
+        :type entry: model.Entry
+        :param sign: 1 for created entries, -1 for deleted entries
+        :type sign: int
+        :raise NotImplementedError: if the method is not implemented by a
+            subclass
+        """
+
+    @abstractmethod
+    def clear(self):
+        """
+        Empties the view
+
+        :raise NotImplementedError: if the method is not implemented by a
+            subclass
+        """
+
+    def rebuild(self, entries: Iterable[Entry]):
+        """
+        Empties the view and adds the entries to it
+
+        :param entries: the existing entries, e.g. a whole log
+        :type entries: Iterable[model.Entry]
+        """
+
+        self.clear()
+
+        for entry in entries:
+            self._apply(entry, 1)
+
+
+class CategoryTotals(MaterializedView):
+    """
+    The total duration per category of all of the entries
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        # the totals in microseconds
+        self._totals: Dict[str, int] = {}
+
+    def _apply(self, entry: Entry, sign: int):
+        total = self._totals.get(entry.category, 0) + sign * (
+            (entry.end_time - entry.start_time) // timedelta.resolution
+        )
+
+        if total:
+            self._totals[entry.category] = total
+        else:
+            del self._totals[entry.category]
+
+    def totals(self) -> Dict[str, timedelta]:
+        """
+        The total duration per category
+
+        :return: the total duration per category
+        :rtype: dict[str, datetime.timedelta]
+        """
+
+        return {
+            category: timedelta(microseconds=total)
+            for category, total in self._totals.items()
+        }
+
+
+class DailyTotals(MaterializedView):
+    """
+    The total duration per category of every (UTC) day
+
+    Entries that span midnight are split between the days.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        # the totals in microseconds per day
+        self._days: Dict[date, Dict[str, int]] = {}
+
+    def _apply(self, entry: Entry, sign: int):
+        start_time = entry.start_time
+
+        while start_time < entry.end_time:
+            day = start_time.date()
+
+            end_time = min(
+                datetime.combine(
+                    day + timedelta(days=1),
+                    time(),
+                    timezone.utc
+                ),
+                entry.end_time
+            )
+
+            totals = self._days.setdefault(day, {})
+
+            total = totals.get(entry.category, 0) + sign * (
+                (end_time - start_time) // timedelta.resolution
+            )
+
+            if total:
+                totals[entry.category] = total
+            else:
+                del totals[entry.category]
+
+                if not totals:
+                    del self._days[day]
+
+            start_time = end_time
+
+    def totals(self, day: date) -> Dict[str, timedelta]:
+        """
+        The total duration per category of the day
+
+        :param day: the day
+        :type day: datetime.date
+        :return: the total duration per category
+        :rtype: dict[str, datetime.timedelta]
+        """
+
+        return {
+            category: timedelta(microseconds=total)
+            for category, total in self._days.get(day, {}).items()
+        }
+
+    def range_totals(
+        self,
+        start_day: date,
+        end_day: date
+    ) -> Dict[str, timedelta]:
+        """
+        The total duration per category of the days from `start_day` up to
+        (but not including) `end_day`
+
+        :param start_day: the first day
+        :type start_day: datetime.date
+        :param end_day: the day after the last day
+        :type end_day: datetime.date
+        :return: the total duration per category
+        :rtype: dict[str, datetime.timedelta]
+        """
+
+        totals = {}
+
+        day = start_day
+
+        while day < end_day:
+            for category, total in self._days.get(day, {}).items():
+                totals[category] = totals.get(category, 0) + total
+
+            day += timedelta(days=1)
+
+        return {
+            category: timedelta(microseconds=total)
+            for category, total in totals.items()
+        }
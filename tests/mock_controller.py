@@ -50,4 +50,15 @@ class MockController(MutatorController):
                 entry
             )
         )
+
+    def _retract_entries(self, entries):
+        removed = set(entries)
+
+        self.data = tuple(
+            datum for datum in self.data if datum not in removed
+        )
+
+        self.mutations.extend(
+            Mutation('destroyer', entry) for entry in entries
+        )
         
\ No newline at end of file
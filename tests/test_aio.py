@@ -0,0 +1,211 @@
+import unittest
+
+from logpy.aio import (
+    AsyncMutatorController, ThreadedController, ThreadedMutatorController, 
+    to_async
+)
+from logpy.controller import Controller
+from logpy.model import Entry
+
+from .mock_controller import MockController
+
+from asyncio import gather
+from datetime import datetime, timezone
+
+
+class AsyncMockController(AsyncMutatorController):
+    """
+    An asynchronous controller over a mock controller, which only uses the
+    default implementations of the base class
+    """
+
+    def __init__(self, *data):
+        self.mock = MockController(*data)
+
+    async def _find_first_after(self, dt):
+        return self.mock._find_first_after(dt)
+
+    async def _find_last_before(self, dt):
+        return self.mock._find_last_before(dt)
+
+    async def _publish_entry(self, entry):
+        self.mock._publish_entry(entry)
+
+    async def _retract_entry(self, entry):
+        self.mock._retract_entry(entry)
+
+
+class ReadOnlyController(Controller):
+    """
+    A read-only controller without any entries
+    """
+
+    def _find_first_after(self, dt):
+        return None
+
+    def _find_last_before(self, dt):
+        return None
+
+
+class AsyncMutatorControllerTestCase(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.entries = (
+            Entry(
+                datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc), 
+                'Work'
+            ),
+            Entry(
+                datetime(2022, 1, 2, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 2, 1, 30, tzinfo=timezone.utc), 
+                'Personal'
+            ),
+            Entry(
+                datetime(2022, 1, 3, 9, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 3, 10, 0, tzinfo=timezone.utc), 
+                'Work'
+            )
+        )
+
+        self.controller = AsyncMockController(*self.entries)
+
+    async def test_get_intersection(self):
+        interval = (
+            datetime(2022, 1, 1, 0, 30, tzinfo=timezone.utc),
+            datetime(2022, 1, 3, 9, 30, tzinfo=timezone.utc)
+        )
+
+        self.assertEqual(
+            await self.controller.get_intersection(*interval),
+            self.controller.mock.get_intersection(*interval)
+        )
+
+    async def test_get_intersection_categories(self):
+        interval = (
+            datetime(2022, 1, 1, 0, 30, tzinfo=timezone.utc),
+            datetime(2022, 1, 3, 9, 30, tzinfo=timezone.utc)
+        )
+
+        self.assertEqual(
+            await self.controller.get_intersection(*interval, ['Work']),
+            self.controller.mock.get_intersection(*interval, ['Work'])
+        )
+
+    async def test_get_intersection_not_utc(self):
+        with self.assertRaises(ValueError):
+            await self.controller.get_intersection(
+                datetime(2021, 1, 1), 
+                datetime(2023, 1, 1)
+            )
+
+    async def test_create_and_delete_entry(self):
+        entry = Entry(
+            datetime(2022, 1, 1, 1, tzinfo=timezone.utc),
+            datetime(2022, 1, 2, 0, tzinfo=timezone.utc),
+            'Sleep'
+        )
+
+        await self.controller.create_entry(entry)
+
+        self.assertIn(entry, self.controller.mock.data)
+
+        with self.assertRaises(KeyError):
+            await self.controller.create_entry(entry)
+
+        await self.controller.delete_entry(entry)
+
+        self.assertNotIn(entry, self.controller.mock.data)
+
+        with self.assertRaises(KeyError):
+            await self.controller.delete_entry(entry)
+
+
+class ThreadedControllerTestCase(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.entries = (
+            Entry(
+                datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc), 
+                'Work'
+            ),
+            Entry(
+                datetime(2022, 1, 2, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 2, 1, 30, tzinfo=timezone.utc), 
+                'Personal'
+            ),
+            Entry(
+                datetime(2022, 1, 3, 9, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 3, 10, 0, tzinfo=timezone.utc), 
+                'Work'
+            )
+        )
+
+        self.mock = MockController(*self.entries)
+        self.controller = to_async(self.mock)
+
+    def test_to_async(self):
+        self.assertIsInstance(self.controller, ThreadedMutatorController)
+        self.assertNotIsInstance(
+            to_async(ReadOnlyController()), 
+            ThreadedMutatorController
+        )
+        self.assertIsInstance(
+            to_async(ReadOnlyController()), 
+            ThreadedController
+        )
+
+    async def test_concurrent_get_intersection(self):
+        intervals = [
+            (
+                datetime(2022, 1, day, tzinfo=timezone.utc),
+                datetime(2022, 1, day + 1, tzinfo=timezone.utc)
+            )
+            for day in range(1, 5)
+        ]
+
+        results = await gather(*(
+            self.controller.get_intersection(*interval) 
+            for interval in intervals
+        ))
+
+        self.assertEqual(
+            results, 
+            [self.mock.get_intersection(*interval) for interval in intervals]
+        )
+
+    async def test_get_intersection_categories(self):
+        interval = (
+            datetime(2022, 1, 1, tzinfo=timezone.utc),
+            datetime(2022, 1, 4, tzinfo=timezone.utc)
+        )
+
+        self.assertEqual(
+            await self.controller.get_intersection(*interval, ['Personal']),
+            self.mock.get_intersection(*interval, ['Personal'])
+        )
+
+        entries = [
+            entry
+            async for entry in self.controller._iter_categories(
+                *interval, frozenset({'Work'})
+            )
+        ]
+
+        self.assertEqual(entries, [self.entries[0], self.entries[2]])
+
+    async def test_create_and_delete_entry(self):
+        entry = Entry(
+            datetime(2022, 1, 1, 1, tzinfo=timezone.utc),
+            datetime(2022, 1, 2, 0, tzinfo=timezone.utc),
+            'Sleep'
+        )
+
+        await self.controller.create_entry(entry)
+
+        self.assertIn(entry, self.mock.data)
+
+        await self.controller.delete_entry(entry)
+
+        self.assertNotIn(entry, self.mock.data)
@@ -0,0 +1,148 @@
+import unittest
+
+from logpy.cache import CachingController, CachingMutatorController
+from logpy.model import Entry
+
+from .mock_controller import MockController
+
+from datetime import datetime, timezone
+
+
+class CachingMutatorControllerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.mock = MockController(
+            Entry(
+                datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc), 
+                'Work'
+            ),
+            Entry(
+                datetime(2022, 1, 2, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 2, 1, 30, tzinfo=timezone.utc), 
+                'Personal'
+            )
+        )
+
+        self.controller = CachingMutatorController(self.mock, maxsize=2)
+
+        self.first_day = (
+            datetime(2022, 1, 1, tzinfo=timezone.utc),
+            datetime(2022, 1, 2, tzinfo=timezone.utc)
+        )
+
+        self.second_day = (
+            datetime(2022, 1, 2, tzinfo=timezone.utc),
+            datetime(2022, 1, 3, tzinfo=timezone.utc)
+        )
+
+    def test_hit(self):
+        entries = self.controller.get_intersection(*self.first_day)
+
+        self.assertIs(
+            self.controller.get_intersection(*self.first_day), 
+            entries
+        )
+        self.assertEqual((self.controller.hits, self.controller.misses), (1, 1))
+
+    def test_eviction(self):
+        self.controller.get_intersection(*self.first_day)
+        self.controller.get_intersection(*self.second_day)
+        self.controller.get_intersection(*self.first_day)
+
+        # the second day is the least recently used window
+        self.controller.get_intersection(
+            datetime(2022, 1, 3, tzinfo=timezone.utc),
+            datetime(2022, 1, 4, tzinfo=timezone.utc)
+        )
+
+        self.controller.get_intersection(*self.first_day)
+        self.controller.get_intersection(*self.second_day)
+
+        self.assertEqual((self.controller.hits, self.controller.misses), (2, 4))
+
+    def test_invalidation(self):
+        self.controller.get_intersection(*self.first_day)
+        self.controller.get_intersection(*self.second_day)
+
+        entry = Entry(
+            datetime(2022, 1, 2, 12, tzinfo=timezone.utc),
+            datetime(2022, 1, 2, 13, tzinfo=timezone.utc),
+            'Sleep'
+        )
+
+        self.controller.create_entry(entry)
+
+        # only the second day intersects with the entry
+        self.controller.get_intersection(*self.first_day)
+
+        self.assertIn(
+            entry, 
+            self.controller.get_intersection(*self.second_day)
+        )
+        self.assertEqual((self.controller.hits, self.controller.misses), (1, 3))
+
+        self.controller.delete_entry(entry)
+
+        self.assertNotIn(
+            entry, 
+            self.controller.get_intersection(*self.second_day)
+        )
+
+    def test_invalidation_batch(self):
+        self.controller.get_intersection(*self.first_day)
+        self.controller.get_intersection(*self.second_day)
+
+        self.controller.create_entries((
+            Entry(
+                datetime(2022, 1, 3, 12, tzinfo=timezone.utc),
+                datetime(2022, 1, 3, 13, tzinfo=timezone.utc),
+                'Sleep'
+            ),
+            Entry(
+                datetime(2022, 1, 1, 12, tzinfo=timezone.utc),
+                datetime(2022, 1, 1, 13, tzinfo=timezone.utc),
+                'Sleep'
+            )
+        ))
+
+        self.assertEqual(
+            self.controller.get_intersection(*self.first_day),
+            self.mock.get_intersection(*self.first_day)
+        )
+        self.controller.get_intersection(*self.second_day)
+
+        self.assertEqual((self.controller.hits, self.controller.misses), (1, 3))
+
+    def test_invalidation_through_wrapped_controller(self):
+        self.controller.get_intersection(*self.first_day)
+
+        entry = Entry(
+            datetime(2022, 1, 1, 12, tzinfo=timezone.utc),
+            datetime(2022, 1, 1, 13, tzinfo=timezone.utc),
+            'Sleep'
+        )
+
+        self.mock.create_entry(entry)
+
+        self.assertIn(
+            entry, 
+            self.controller.get_intersection(*self.first_day)
+        )
+
+    def test_base_class_wraps_mutator_controller(self):
+        controller = CachingController(self.mock)
+
+        self.assertIsInstance(controller, CachingMutatorController)
+
+        controller.get_intersection(*self.first_day)
+
+        entry = Entry(
+            datetime(2022, 1, 1, 12, tzinfo=timezone.utc),
+            datetime(2022, 1, 1, 13, tzinfo=timezone.utc),
+            'Sleep'
+        )
+
+        self.mock.create_entry(entry)
+
+        self.assertIn(entry, controller.get_intersection(*self.first_day))
@@ -0,0 +1,270 @@
+import unittest
+
+from logpy import cli, daemon
+from logpy.memory import MemoryController
+
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import sleep
+from unittest.mock import patch
+
+import os
+import socket
+
+
+class CLITestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.log = str(Path(self.directory.name) / 'log' / 'journal.jsonl')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_main(self, *argv: str):
+        stdout, stderr = StringIO(), StringIO()
+
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            status = cli.main(['--log', self.log, *argv])
+
+        return status, stdout.getvalue(), stderr.getvalue()
+
+    def test_add_query_summary(self):
+        self.assertEqual(
+            self.run_main(
+                'add', '2022-01-01T09:00', '2022-01-01T10:30', 'Work', 'notes'
+            ),
+            (0, '', '')
+        )
+
+        # the times are converted to utc
+        self.run_main(
+            'add', '2022-01-01T11:30+01:00', '2022-01-01T11:00', 'Personal'
+        )
+
+        status, stdout, _ = self.run_main(
+            'query', '2022-01-01T10:00', '2022-01-02'
+        )
+
+        self.assertEqual(status, 0)
+        self.assertEqual(stdout, (
+            '2022-01-01T10:00:00+00:00\t2022-01-01T10:30:00+00:00\t'
+            'Work\tnotes\n'
+            '2022-01-01T10:30:00+00:00\t2022-01-01T11:00:00+00:00\t'
+            'Personal\t\n'
+        ))
+
+        status, stdout, _ = self.run_main(
+            'summary', '2022-01-01', '2022-01-02'
+        )
+
+        self.assertEqual(stdout, 'Personal\t0:30:00\nWork\t1:30:00\n')
+
+    def test_errors(self):
+        self.run_main('add', '2022-01-01T09:00', '2022-01-01T10:00', 'Work')
+
+        status, _, stderr = self.run_main(
+            'add', '2022-01-01T09:30', '2022-01-01T11:00', 'Work'
+        )
+
+        self.assertEqual(status, 1)
+        self.assertIn('conflicts with', stderr)
+
+        status, _, stderr = self.run_main(
+            'delete', '2022-01-01T09:30', '2022-01-01T11:00', 'Work'
+        )
+
+        self.assertEqual(status, 1)
+        self.assertIn('does not exist', stderr)
+
+    def test_import_export(self):
+        path = Path(self.directory.name) / 'export.csv'
+
+        self.run_main('add', '2022-01-01T09:00', '2022-01-01T10:00', 'Work')
+        self.run_main('add', '2022-01-02T09:00', '2022-01-02T10:00', 'Work')
+
+        self.assertEqual(
+            self.run_main('export', str(path), '--start', '2022-01-02'),
+            (0, '1\n', '')
+        )
+
+        self.log = str(Path(self.directory.name) / 'log.sqlite')
+
+        self.assertEqual(
+            self.run_main('import', str(path)),
+            (0, '1\n', '')
+        )
+
+        status, stdout, _ = self.run_main(
+            'summary', '2022-01-01', '2022-01-03'
+        )
+
+        self.assertEqual(stdout, 'Work\t1:00:00\n')
+
+        status, _, stderr = self.run_main('import', str(path) + '.txt')
+
+        self.assertEqual(status, 1)
+        self.assertIn('unknown format', stderr)
+
+    def test_lazy_imports(self):
+        # the controllers are only imported when a command runs locally
+        self.assertNotIn('SQLiteController', vars(cli))
+        self.assertNotIn('JournalController', vars(cli))
+
+
+class DaemonTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.socket = str(Path(self.directory.name) / 'logpy.sock')
+        self.log = os.path.realpath(
+            Path(self.directory.name) / 'journal.jsonl'
+        )
+
+        self.controller = MemoryController()
+
+        Thread(
+            target=daemon.serve,
+            args=(self.controller, self.socket, self.log),
+            daemon=True
+        ).start()
+
+        while daemon.send(self.socket, {'command': 'ping'}) is None:
+            sleep(0.01)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_idle_client(self):
+        with patch.object(daemon, 'TIMEOUT', 0.1):
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client.connect(self.socket)
+
+            # the idle client is dropped and the next request is served
+            with client:
+                self.assertEqual(
+                    daemon.send(self.socket, {'command': 'ping'}, 5),
+                    {'result': None}
+                )
+
+    def test_send(self):
+        request = {
+            'command': 'add',
+            'start': '2022-01-01T09:00',
+            'end': '2022-01-01T10:00',
+            'category': 'Work',
+            'description': ''
+        }
+
+        self.assertEqual(daemon.send(self.socket, request), {'result': None})
+        self.assertEqual(len(self.controller), 1)
+
+        self.assertIn('error', daemon.send(self.socket, request))
+
+        self.assertEqual(
+            daemon.send(self.socket, {
+                'command': 'summary',
+                'start': '2022-01-01',
+                'end': '2022-01-02'
+            }),
+            {'result': {'Work': 3600.0}}
+        )
+
+    def test_main(self):
+        stdout = StringIO()
+
+        with redirect_stdout(stdout):
+            status = cli.main([
+                '--log', self.log,
+                '--socket', self.socket,
+                'add', '2022-01-01T09:00', '2022-01-01T10:00', 'Work'
+            ])
+
+        self.assertEqual(status, 0)
+        self.assertEqual(len(self.controller), 1)
+
+        # the log is not loaded when the daemon answers
+        self.assertFalse(Path(self.log).exists())
+
+    def test_main_other_log(self):
+        other = Path(self.directory.name) / 'other.jsonl'
+
+        request = {'command': 'ping', 'log': str(other)}
+
+        self.assertIn('log', daemon.send(self.socket, request))
+
+        stdout = StringIO()
+
+        with redirect_stdout(stdout):
+            status = cli.main([
+                '--log', str(other),
+                '--socket', self.socket,
+                'add', '2022-01-01T09:00', '2022-01-01T10:00', 'Work'
+            ])
+
+        # the command runs locally, against the other log
+        self.assertEqual(status, 0)
+        self.assertEqual(len(self.controller), 0)
+        self.assertTrue(other.exists())
+
+    def test_errors_keep_serving(self):
+        def create_entry(entry):
+            raise RuntimeError('the disk is on fire')
+
+        self.controller.create_entry = create_entry
+
+        response = daemon.send(self.socket, {
+            'command': 'add',
+            'start': '2022-01-01T09:00',
+            'end': '2022-01-01T10:00',
+            'category': 'Work'
+        })
+
+        self.assertIn('RuntimeError', response['error'])
+
+        self.assertIn('error', daemon.send(self.socket, ['not', 'a', 'dict']))
+
+        # a client that leaves without reading the response
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client.connect(self.socket)
+        client.sendall(b'{"command": "ping"}\n')
+        client.close()
+
+        self.assertEqual(
+            daemon.send(self.socket, {'command': 'ping'}),
+            {'result': None}
+        )
+
+    def test_timeout(self):
+        path = str(Path(self.directory.name) / 'hung.sock')
+
+        # a daemon that accepts the connections but never responds
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(path)
+            server.listen()
+
+            with self.assertRaises(TimeoutError):
+                daemon.send(path, {'command': 'ping'}, timeout=0.05)
+
+            stderr = StringIO()
+
+            with redirect_stderr(stderr):
+                status = cli.main([
+                    '--log', self.log, '--socket', path, '--timeout', '0.05',
+                    'query', '2022-01-01', '2022-01-02'
+                ])
+
+            self.assertEqual(status, 1)
+            self.assertIn('did not respond', stderr.getvalue())
+
+    def test_already_running(self):
+        with self.assertRaises(OSError):
+            daemon.serve(self.controller, self.socket)
+
+    def test_no_daemon(self):
+        self.assertIsNone(
+            daemon.send(str(Path(self.directory.name) / 'none.sock'), {})
+        )
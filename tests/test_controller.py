@@ -4,7 +4,7 @@ from .mock_controller import MockController
 
 from logpy.model import Entry, Mutation
 
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 class ControllerTestCase(unittest.TestCase):
 
@@ -260,6 +260,21 @@ class MutattorController(unittest.TestCase):
         with self.assertRaises(KeyError):
             self.controller.create_entry(entry)
 
+    def test_has_conflict(self):
+        start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+        for hours in range(-2, 24 * 7):
+            for duration in (timedelta(minutes=30), timedelta(hours=26)):
+                interval = (
+                    start + timedelta(hours=hours),
+                    start + timedelta(hours=hours) + duration
+                )
+
+                self.assertEqual(
+                    self.controller._has_conflict(*interval),
+                    bool(self.controller.get_intersection(*interval))
+                )
+
     def test_create_entry_no_conflict_tight(self):
         entry = Entry(
             datetime(2022, 1, 1, 1, tzinfo=timezone.utc),
@@ -379,3 +394,554 @@ class MutattorController(unittest.TestCase):
         self.assertEqual(self.controller.data, expected_data)
         self.assertEqual(self.controller.mutations, expected_mutations)
 
+
+
+class IterRangeTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = MockController(
+            Entry(
+                datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc), 
+                'Work'
+            ),
+            Entry(
+                datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 2, 0, tzinfo=timezone.utc), 
+                'Personal'
+            ),
+            Entry(
+                datetime(2022, 1, 1, 3, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 4, 0, tzinfo=timezone.utc), 
+                'Work'
+            )
+        )
+
+    def test_iter_range_fallback(self):
+        entries = tuple(self.controller._iter_range(
+            datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc),
+            datetime(2022, 1, 1, 3, 30, tzinfo=timezone.utc)
+        ))
+
+        expected = self.controller.data[1:]
+
+        self.assertEqual(entries, expected)
+
+    def test_iter_range_fallback_straddling(self):
+        entries = tuple(self.controller._iter_range(
+            datetime(2022, 1, 1, 0, 30, tzinfo=timezone.utc),
+            datetime(2022, 1, 1, 1, 30, tzinfo=timezone.utc)
+        ))
+
+        expected = self.controller.data[:2]
+
+        self.assertEqual(entries, expected)
+
+
+class IterIntersectionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = MockController(
+            Entry(
+                datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc), 
+                'Work'
+            ),
+            Entry(
+                datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 2, 0, tzinfo=timezone.utc), 
+                'Personal'
+            ),
+            Entry(
+                datetime(2022, 1, 1, 3, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 4, 0, tzinfo=timezone.utc), 
+                'Work'
+            )
+        )
+
+        self.interval = (
+            datetime(2022, 1, 1, 0, 30, tzinfo=timezone.utc),
+            datetime(2022, 1, 1, 3, 30, tzinfo=timezone.utc)
+        )
+
+    def test_iter_intersection(self):
+        entries = tuple(self.controller.iter_intersection(*self.interval))
+
+        expected = (
+            Entry(
+                datetime(2022, 1, 1, 0, 30, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc), 
+                'Work'
+            ),
+            self.controller.data[1],
+            Entry(
+                datetime(2022, 1, 1, 3, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 3, 30, tzinfo=timezone.utc), 
+                'Work'
+            )
+        )
+
+        self.assertEqual(entries, expected)
+        self.assertEqual(
+            entries,
+            self.controller.get_intersection(*self.interval)
+        )
+
+    def test_iter_intersection_lazy(self):
+        iterator = self.controller.iter_intersection(*self.interval)
+
+        self.assertEqual(
+            next(iterator).start_time,
+            datetime(2022, 1, 1, 0, 30, tzinfo=timezone.utc)
+        )
+
+    def test_iter_intersection_not_utc(self):
+        # the times are validated before the iteration starts
+        with self.assertRaises(ValueError):
+            self.controller.iter_intersection(
+                datetime(2022, 1, 1), 
+                self.interval[1]
+            )
+
+        with self.assertRaises(ValueError):
+            self.controller.iter_intersection(
+                self.interval[0], 
+                datetime(2022, 1, 2)
+            )
+
+
+class FindGapsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = MockController(
+            Entry(
+                datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc), 
+                'Work'
+            ),
+            Entry(
+                datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 2, 0, tzinfo=timezone.utc), 
+                'Personal'
+            ),
+            Entry(
+                datetime(2022, 1, 1, 2, 10, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 3, 0, tzinfo=timezone.utc), 
+                'Personal'
+            ),
+            Entry(
+                datetime(2022, 1, 1, 5, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 6, 0, tzinfo=timezone.utc), 
+                'Work'
+            )
+        )
+
+        self.interval = (
+            datetime(2022, 1, 1, 0, 30, tzinfo=timezone.utc),
+            datetime(2022, 1, 1, 8, 0, tzinfo=timezone.utc)
+        )
+
+    def test_find_gaps(self):
+        gaps = tuple(self.controller.find_gaps(*self.interval))
+
+        expected = (
+            (
+                datetime(2022, 1, 1, 2, 0, tzinfo=timezone.utc),
+                datetime(2022, 1, 1, 2, 10, tzinfo=timezone.utc)
+            ),
+            (
+                datetime(2022, 1, 1, 3, 0, tzinfo=timezone.utc),
+                datetime(2022, 1, 1, 5, 0, tzinfo=timezone.utc)
+            ),
+            (
+                datetime(2022, 1, 1, 6, 0, tzinfo=timezone.utc),
+                datetime(2022, 1, 1, 8, 0, tzinfo=timezone.utc)
+            )
+        )
+
+        self.assertEqual(gaps, expected)
+
+    def test_find_gaps_min_duration(self):
+        gaps = tuple(self.controller.find_gaps(
+            *self.interval, 
+            min_duration=timedelta(hours=2)
+        ))
+
+        self.assertEqual(len(gaps), 2)
+        self.assertEqual(
+            gaps[0][0], 
+            datetime(2022, 1, 1, 3, 0, tzinfo=timezone.utc)
+        )
+
+    def test_find_gaps_empty(self):
+        interval = (
+            datetime(2022, 1, 2, tzinfo=timezone.utc),
+            datetime(2022, 1, 3, tzinfo=timezone.utc)
+        )
+
+        self.assertEqual(
+            tuple(self.controller.find_gaps(*interval)), 
+            (interval,)
+        )
+
+        # the interval is covered completely
+        self.assertEqual(
+            tuple(self.controller.find_gaps(
+                datetime(2022, 1, 1, 0, 30, tzinfo=timezone.utc),
+                datetime(2022, 1, 1, 2, 0, tzinfo=timezone.utc)
+            )),
+            ()
+        )
+
+    def test_find_gaps_not_utc(self):
+        with self.assertRaises(ValueError):
+            self.controller.find_gaps(datetime(2022, 1, 1), self.interval[1])
+
+
+class CreateEntriesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = MockController(
+            Entry(
+                datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc), 
+                'Work'
+            ),
+            Entry(
+                datetime(2022, 1, 2, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 2, 1, 30, tzinfo=timezone.utc), 
+                'Personal'
+            )
+        )
+
+    def test_create_entries(self):
+        entries = (
+            Entry(
+                datetime(2022, 1, 3, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 3, 1, 0, tzinfo=timezone.utc), 
+                'Work'
+            ),
+            Entry(
+                datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 2, 0, 0, tzinfo=timezone.utc), 
+                'Sleep'
+            )
+        )
+
+        expected_data = tuple(sorted(self.controller.data + entries))
+
+        expected_mutations = [
+            Mutation('creator', entry) for entry in sorted(entries)
+        ]
+
+        self.controller.create_entries(entries)
+
+        self.assertEqual(self.controller.data, expected_data)
+        self.assertEqual(self.controller.mutations, expected_mutations)
+
+    def test_create_entries_conflict_within_batch(self):
+        entries = (
+            Entry(
+                datetime(2022, 1, 3, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 3, 1, 0, tzinfo=timezone.utc), 
+                'Work'
+            ),
+            Entry(
+                datetime(2022, 1, 3, 0, 30, tzinfo=timezone.utc), 
+                datetime(2022, 1, 3, 2, 0, tzinfo=timezone.utc), 
+                'Sleep'
+            )
+        )
+
+        data = self.controller.data
+
+        with self.assertRaises(KeyError):
+            self.controller.create_entries(entries)
+
+        self.assertEqual(self.controller.data, data)
+        self.assertEqual(self.controller.mutations, [])
+
+    def test_create_entries_conflict_with_existing(self):
+        entries = (
+            Entry(
+                datetime(2021, 1, 1, 0, 0, tzinfo=timezone.utc), 
+                datetime(2021, 1, 1, 1, 0, tzinfo=timezone.utc), 
+                'Work'
+            ),
+            Entry(
+                datetime(2022, 1, 1, 23, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 2, 0, 30, tzinfo=timezone.utc), 
+                'Sleep'
+            )
+        )
+
+        data = self.controller.data
+
+        with self.assertRaises(KeyError):
+            self.controller.create_entries(entries)
+
+        self.assertEqual(self.controller.data, data)
+        self.assertEqual(self.controller.mutations, [])
+
+    def test_create_entries_empty(self):
+        data = self.controller.data
+
+        self.controller.create_entries(())
+
+        self.assertEqual(self.controller.data, data)
+
+
+class GetIntersectionTableTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = MockController(
+            Entry(
+                datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc), 
+                'Work'
+            ),
+            Entry(
+                datetime(2022, 1, 2, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 2, 1, 30, tzinfo=timezone.utc), 
+                'Personal'
+            ),
+            Entry(
+                datetime(2022, 1, 3, 9, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 3, 10, 0, tzinfo=timezone.utc), 
+                'Work'
+            )
+        )
+
+    def test_get_intersection_table(self):
+        interval = (
+            datetime(2022, 1, 1, 0, 30, tzinfo=timezone.utc),
+            datetime(2022, 1, 3, 9, 30, tzinfo=timezone.utc)
+        )
+
+        table = self.controller.get_intersection_table(*interval)
+
+        self.assertEqual(
+            tuple(table), 
+            self.controller.get_intersection(*interval)
+        )
+
+    def test_get_intersection_table_not_utc(self):
+        with self.assertRaises(ValueError):
+            self.controller.get_intersection_table(
+                datetime(2021, 1, 1), 
+                datetime(2023, 1, 1)
+            )
+
+
+class TotalDurationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = MockController(
+            Entry(
+                datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc), 
+                'Work'
+            ),
+            Entry(
+                datetime(2022, 1, 2, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 2, 1, 30, tzinfo=timezone.utc), 
+                'Personal'
+            ),
+            Entry(
+                datetime(2022, 1, 3, 9, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 3, 10, 0, tzinfo=timezone.utc), 
+                'Work'
+            )
+        )
+
+        self.interval = (
+            datetime(2022, 1, 1, 0, 30, tzinfo=timezone.utc),
+            datetime(2022, 1, 3, 9, 15, tzinfo=timezone.utc)
+        )
+
+    def test_total_duration_by_category(self):
+        totals = self.controller.total_duration(*self.interval)
+
+        expected = {
+            'Work': timedelta(minutes=45),
+            'Personal': timedelta(minutes=90)
+        }
+
+        self.assertEqual(totals, expected)
+
+    def test_total_duration(self):
+        total = self.controller.total_duration(*self.interval, by=None)
+
+        self.assertEqual(total, timedelta(minutes=135))
+
+    def test_total_duration_validation(self):
+        with self.assertRaises(ValueError):
+            self.controller.total_duration(*self.interval, by='description')
+
+        with self.assertRaises(ValueError):
+            self.controller.total_duration(
+                datetime(2021, 1, 1), 
+                datetime(2023, 1, 1)
+            )
+
+
+class SubscribeTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = MockController()
+        self.received = []
+
+        self.controller.subscribe(self.received.append)
+
+        self.entries = (
+            Entry(
+                datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc), 
+                'Work'
+            ),
+            Entry(
+                datetime(2022, 1, 2, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 2, 1, 30, tzinfo=timezone.utc), 
+                'Personal'
+            )
+        )
+
+    def test_notifications(self):
+        self.controller.create_entries(reversed(self.entries))
+        self.controller.delete_entry(self.entries[0])
+        self.controller.create_entry(self.entries[0])
+
+        expected = [
+            tuple(Mutation('creator', entry) for entry in self.entries),
+            (Mutation('destroyer', self.entries[0]),),
+            (Mutation('creator', self.entries[0]),)
+        ]
+
+        self.assertEqual(self.received, expected)
+
+    def test_no_notification_on_failure(self):
+        with self.assertRaises(KeyError):
+            self.controller.delete_entry(self.entries[0])
+
+        with self.assertRaises(KeyError):
+            self.controller.delete_entries(self.entries)
+
+        self.assertEqual(self.received, [])
+
+    def test_delete_notifications(self):
+        self.controller.create_entries(self.entries)
+        self.controller.delete_entries(reversed(self.entries))
+        self.controller.create_entries(self.entries)
+        self.controller.delete_range(
+            self.entries[0].start_time,
+            self.entries[-1].end_time
+        )
+
+        destroyers = tuple(
+            Mutation('destroyer', entry) for entry in self.entries
+        )
+
+        self.assertEqual(self.received[1], destroyers)
+        self.assertEqual(self.received[3], destroyers)
+
+    def test_unsubscribe(self):
+        self.controller.unsubscribe(self.received.append)
+        self.controller.create_entry(self.entries[0])
+
+        self.assertEqual(self.received, [])
+
+        with self.assertRaises(ValueError):
+            self.controller.unsubscribe(self.received.append)
+
+
+class DeleteEntriesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+        self.entries = tuple(
+            Entry(
+                start + timedelta(hours=i),
+                start + timedelta(hours=i, minutes=45),
+                ('Work', 'Personal')[i % 2]
+            )
+            for i in range(10)
+        )
+
+        self.controller = MockController(*self.entries)
+
+    def test_delete_entries(self):
+        self.controller.delete_entries([
+            self.entries[7], self.entries[2], self.entries[7]
+        ])
+
+        self.assertEqual(
+            self.controller.data,
+            self.entries[:2] + self.entries[3:7] + self.entries[8:]
+        )
+
+        # retracted in one batch
+        self.assertEqual(
+            self.controller.mutations,
+            [
+                Mutation('destroyer', self.entries[2]),
+                Mutation('destroyer', self.entries[7])
+            ]
+        )
+
+        self.controller.delete_entries([])
+
+        self.assertEqual(len(self.controller.data), 8)
+
+    def test_delete_entries_does_not_exist(self):
+        entries = (
+            self.entries[1],
+            Entry(
+                self.entries[4].start_time,
+                self.entries[4].end_time,
+                'Other'
+            ),
+            Entry(
+                datetime(2023, 1, 1, tzinfo=timezone.utc),
+                datetime(2023, 1, 2, tzinfo=timezone.utc),
+                'Work'
+            )
+        )
+
+        with self.assertRaisesRegex(KeyError, '2 missing entries'):
+            self.controller.delete_entries(entries)
+
+        self.assertEqual(self.controller.data, self.entries)
+
+    def test_delete_range(self):
+        start = datetime(2022, 1, 1, 2, 30, tzinfo=timezone.utc)
+        end = datetime(2022, 1, 1, 7, 45, tzinfo=timezone.utc)
+
+        # the entries that only partly overlap with the interval are kept
+        self.assertEqual(
+            self.controller.delete_range(start, end, categories=['Work']),
+            (self.entries[4], self.entries[6])
+        )
+        self.assertEqual(
+            self.controller.delete_range(start, end),
+            (self.entries[3], self.entries[5], self.entries[7])
+        )
+        self.assertEqual(self.controller.delete_range(start, end), ())
+
+        self.assertEqual(
+            self.controller.data,
+            self.entries[:3] + self.entries[8:]
+        )
+
+    def test_delete_range_not_utc(self):
+        with self.assertRaises(ValueError):
+            self.controller.delete_range(
+                datetime(2022, 1, 1),
+                datetime(2022, 1, 2, tzinfo=timezone.utc)
+            )
+
+        with self.assertRaises(ValueError):
+            self.controller.delete_range(
+                datetime(2022, 1, 1, tzinfo=timezone.utc),
+                datetime(2022, 1, 2)
+            )
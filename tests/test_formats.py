@@ -0,0 +1,201 @@
+import unittest
+
+from logpy.formats import export_entries, import_entries, read_ics
+from logpy.memory import MemoryController
+from logpy.model import Entry
+from logpy.sqlite import SQLiteController
+
+from .mock_controller import MockController
+
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+
+def _entries():
+    start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+    return [
+        Entry(
+            start + timedelta(hours=i),
+            start + timedelta(hours=i, minutes=45),
+            ('Work', 'Personal', 'Sleep; 8h, at least')[i % 3],
+            ('', 'entry "quoted"', 'multi\nline, with a long description '
+             'that has to be folded into several lines: æøå ' * 3)[i % 3]
+        )
+        for i in range(50)
+    ]
+
+
+class FormatsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.entries = _entries()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, name: str) -> Path:
+        return Path(self.directory.name) / name
+
+    def test_round_trip(self):
+        source = MemoryController(*self.entries)
+
+        for suffix in ('.csv', '.jsonl', '.ics'):
+            path = self.path(f'log{suffix}')
+
+            self.assertEqual(export_entries(source, path), 50)
+
+            with SQLiteController() as controller:
+                # the chunks are checked against each other
+                self.assertEqual(
+                    import_entries(controller, path, chunk_size=7),
+                    50
+                )
+
+                self.assertEqual(
+                    list(controller.iter_intersection(
+                        self.entries[0].start_time,
+                        self.entries[-1].end_time
+                    )),
+                    self.entries,
+                    msg=suffix
+                )
+
+                with self.assertRaises(KeyError):
+                    import_entries(controller, path, chunk_size=7)
+
+    def test_round_trip_microseconds(self):
+        start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+        # sub-second entries, which are empty if truncated to seconds
+        entries = [
+            Entry(
+                start + timedelta(seconds=i, microseconds=250_000),
+                start + timedelta(seconds=i, microseconds=750_001),
+                'Work'
+            )
+            for i in range(3)
+        ]
+
+        for suffix in ('.csv', '.jsonl', '.ics'):
+            path = self.path(f'log{suffix}')
+
+            export_entries(MemoryController(*entries), path)
+
+            controller = MemoryController()
+            import_entries(controller, path)
+
+            self.assertEqual(list(controller), entries, msg=suffix)
+
+    def test_export_interval(self):
+        source = MockController(*self.entries)
+
+        interval = (
+            datetime(2022, 1, 1, 3, 30, tzinfo=timezone.utc),
+            datetime(2022, 1, 1, 20, tzinfo=timezone.utc)
+        )
+
+        path = self.path('log.jsonl')
+
+        export_entries(source, path, *interval, categories=['Work'])
+
+        controller = MemoryController()
+        import_entries(controller, path)
+
+        self.assertEqual(
+            tuple(controller),
+            source.get_intersection(*interval, ['Work'])
+        )
+
+    def test_import_invalid(self):
+        path = self.path('log.csv')
+
+        path.write_text(
+            'Start,End,Category\n'
+            '2022-01-01T09:00,2022-01-01T10:00,Work\n'
+            '\n'
+            '2022-01-01T11:00,2022-01-01T10:00,Work\n'
+        )
+
+        controller = MemoryController()
+
+        with self.assertRaisesRegex(ValueError, 'line 4'):
+            import_entries(controller, path)
+
+        # the invalid chunk is not created
+        self.assertEqual(len(controller), 0)
+
+        path.write_text('start,category\n')
+
+        with self.assertRaisesRegex(ValueError, 'end column'):
+            import_entries(controller, path)
+
+        path = self.path('log.jsonl')
+        path.write_text('{"start": "2022-01-01T09:00"}\n')
+
+        with self.assertRaisesRegex(ValueError, 'line 1'):
+            import_entries(controller, path)
+
+        with self.assertRaises(ValueError):
+            import_entries(controller, self.path('log.txt'))
+
+    def test_read_ics(self):
+        file = StringIO(
+            'BEGIN:VCALENDAR\r\n'
+            'BEGIN:VTIMEZONE\r\n'
+            'TZID:Europe/Copenhagen\r\n'
+            'END:VTIMEZONE\r\n'
+            'BEGIN:VEVENT\r\n'
+            'DTSTART;TZID="Europe/Copenhagen":20220701T090000\r\n'
+            'DTEND;TZID=Europe/Copenhagen:20220701T100000\r\n'
+            'SUMMARY:Work\r\n'
+            'DESCRIPTION:code review\\, then\r\n'
+            '  lunch\\nwith Ana\r\n'
+            'BEGIN:VALARM\r\n'
+            'DESCRIPTION:Reminder\r\n'
+            'END:VALARM\r\n'
+            'END:VEVENT\r\n'
+            'BEGIN:VEVENT\r\n'
+            'DTSTART;VALUE=DATE:20220702\r\n'
+            'DTEND;VALUE=DATE:20220703\r\n'
+            'SUMMARY:Holiday\r\n'
+            'END:VEVENT\r\n'
+            'END:VCALENDAR\r\n'
+        )
+
+        self.assertEqual(list(read_ics(file)), [
+            Entry(
+                datetime(2022, 7, 1, 7, tzinfo=timezone.utc),
+                datetime(2022, 7, 1, 8, tzinfo=timezone.utc),
+                'Work',
+                'code review, then lunch\nwith Ana'
+            ),
+            Entry(
+                datetime(2022, 7, 2, tzinfo=timezone.utc),
+                datetime(2022, 7, 3, tzinfo=timezone.utc),
+                'Holiday'
+            ),
+        ])
+
+        with self.assertRaisesRegex(ValueError, 'line 1'):
+            list(read_ics(StringIO(
+                'BEGIN:VEVENT\r\nDTSTART:20220701T090000Z\r\nEND:VEVENT\r\n'
+            )))
+
+        self.assertEqual(
+            list(read_ics(StringIO(
+                'BEGIN:VEVENT\r\n'
+                'DTSTART:20220701T090000.5Z\r\n'
+                'DTEND:20220701T090001.000001Z\r\n'
+                'SUMMARY:Work\r\n'
+                'END:VEVENT\r\n'
+            ))),
+            [Entry(
+                datetime(2022, 7, 1, 9, 0, 0, 500_000, tzinfo=timezone.utc),
+                datetime(2022, 7, 1, 9, 0, 1, 1, tzinfo=timezone.utc),
+                'Work'
+            )]
+        )
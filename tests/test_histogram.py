@@ -0,0 +1,124 @@
+import unittest
+
+from logpy import histogram
+from logpy.memory import MemoryController
+from logpy.model import Entry, to_epoch_us
+
+from .mock_controller import MockController
+
+from datetime import datetime, timedelta, timezone
+from random import Random
+
+
+def _entries():
+    random = Random(0)
+    start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+    entries = []
+
+    for i in range(200):
+        # entries of up to three hours with gaps of up to an hour
+        start += timedelta(minutes=random.randrange(60))
+        end = start + timedelta(minutes=random.randrange(1, 180))
+
+        entries.append(
+            Entry(start, end, ('Work', 'Personal', 'Sleep')[i % 3])
+        )
+
+        start = end
+
+    return entries
+
+
+class HistogramTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.entries = _entries()
+        self.controller = MemoryController(*self.entries)
+        self.mock = MockController(*self.entries)
+
+        self.interval = (
+            datetime(2022, 1, 2, 0, 30, tzinfo=timezone.utc),
+            datetime(2022, 1, 8, 12, 15, tzinfo=timezone.utc)
+        )
+
+    def assertBucketsEqual(self, result, bucket):
+        self.assertEqual(len(result), len(result.edges()))
+
+        for i, edge in enumerate(result.edges()):
+            expected = self.mock.total_duration(
+                edge,
+                min(edge + bucket, result.end_time)
+            )
+
+            self.assertEqual(result.totals(i), expected)
+
+    def test_histogram(self):
+        for bucket in (
+            timedelta(minutes=7),
+            timedelta(hours=1),
+            timedelta(days=1)
+        ):
+            result = self.controller.histogram(*self.interval, bucket)
+
+            self.assertBucketsEqual(result, bucket)
+
+    def test_histogram_total(self):
+        result = self.controller.histogram(
+            *self.interval,
+            timedelta(hours=5),
+            by=None
+        )
+
+        self.assertEqual(result.categories, (None,))
+        self.assertEqual(
+            sum(
+                (result.totals(i).get(None, timedelta())
+                for i in range(len(result))),
+                timedelta()
+            ),
+            self.mock.total_duration(*self.interval, by=None)
+        )
+
+    def test_histogram_python(self):
+        table = self.controller.get_intersection_table(*self.interval)
+        bucket_us = 3_600_000_000
+
+        start_us, end_us = (to_epoch_us(dt) for dt in self.interval)
+        buckets = -((start_us - end_us) // bucket_us)
+
+        durations = histogram._python_durations(
+            table, start_us, end_us, bucket_us, buckets, 'category'
+        )
+
+        result = histogram.Histogram(
+            *self.interval,
+            timedelta(hours=1),
+            tuple(table.categories),
+            durations
+        )
+
+        self.assertBucketsEqual(result, timedelta(hours=1))
+
+    def test_histogram_empty(self):
+        result = self.controller.histogram(
+            datetime(2021, 1, 1, tzinfo=timezone.utc),
+            datetime(2021, 1, 2, tzinfo=timezone.utc)
+        )
+
+        self.assertEqual(len(result), 24)
+        self.assertEqual(result.categories, ())
+        self.assertEqual(result.totals(0), {})
+
+    def test_histogram_validation(self):
+        with self.assertRaises(ValueError):
+            self.controller.histogram(*self.interval, timedelta())
+
+        with self.assertRaises(ValueError):
+            self.controller.histogram(*self.interval, by='description')
+
+        with self.assertRaises(ValueError):
+            self.controller.histogram(
+                datetime(2022, 1, 1),
+                self.interval[1]
+            )
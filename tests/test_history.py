@@ -0,0 +1,144 @@
+import unittest
+
+from logpy.history import History
+from logpy.memory import MemoryController
+from logpy.model import Entry
+
+from datetime import datetime, timedelta, timezone
+from random import Random
+
+
+class Clock:
+    """
+    A clock that advances a minute every time it is read
+    """
+
+    def __init__(self):
+        self.now = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+    def __call__(self) -> datetime:
+        self.now += timedelta(minutes=1)
+
+        return self.now
+
+
+class HistoryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+        self.controller = MemoryController(
+            Entry(self.start, self.start + timedelta(hours=1), 'Work')
+        )
+
+        self.clock = Clock()
+        self.history = History(self.controller, 7, self.clock)
+
+    def entry(self, i: int) -> Entry:
+        return Entry(
+            self.start + timedelta(hours=i),
+            self.start + timedelta(hours=i, minutes=30),
+            ('Work', 'Personal', 'Sleep')[i % 3]
+        )
+
+    def test_as_of(self):
+        random = Random(0)
+
+        # the expected log after every mutation
+        versions = [(self.history.start_time, tuple(self.controller))]
+
+        entries = set()
+
+        for _ in range(60):
+            i = random.randrange(1, 20)
+
+            if i in entries:
+                self.controller.delete_entry(self.entry(i))
+                entries.remove(i)
+            else:
+                self.controller.create_entry(self.entry(i))
+                entries.add(i)
+
+            versions.append((self.clock.now, tuple(self.controller)))
+
+        self.assertEqual(len(self.history), 60)
+
+        # the checkpoints only hold the entries that changed since the
+        # checkpoint before them
+        for _, added, removed in self.history._checkpoints:
+            self.assertLessEqual(len(added) + len(removed), 7)
+
+        for timestamp, expected in versions:
+            for dt in (timestamp, timestamp + timedelta(seconds=30)):
+                view = self.history.as_of(dt)
+
+                self.assertEqual(tuple(view), expected)
+                self.assertEqual(
+                    view.get_intersection(
+                        self.start,
+                        self.start + timedelta(days=1)
+                    ),
+                    expected
+                )
+
+    def test_as_of_batch(self):
+        self.controller.create_entries(self.entry(i) for i in range(1, 10))
+
+        view = self.history.as_of(self.clock.now)
+
+        self.assertEqual(len(view), 10)
+
+        # the view does not change with the log
+        self.controller.delete_entry(self.entry(1))
+
+        self.assertEqual(len(view), 10)
+
+    def test_as_of_replaced(self):
+        # an entry is replaced by another entry with the same start time,
+        # back and forth across the checkpoints
+        entries = [
+            Entry(self.start, self.start + timedelta(hours=1), category)
+            for category in ('Work', 'Personal', 'Sleep')
+        ]
+
+        versions = []
+
+        for i in range(20):
+            self.controller.delete_entry(entries[i % 3])
+            self.controller.create_entry(entries[(i + 1) % 3])
+
+            versions.append((self.clock.now, entries[(i + 1) % 3]))
+
+        for timestamp, entry in versions:
+            self.assertEqual(tuple(self.history.as_of(timestamp)), (entry,))
+
+    def test_clock_backwards(self):
+        self.controller.create_entry(self.entry(1))
+
+        # the clock is set back by an hour
+        self.clock.now -= timedelta(hours=1)
+
+        self.controller.create_entry(self.entry(2))
+
+        self.assertEqual(
+            self.history._timestamps,
+            sorted(self.history._timestamps)
+        )
+        self.assertEqual(
+            len(self.history.as_of(self.history._timestamps[-1])),
+            3
+        )
+
+    def test_as_of_validation(self):
+        with self.assertRaises(ValueError):
+            self.history.as_of(datetime(2022, 1, 1))
+
+        with self.assertRaises(ValueError):
+            self.history.as_of(self.start)
+
+    def test_close(self):
+        self.history.close()
+
+        self.controller.create_entry(self.entry(1))
+
+        self.assertEqual(len(self.history), 0)
@@ -0,0 +1,116 @@
+import unittest
+
+from logpy.instrument import instrument, uninstrument
+from logpy.memory import MemoryController
+from logpy.model import Entry
+
+from .mock_controller import MockController
+
+from datetime import datetime, timezone
+
+
+class InstrumentTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.entries = (
+            Entry(
+                datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc), 
+                'Work'
+            ),
+            Entry(
+                datetime(2022, 1, 2, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 2, 1, 30, tzinfo=timezone.utc), 
+                'Personal'
+            ),
+            Entry(
+                datetime(2022, 1, 3, 9, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 3, 10, 0, tzinfo=timezone.utc), 
+                'Work'
+            )
+        )
+
+        self.interval = (
+            datetime(2022, 1, 1, 0, 30, tzinfo=timezone.utc),
+            datetime(2022, 1, 2, 12, tzinfo=timezone.utc)
+        )
+
+    def test_fallback_round_trips(self):
+        controller = MockController(*self.entries)
+        stats = instrument(controller)
+
+        controller.get_intersection(*self.interval)
+
+        call = stats.calls['get_intersection']
+
+        # each direction ends with a lookup outside of the interval
+        self.assertEqual(call.hook_calls['_find_last_before'], 2)
+        self.assertEqual(call.hook_calls['_find_first_after'], 2)
+        self.assertEqual(call.hook_calls['_iter_range'], 1)
+        self.assertEqual(call.returned, 2)
+        self.assertEqual(stats.counts, {'get_intersection': 1})
+
+    def test_range_scan(self):
+        controller = MemoryController(*self.entries)
+        stats = instrument(controller)
+
+        controller.get_intersection(*self.interval)
+
+        call = stats.calls['get_intersection']
+
+        self.assertEqual(call.hook_calls, {'_iter_range': 1})
+        self.assertEqual(call.scanned, 2)
+        self.assertEqual(call.returned, 2)
+
+    def test_iterator_operation(self):
+        controller = MemoryController(*self.entries)
+        calls = []
+
+        stats = instrument(controller, calls.append)
+
+        iterator = controller.iter_intersection(*self.interval)
+
+        # the call is only recorded once the iterator is exhausted
+        self.assertEqual(calls, [])
+
+        self.assertEqual(len(list(iterator)), 2)
+
+        call = stats.calls['iter_intersection']
+
+        self.assertEqual(calls, [call])
+        self.assertEqual(call.hook_calls, {'_iter_range': 1})
+        self.assertEqual(call.scanned, 2)
+        self.assertEqual(call.returned, 2)
+
+    def test_nested_operations(self):
+        controller = MemoryController(*self.entries)
+        calls = []
+
+        instrument(controller, calls.append)
+
+        entry = Entry(
+            datetime(2022, 1, 4, tzinfo=timezone.utc),
+            datetime(2022, 1, 5, tzinfo=timezone.utc),
+            'Sleep'
+        )
+
+        controller.create_entry(entry)
+        controller.delete_entry(entry)
+
+        self.assertEqual(
+            [call.operation for call in calls], 
+            ['create_entry', 'delete_entry']
+        )
+        self.assertEqual(calls[0].hook_calls['_publish_entry'], 1)
+        self.assertEqual(calls[1].hook_calls['_retract_entry'], 1)
+
+    def test_uninstrument(self):
+        controller = MemoryController(*self.entries)
+        stats = instrument(controller)
+
+        uninstrument(controller)
+
+        controller.get_intersection(*self.interval)
+
+        self.assertEqual(stats.calls, {})
+        self.assertNotIn('get_intersection', vars(controller))
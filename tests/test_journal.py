@@ -0,0 +1,140 @@
+import unittest
+
+from logpy.journal import JournalController
+from logpy.model import Entry
+
+from datetime import datetime, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+
+class JournalControllerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = Path(self.directory.name) / 'log.jsonl'
+
+        self.entries = (
+            Entry(
+                datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc),
+                datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc),
+                'Work',
+                'standup'
+            ),
+            Entry(
+                datetime(2022, 1, 2, 0, 0, tzinfo=timezone.utc),
+                datetime(2022, 1, 2, 1, 30, tzinfo=timezone.utc),
+                'Personal'
+            ),
+            Entry(
+                datetime(2022, 1, 3, 9, 0, tzinfo=timezone.utc),
+                datetime(2022, 1, 3, 10, 0, tzinfo=timezone.utc),
+                'Work'
+            )
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_replay(self):
+        with JournalController(self.path) as controller:
+            for entry in self.entries:
+                controller.create_entry(entry)
+
+            controller.delete_entry(self.entries[1])
+
+        with JournalController(self.path) as controller:
+            self.assertEqual(
+                tuple(controller),
+                (self.entries[0], self.entries[2])
+            )
+
+    def test_replay_delete_entries(self):
+        with JournalController(self.path) as controller:
+            controller.create_entries(self.entries)
+            controller.delete_entries(self.entries[:2])
+
+        with JournalController(self.path) as controller:
+            self.assertEqual(tuple(controller), self.entries[2:])
+
+    def test_snapshot_compacts_journal(self):
+        with JournalController(self.path, snapshot_every=4) as controller:
+            controller.create_entries(self.entries)
+            controller.delete_entry(self.entries[1])
+
+            # the snapshot was taken after the fourth mutation
+            self.assertEqual(len(self.path.read_text().splitlines()), 1)
+
+            controller.create_entry(self.entries[1])
+
+        self.assertEqual(len(self.path.read_text().splitlines()), 2)
+
+        with JournalController(self.path) as controller:
+            self.assertEqual(tuple(controller), self.entries)
+
+    def test_newer_snapshot_supersedes_journal(self):
+        with JournalController(self.path) as controller:
+            controller.create_entries(self.entries)
+
+            journal = self.path.read_text()
+
+            controller.snapshot()
+
+        # simulate a crash before the journal was started anew
+        self.path.write_text(journal)
+
+        with JournalController(self.path) as controller:
+            self.assertEqual(tuple(controller), self.entries)
+
+    def test_torn_last_line(self):
+        with JournalController(self.path) as controller:
+            controller.create_entries(self.entries)
+
+        with open(self.path, 'a') as file:
+            file.write('["creator", 16')
+
+        with JournalController(self.path) as controller:
+            self.assertEqual(tuple(controller), self.entries)
+
+            controller.delete_entry(self.entries[0])
+
+        with JournalController(self.path) as controller:
+            self.assertEqual(tuple(controller), self.entries[1:])
+
+    def test_lock(self):
+        with JournalController(self.path) as controller:
+            controller.create_entry(self.entries[0])
+
+            with self.assertRaises(OSError):
+                JournalController(self.path)
+
+            # the lock survives a snapshot that replaces the journal
+            controller.snapshot()
+
+            with self.assertRaises(OSError):
+                JournalController(self.path)
+
+        with JournalController(self.path) as controller:
+            self.assertEqual(tuple(controller), self.entries[:1])
+
+    def test_newer_journal(self):
+        with JournalController(self.path) as controller:
+            controller.create_entries(self.entries)
+            controller.snapshot()
+            controller.delete_entry(self.entries[0])
+
+        # simulate a snapshot that was restored from an older backup
+        snapshot_path = self.path.with_name(self.path.name + '.snapshot')
+        snapshot_path.write_text('{"generation": 0}\n')
+
+        journal = self.path.read_text()
+
+        with self.assertRaises(ValueError):
+            JournalController(self.path)
+
+        self.assertEqual(self.path.read_text(), journal)
+
+        # the failed controller released its lock, or this would raise an
+        # OSError
+        with self.assertRaises(ValueError):
+            JournalController(self.path)
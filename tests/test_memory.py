@@ -0,0 +1,332 @@
+import unittest
+
+from logpy.memory import MemoryController
+from logpy.model import Entry
+
+from .mock_controller import MockController
+
+from datetime import datetime, timedelta, timezone
+from random import Random
+
+
+class MemoryControllerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = MemoryController(
+            Entry(
+                datetime(2022, 1, 4, 10, 0, tzinfo=timezone.utc),
+                datetime(2022, 1, 4, 12, 0, tzinfo=timezone.utc),
+                'Personal'
+            ),
+            Entry(
+                datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc),
+                datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc),
+                'Work'
+            ),
+            Entry(
+                datetime(2022, 1, 2, 0, 0, tzinfo=timezone.utc),
+                datetime(2022, 1, 2, 1, 30, tzinfo=timezone.utc),
+                'Personal'
+            ),
+            Entry(
+                datetime(2022, 1, 3, 9, 0, tzinfo=timezone.utc),
+                datetime(2022, 1, 3, 10, 0, tzinfo=timezone.utc),
+                'Work'
+            )
+        )
+
+    def test_find_first_after_timezone_not_utc(self):
+        with self.assertRaises(ValueError):
+            self.controller._find_first_after(datetime(2022, 2, 2))
+
+    def test_find_last_before_timezone_not_utc(self):
+        with self.assertRaises(ValueError):
+            self.controller._find_last_before(datetime(2022, 2, 2))
+
+    def test_find_first_after(self):
+        entry = self.controller._find_first_after(
+            datetime(2022, 1, 1, 0, 30, tzinfo=timezone.utc)
+        )
+
+        expected = Entry(
+            datetime(2022, 1, 2, 0, 0, tzinfo=timezone.utc),
+            datetime(2022, 1, 2, 1, 30, tzinfo=timezone.utc),
+            'Personal'
+        )
+
+        self.assertEqual(entry, expected)
+
+    def test_find_first_after_there_is_none(self):
+        entry = self.controller._find_first_after(
+            datetime(2023, 1, 1, tzinfo=timezone.utc)
+        )
+
+        self.assertIsNone(entry)
+
+    def test_find_last_before(self):
+        entry = self.controller._find_last_before(
+            datetime(2022, 1, 3, 9, tzinfo=timezone.utc)
+        )
+
+        expected = Entry(
+            datetime(2022, 1, 3, 9, 0, tzinfo=timezone.utc),
+            datetime(2022, 1, 3, 10, 0, tzinfo=timezone.utc),
+            'Work'
+        )
+
+        self.assertEqual(entry, expected)
+
+    def test_find_last_before_there_is_none(self):
+        entry = self.controller._find_last_before(
+            datetime(2021, 1, 1, tzinfo=timezone.utc)
+        )
+
+        self.assertIsNone(entry)
+
+    def test_get_intersection_uses_iter_range(self):
+        def fail(dt):
+            raise AssertionError('the fallback path should not be used')
+
+        self.controller._find_first_after = fail
+        self.controller._find_last_before = fail
+
+        entries = self.controller.get_intersection(
+            datetime(2022, 1, 2, 1, tzinfo=timezone.utc),
+            datetime(2022, 1, 3, 9, 30, tzinfo=timezone.utc)
+        )
+
+        expected = (
+            Entry(
+                datetime(2022, 1, 2, 1, 0, tzinfo=timezone.utc),
+                datetime(2022, 1, 2, 1, 30, tzinfo=timezone.utc),
+                'Personal'
+            ),
+            Entry(
+                datetime(2022, 1, 3, 9, 0, tzinfo=timezone.utc),
+                datetime(2022, 1, 3, 9, 30, tzinfo=timezone.utc),
+                'Work'
+            )
+        )
+
+        self.assertEqual(entries, expected)
+
+    def test_create_and_delete_entry(self):
+        entry = Entry(
+            datetime(2022, 1, 1, 1, tzinfo=timezone.utc),
+            datetime(2022, 1, 2, 0, tzinfo=timezone.utc),
+            'Catter'
+        )
+
+        self.controller.create_entry(entry)
+
+        self.assertEqual(len(self.controller), 5)
+        self.assertEqual(list(self.controller), sorted(self.controller))
+        self.assertIn(entry, list(self.controller))
+
+        self.controller.delete_entry(entry)
+
+        self.assertEqual(len(self.controller), 4)
+        self.assertNotIn(entry, list(self.controller))
+
+    def test_create_entries(self):
+        entries = [
+            Entry(
+                datetime(2023, 1, 1, tzinfo=timezone.utc) + timedelta(hours=i),
+                datetime(2023, 1, 1, tzinfo=timezone.utc) + timedelta(
+                    hours=i, minutes=30
+                ),
+                'Work'
+            )
+            for i in range(100)
+        ]
+
+        expected = sorted(list(self.controller) + entries)
+
+        self.controller.create_entries(reversed(entries))
+
+        self.assertEqual(list(self.controller), expected)
+        self.assertEqual(len(self.controller), 104)
+
+    def test_retract_entry_does_not_exist(self):
+        entry = Entry(
+            datetime(2023, 1, 1, tzinfo=timezone.utc),
+            datetime(2024, 1, 1, tzinfo=timezone.utc),
+            'Category'
+        )
+
+        with self.assertRaises(KeyError):
+            self.controller._retract_entry(entry)
+
+
+class MemoryControllerBlocksTestCase(unittest.TestCase):
+    """
+    Compares a controller with tiny blocks against the mock controller, so
+    that splitting and merging of blocks is exercised
+    """
+
+    def setUp(self):
+        self.controller = MemoryController()
+        self.controller._load = 4
+
+        self.mock = MockController()
+
+        self.random = Random(0)
+
+    def _random_entry(self):
+        start = datetime(2022, 1, 1, tzinfo=timezone.utc) + timedelta(
+            minutes=self.random.randrange(10_000)
+        )
+
+        return Entry(
+            start,
+            start + timedelta(minutes=self.random.randrange(1, 30)),
+            self.random.choice(('Work', 'Personal'))
+        )
+
+    def test_random_operations(self):
+        entries = []
+
+        for _ in range(500):
+            if entries and self.random.random() < 0.3:
+                entry = entries.pop(self.random.randrange(len(entries)))
+
+                self.controller.delete_entry(entry)
+                self.mock.delete_entry(entry)
+
+                continue
+
+            entry = self._random_entry()
+
+            try:
+                self.mock.create_entry(entry)
+            except KeyError:
+                with self.assertRaises(KeyError):
+                    self.controller.create_entry(entry)
+
+                continue
+
+            self.controller.create_entry(entry)
+            entries.append(entry)
+
+        # a conflicting batch followed by one that fits into the gaps
+        batch = [self._random_entry() for _ in range(20)]
+
+        with self.assertRaises(KeyError):
+            self.mock.create_entries(batch)
+
+        with self.assertRaises(KeyError):
+            self.controller.create_entries(batch)
+
+        batch = [
+            Entry(
+                entry.end_time,
+                entry.end_time + timedelta.resolution,
+                'Gap'
+            )
+            for entry in self.mock.data[::5]
+            if not self.mock.get_intersection(
+                entry.end_time, entry.end_time + timedelta.resolution
+            )
+        ]
+
+        self.mock.create_entries(batch)
+        self.controller.create_entries(batch)
+
+        self.assertEqual(tuple(self.controller), self.mock.data)
+
+        start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+        for minutes in range(0, 10_000, 97):
+            dt = start + timedelta(minutes=minutes)
+
+            self.assertEqual(
+                self.controller._find_first_after(dt),
+                self.mock._find_first_after(dt)
+            )
+            self.assertEqual(
+                self.controller._find_last_before(dt),
+                self.mock._find_last_before(dt)
+            )
+            self.assertEqual(
+                self.controller.get_intersection(
+                    dt, dt + timedelta(hours=12)
+                ),
+                self.mock.get_intersection(dt, dt + timedelta(hours=12))
+            )
+
+            for hours in (1, 12, 24 * 7):
+                interval = (dt, dt + timedelta(hours=hours))
+
+                self.assertEqual(
+                    self.controller.total_duration(*interval),
+                    self.mock.total_duration(*interval)
+                )
+                self.assertEqual(
+                    self.controller.total_duration(*interval, by=None),
+                    self.mock.total_duration(*interval, by=None)
+                )
+
+    def test_total_duration_after_mutations(self):
+        interval = (
+            datetime(2022, 1, 1, tzinfo=timezone.utc),
+            datetime(2022, 1, 8, tzinfo=timezone.utc)
+        )
+
+        entries = []
+
+        for _ in range(300):
+            entry = self._random_entry()
+
+            try:
+                self.mock.create_entry(entry)
+            except KeyError:
+                continue
+
+            self.controller.create_entry(entry)
+            entries.append(entry)
+
+            # query in between, so that the tree is updated incrementally
+            self.assertEqual(
+                self.controller.total_duration(*interval),
+                self.mock.total_duration(*interval)
+            )
+
+        for entry in entries[::3]:
+            self.controller.delete_entry(entry)
+            self.mock.delete_entry(entry)
+
+            self.assertEqual(
+                self.controller.total_duration(*interval),
+                self.mock.total_duration(*interval)
+            )
+
+    def test_delete_entries(self):
+        for _ in range(300):
+            entry = self._random_entry()
+
+            try:
+                self.mock.create_entry(entry)
+            except KeyError:
+                continue
+
+            self.controller.create_entry(entry)
+
+        interval = (
+            datetime(2022, 1, 1, tzinfo=timezone.utc),
+            datetime(2022, 1, 8, tzinfo=timezone.utc)
+        )
+
+        # few entries are removed from their blocks one at a time, most of
+        # the entries are filtered out by rebuilding the blocks
+        for step in (40, 2):
+            entries = self.mock.data[::step]
+
+            self.mock.delete_entries(entries)
+            self.controller.delete_entries(entries)
+
+            self.assertEqual(tuple(self.controller), self.mock.data)
+            self.assertEqual(len(self.controller), len(self.mock.data))
+            self.assertEqual(
+                self.controller.total_duration(*interval),
+                self.mock.total_duration(*interval)
+            )
@@ -1,6 +1,8 @@
 import unittest
 
-from logpy.model import Entry, Mutation
+from logpy.model import (
+    Entry, EntryTable, Mutation, from_epoch_us, to_epoch_us
+)
 
 from datetime import datetime, timedelta, timezone
 
@@ -31,6 +33,50 @@ class EntryTestCase(unittest.TestCase):
         )
 
         self.assertEqual(entry.duration, timedelta(seconds=300))
+
+    def test_slots(self):
+        entry = Entry(
+            datetime(2023, 2, 21, 14, 40, tzinfo=timezone.utc),
+            datetime(2023, 2, 21, 14, 45, tzinfo=timezone.utc),
+            'Category'
+        )
+
+        self.assertFalse(hasattr(entry, '__dict__'))
+
+    def test_from_epoch_us(self):
+        entry = Entry.from_epoch_us(
+            1676990400000000, 
+            1676990700000000, 
+            'Category'
+        )
+
+        expected = Entry(
+            datetime(2023, 2, 21, 14, 40, tzinfo=timezone.utc),
+            datetime(2023, 2, 21, 14, 45, tzinfo=timezone.utc),
+            'Category'
+        )
+
+        self.assertEqual(entry, expected)
+
+    def test_from_epoch_us_validation(self):
+        with self.assertRaises(ValueError):
+            Entry.from_epoch_us(1676990700000000, 1676990400000000, 'Cat')
+
+    def test_trusted(self):
+        entry = Entry._trusted(
+            datetime(2023, 2, 21, 14, 40, tzinfo=timezone.utc),
+            datetime(2023, 2, 21, 14, 45, tzinfo=timezone.utc),
+            'Category'
+        )
+
+        expected = Entry(
+            datetime(2023, 2, 21, 14, 40, tzinfo=timezone.utc),
+            datetime(2023, 2, 21, 14, 45, tzinfo=timezone.utc),
+            'Category'
+        )
+
+        self.assertEqual(entry, expected)
+        self.assertEqual(hash(entry), hash(expected))
             
 
 class EntryIntersectionTestCase(unittest.TestCase):
@@ -138,4 +184,70 @@ class MutationTestCase(unittest.TestCase):
 
         with self.assertRaises(ValueError):
             Mutation(mutation_class, entry)
-            
\ No newline at end of file
+            
+
+
+class EpochTestCase(unittest.TestCase):
+    def test_round_trip(self):
+        dt = datetime(2023, 2, 21, 18, 35, 1, 123456, tzinfo=timezone.utc)
+
+        self.assertEqual(to_epoch_us(dt), 1677004501123456)
+        self.assertEqual(from_epoch_us(to_epoch_us(dt)), dt)
+
+    def test_to_epoch_us_not_utc(self):
+        with self.assertRaises(ValueError):
+            to_epoch_us(datetime(2023, 2, 21, 18, 35))
+
+
+class EntryTableTestCase(unittest.TestCase):
+    def setUp(self):
+        self.entries = (
+            Entry(
+                datetime(2023, 2, 21, 18, 35, tzinfo=timezone.utc),
+                datetime(2023, 2, 21, 18, 40, tzinfo=timezone.utc),
+                'Work',
+                'standup'
+            ),
+            Entry(
+                datetime(2023, 2, 21, 18, 40, tzinfo=timezone.utc),
+                datetime(2023, 2, 21, 19, 0, tzinfo=timezone.utc),
+                'Personal'
+            ),
+            Entry(
+                datetime(2023, 2, 21, 19, 0, tzinfo=timezone.utc),
+                datetime(2023, 2, 21, 20, 0, tzinfo=timezone.utc),
+                'Work'
+            )
+        )
+
+        self.table = EntryTable(self.entries)
+
+    def test_iteration(self):
+        self.assertEqual(len(self.table), 3)
+        self.assertEqual(tuple(self.table), self.entries)
+
+    def test_indexing(self):
+        self.assertEqual(self.table[0], self.entries[0])
+        self.assertEqual(self.table[-1], self.entries[-1])
+
+        with self.assertRaises(IndexError):
+            self.table[3]
+
+    def test_slicing(self):
+        self.assertEqual(tuple(self.table[1:]), self.entries[1:])
+
+    def test_dictionary_encoding(self):
+        self.assertEqual(self.table.categories, ['Work', 'Personal'])
+        self.assertEqual(list(self.table.category_ids), [0, 1, 0])
+
+    def test_columns(self):
+        self.assertEqual(
+            list(self.table.start_us),
+            [to_epoch_us(entry.start_time) for entry in self.entries]
+        )
+        self.assertEqual(self.table.start_us.typecode, 'q')
+        self.assertEqual(self.table.end_us.typecode, 'q')
+
+    def test_append_us_validation(self):
+        with self.assertRaises(ValueError):
+            self.table.append_us(10, 10, 'Work')
@@ -0,0 +1,269 @@
+import unittest
+
+from logpy.memory import MemoryController
+from logpy.model import Entry
+from logpy.cache import CachingMutatorController
+from logpy.search import CategoryIndex, TokenIndex, tokenize
+from logpy.shard import ShardedController
+from logpy.sqlite import SQLiteController
+
+from .mock_controller import MockController
+
+from datetime import datetime, timedelta, timezone
+
+
+DESCRIPTIONS = (
+    'Daily standup',
+    'standup, then code review',
+    'Code review of the parser',
+    '',
+    'Lunch with Ana',
+)
+
+
+def _entries():
+    start = datetime(2021, 12, 1, tzinfo=timezone.utc)
+
+    return [
+        Entry(
+            start + timedelta(hours=7 * i),
+            start + timedelta(hours=7 * i + 5),
+            ('Work', 'Personal', 'Deep work')[i % 3],
+            DESCRIPTIONS[i % len(DESCRIPTIONS)]
+        )
+        for i in range(300)
+    ]
+
+
+class TokenizeTestCase(unittest.TestCase):
+
+    def test_tokenize(self):
+        self.assertEqual(
+            tokenize('Standup, then code_review!'),
+            ['standup', 'then', 'code', 'review']
+        )
+
+
+class TokenIndexTestCase(unittest.TestCase):
+
+    def test_add_remove(self):
+        entries = _entries()[:10]
+
+        index = TokenIndex(reversed(entries))
+
+        interval = (entries[0].start_time, entries[-1].end_time)
+
+        self.assertEqual(
+            list(index.search('STANDUP', *interval)),
+            [entries[0], entries[1], entries[5], entries[6]]
+        )
+
+        index.remove(entries[1])
+
+        self.assertEqual(
+            list(index.search('standup review', *interval)),
+            [entries[6]]
+        )
+        self.assertEqual(list(index.search('missing', *interval)), [])
+        self.assertEqual(list(index.search('', *interval)), [])
+
+
+class SearchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.entries = _entries()
+        self.mock = MockController(*self.entries)
+
+        self.sqlite = SQLiteController()
+        self.sqlite.create_entries(self.entries)
+
+        self.sharded = ShardedController(lambda key: MemoryController())
+        self.sharded.create_entries(self.entries)
+
+        self.controllers = (
+            MemoryController(*self.entries),
+            self.sqlite,
+            self.sharded,
+        )
+
+        self.queries = ('standup', 'code review', 'deep', 'lunch work', 'x')
+
+    def tearDown(self):
+        self.sqlite.close()
+
+    def test_search(self):
+        start = self.entries[0].start_time
+
+        intervals = (
+            (None, None),
+            (start + timedelta(days=3, hours=1), None),
+            (None, start + timedelta(days=40)),
+            (start + timedelta(days=29, hours=2), start + timedelta(days=32)),
+        )
+
+        for controller in self.controllers:
+            for query in self.queries:
+                for interval in intervals:
+                    expected = self.mock.search(query, *interval)
+
+                    self.assertEqual(
+                        controller.search(query, *interval),
+                        expected
+                    )
+
+        # the default implementation scans the interval
+        self.assertEqual(len(self.mock.search('standup')), 120)
+        self.assertEqual(
+            self.mock.search('review', *intervals[3]),
+            tuple(
+                entry for entry in self.entries
+                if 'review' in entry.description and
+                entry.end_time > intervals[3][0] and
+                entry.start_time < intervals[3][1]
+            )
+        )
+
+    def test_search_after_mutations(self):
+        for controller in self.controllers:
+            # build the index before mutating the log
+            controller.search('standup')
+
+            controller.delete_entry(self.entries[0])
+            controller.create_entry(Entry(
+                self.entries[-1].end_time,
+                self.entries[-1].end_time + timedelta(hours=1),
+                'Work',
+                'Retro and standup'
+            ))
+
+            found = controller.search('standup')
+
+            self.assertEqual(len(found), 120)
+            self.assertNotIn(self.entries[0], found)
+            self.assertEqual(found[-1].description, 'Retro and standup')
+
+    def test_search_not_utc(self):
+        with self.assertRaises(ValueError):
+            self.mock.search('standup', datetime(2022, 1, 1))
+
+
+class CategoryIndexTestCase(unittest.TestCase):
+
+    def test_iter_range(self):
+        entries = _entries()[:10]
+
+        index = CategoryIndex(reversed(entries))
+
+        interval = (entries[1].start_time, entries[7].start_time)
+
+        self.assertEqual(
+            list(index.iter_range(*interval, frozenset({'Work', 'Missing'}))),
+            [entries[3], entries[6]]
+        )
+
+        index.remove(entries[3])
+
+        self.assertEqual(
+            list(index.iter_range(*interval, frozenset({'Work'}))),
+            [entries[6]]
+        )
+        self.assertEqual(list(index.iter_range(*interval, frozenset())), [])
+
+
+class CategoriesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.entries = _entries()
+        self.mock = MockController(*self.entries)
+
+        self.sqlite = SQLiteController()
+        self.sqlite.create_entries(self.entries)
+
+        self.sharded = ShardedController(lambda key: MemoryController())
+        self.sharded.create_entries(self.entries)
+
+        self.controllers = (
+            MemoryController(*self.entries),
+            self.sqlite,
+            self.sharded,
+            CachingMutatorController(MemoryController(*self.entries)),
+        )
+
+        start = self.entries[0].start_time
+
+        # the second interval starts within an entry that crosses shards
+        self.intervals = (
+            (start + timedelta(days=3, hours=1), start + timedelta(days=9)),
+            (start + timedelta(days=31, hours=1), start + timedelta(days=45)),
+        )
+
+        self.categories = (['Deep work'], ('Work', 'Personal'), [], {'x'})
+
+    def tearDown(self):
+        self.sqlite.close()
+
+    def test_get_intersection(self):
+        for controller in self.controllers:
+            for interval in self.intervals:
+                for categories in self.categories:
+                    expected = self.mock.get_intersection(
+                        *interval,
+                        categories
+                    )
+
+                    self.assertEqual(
+                        controller.get_intersection(*interval, categories),
+                        expected
+                    )
+                    self.assertEqual(
+                        tuple(controller.get_intersection_table(
+                            *interval,
+                            categories
+                        )),
+                        expected
+                    )
+                    self.assertEqual(
+                        controller.total_duration(
+                            *interval,
+                            categories=categories
+                        ),
+                        self.mock.total_duration(
+                            *interval,
+                            categories=categories
+                        )
+                    )
+
+        # the default implementation filters the interval
+        self.assertEqual(
+            self.mock.get_intersection(*self.intervals[0], ['Deep work']),
+            tuple(
+                entry for entry in self.mock.get_intersection(
+                    *self.intervals[0]
+                )
+                if entry.category == 'Deep work'
+            )
+        )
+
+    def test_categories_after_mutations(self):
+        memory = self.controllers[0]
+
+        # build the index before mutating the log
+        memory.get_intersection(*self.intervals[0], ['Work'])
+
+        memory.delete_entry(self.entries[12])
+        self.mock.delete_entry(self.entries[12])
+
+        self.assertEqual(
+            memory.get_intersection(*self.intervals[0], ['Work']),
+            self.mock.get_intersection(*self.intervals[0], ['Work'])
+        )
+
+    def test_iter_intersection_categories(self):
+        for controller in self.controllers:
+            self.assertEqual(
+                tuple(controller.iter_intersection(
+                    *self.intervals[1],
+                    categories=['Personal']
+                )),
+                self.mock.get_intersection(*self.intervals[1], ['Personal'])
+            )
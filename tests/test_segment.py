@@ -0,0 +1,134 @@
+import unittest
+
+from logpy.model import Entry
+from logpy.segment import SegmentController, write_segment
+
+from .mock_controller import MockController
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+
+class SegmentControllerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = Path(self.directory.name) / 'log.segment'
+
+        start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+        self.entries = tuple(
+            Entry(
+                start + timedelta(hours=i),
+                start + timedelta(hours=i, minutes=45),
+                ('Work', 'Personal', 'Sleep')[i % 3],
+                f'entry {i}' if i % 2 else ''
+            )
+            for i in range(100)
+        )
+
+        write_segment(self.path, self.entries)
+
+        self.controller = SegmentController(self.path)
+        self.mock = MockController(*self.entries)
+
+    def tearDown(self):
+        self.controller.close()
+        self.directory.cleanup()
+
+    def test_len(self):
+        self.assertEqual(len(self.controller), 100)
+
+    def test_find_first_after(self):
+        for entry in self.entries[::7]:
+            for dt in (
+                entry.start_time - timedelta(minutes=1),
+                entry.start_time,
+                entry.start_time + timedelta(minutes=1)
+            ):
+                self.assertEqual(
+                    self.controller._find_first_after(dt),
+                    self.mock._find_first_after(dt)
+                )
+
+    def test_find_last_before(self):
+        for entry in self.entries[::7]:
+            for dt in (
+                entry.start_time - timedelta(minutes=1),
+                entry.start_time,
+                entry.start_time + timedelta(minutes=1)
+            ):
+                self.assertEqual(
+                    self.controller._find_last_before(dt),
+                    self.mock._find_last_before(dt)
+                )
+
+    def test_find_not_utc(self):
+        with self.assertRaises(ValueError):
+            self.controller._find_first_after(datetime(2022, 1, 1))
+
+    def test_get_intersection(self):
+        interval = (
+            datetime(2022, 1, 1, 3, 30, tzinfo=timezone.utc),
+            datetime(2022, 1, 2, 5, 15, tzinfo=timezone.utc)
+        )
+
+        self.assertEqual(
+            self.controller.get_intersection(*interval),
+            self.mock.get_intersection(*interval)
+        )
+        self.assertEqual(
+            tuple(self.controller.get_intersection_table(*interval)),
+            self.mock.get_intersection(*interval)
+        )
+
+    def test_get_intersection_categories(self):
+        interval = (
+            datetime(2022, 1, 1, 3, 30, tzinfo=timezone.utc),
+            datetime(2022, 1, 2, 5, 15, tzinfo=timezone.utc)
+        )
+
+        for categories in (['Sleep'], ['Work', 'Personal'], ['Missing']):
+            expected = self.mock.get_intersection(*interval, categories)
+
+            self.assertEqual(
+                self.controller.get_intersection(*interval, categories),
+                expected
+            )
+            self.assertEqual(
+                tuple(self.controller.get_intersection_table(
+                    *interval,
+                    categories
+                )),
+                expected
+            )
+
+    def test_not_a_segment(self):
+        path = Path(self.directory.name) / 'other'
+        path.write_bytes(bytes(64))
+
+        with self.assertRaises(ValueError):
+            SegmentController(path)
+
+    def test_write_unsorted(self):
+        with self.assertRaises(ValueError):
+            write_segment(
+                Path(self.directory.name) / 'unsorted', 
+                reversed(self.entries)
+            )
+
+    def test_empty(self):
+        path = Path(self.directory.name) / 'empty'
+
+        write_segment(path, ())
+
+        with SegmentController(path) as controller:
+            self.assertEqual(len(controller), 0)
+            self.assertEqual(
+                controller.get_intersection(
+                    datetime(2022, 1, 1, tzinfo=timezone.utc),
+                    datetime(2023, 1, 1, tzinfo=timezone.utc)
+                ),
+                ()
+            )
@@ -0,0 +1,258 @@
+import unittest
+
+from logpy.memory import MemoryController
+from logpy.model import Entry
+from logpy.shard import ShardedController, by_month, by_year
+from logpy.sqlite import SQLiteController
+
+from .mock_controller import MockController
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+
+class FailingController(MemoryController):
+    """
+    A shard whose batch mutations fail, as a shard on a full disk would
+    """
+
+    def _publish_entries(self, entries):
+        raise OSError('the shard is not writable')
+
+    def _retract_entries(self, entries):
+        raise OSError('the shard is not writable')
+
+
+class ShardedControllerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        start = datetime(2021, 11, 21, tzinfo=timezone.utc)
+
+        # entries of two days with a day in between, so some of them cross
+        # the boundaries of the months
+        self.entries = tuple(
+            Entry(
+                start + timedelta(days=3 * i),
+                start + timedelta(days=3 * i + 2),
+                ('Work', 'Personal', 'Sleep')[i % 3]
+            )
+            for i in range(40)
+        )
+
+        self.executor = ThreadPoolExecutor(4)
+
+        self.controller = ShardedController(
+            lambda key: MemoryController(),
+            executor=self.executor
+        )
+        self.controller.create_entries(self.entries)
+
+        self.mock = MockController(*self.entries)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_shards(self):
+        self.assertEqual(len(self.controller), 40)
+        self.assertEqual(
+            list(self.controller.shards),
+            [
+                datetime(2021, 11, 1, tzinfo=timezone.utc),
+                datetime(2021, 12, 1, tzinfo=timezone.utc),
+                datetime(2022, 1, 1, tzinfo=timezone.utc),
+                datetime(2022, 2, 1, tzinfo=timezone.utc),
+                datetime(2022, 3, 1, tzinfo=timezone.utc),
+            ]
+        )
+
+        # the entry crossing into December is owned by November
+        self.assertEqual(
+            len(self.controller.shards[
+                datetime(2021, 11, 1, tzinfo=timezone.utc)
+            ]),
+            4
+        )
+
+    def test_find(self):
+        for entry in self.entries:
+            for dt in (
+                entry.start_time - timedelta(hours=1),
+                entry.start_time,
+                entry.end_time
+            ):
+                self.assertEqual(
+                    self.controller._find_first_after(dt),
+                    self.mock._find_first_after(dt)
+                )
+                self.assertEqual(
+                    self.controller._find_last_before(dt),
+                    self.mock._find_last_before(dt)
+                )
+
+    def test_get_intersection(self):
+        start = datetime(2021, 11, 1, tzinfo=timezone.utc)
+
+        for days in range(0, 130, 7):
+            for length in (1, 12, 45):
+                interval = (
+                    start + timedelta(days=days, hours=5),
+                    start + timedelta(days=days + length)
+                )
+
+                self.assertEqual(
+                    self.controller.get_intersection(*interval),
+                    self.mock.get_intersection(*interval)
+                )
+                self.assertEqual(
+                    tuple(self.controller.get_intersection_table(*interval)),
+                    self.mock.get_intersection(*interval)
+                )
+                self.assertEqual(
+                    tuple(self.controller.iter_intersection(*interval)),
+                    self.mock.get_intersection(*interval)
+                )
+                self.assertEqual(
+                    self.controller.total_duration(*interval),
+                    self.mock.total_duration(*interval)
+                )
+
+    def test_sqlite_shards(self):
+        self.controller = ShardedController(
+            lambda key: SQLiteController(),
+            executor=self.executor
+        )
+        self.controller.create_entries(self.entries)
+
+        interval = (
+            datetime(2021, 11, 25, tzinfo=timezone.utc),
+            datetime(2022, 2, 10, tzinfo=timezone.utc)
+        )
+
+        self.assertEqual(
+            self.controller.get_intersection(*interval, ['Work']),
+            self.mock.get_intersection(*interval, ['Work'])
+        )
+        self.assertEqual(
+            self.controller.total_duration(*interval),
+            self.mock.total_duration(*interval)
+        )
+
+        self.controller.close()
+
+    def test_get_intersection_not_utc(self):
+        with self.assertRaises(ValueError):
+            self.controller.get_intersection(
+                datetime(2022, 1, 1),
+                datetime(2022, 1, 2, tzinfo=timezone.utc)
+            )
+
+        with self.assertRaises(ValueError):
+            self.controller._find_first_after(datetime(2022, 1, 1))
+
+    def test_create_entry_conflict_across_shards(self):
+        # the entry starting on the 30th of November runs into December
+        with self.assertRaises(KeyError):
+            self.controller.create_entry(Entry(
+                datetime(2021, 12, 1, 0, 0, tzinfo=timezone.utc),
+                datetime(2021, 12, 1, 1, 0, tzinfo=timezone.utc),
+                'Work'
+            ))
+
+        self.assertEqual(len(self.controller), 40)
+
+    def test_delete_entry(self):
+        self.controller.delete_entry(self.entries[3])
+
+        self.assertEqual(len(self.controller), 39)
+
+        with self.assertRaises(KeyError):
+            self.controller.delete_entry(self.entries[3])
+
+        with self.assertRaises(KeyError):
+            self.controller._retract_entry(Entry(
+                datetime(2030, 1, 1, tzinfo=timezone.utc),
+                datetime(2030, 1, 2, tzinfo=timezone.utc),
+                'Work'
+            ))
+
+    def test_delete_entries(self):
+        self.controller.delete_entries(self.entries[5:30])
+
+        self.assertEqual(
+            tuple(self.controller._iter_range(
+                self.entries[0].start_time,
+                self.entries[-1].end_time
+            )),
+            self.entries[:5] + self.entries[30:]
+        )
+
+        start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+        end = datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+        self.assertEqual(
+            self.controller.delete_range(start, end),
+            self.entries[30:]
+        )
+        self.assertEqual(len(self.controller), 5)
+
+    def test_create_entries_rollback(self):
+        march = datetime(2022, 3, 1, tzinfo=timezone.utc)
+
+        controller = ShardedController(
+            lambda key: FailingController() if key == march
+            else MemoryController()
+        )
+
+        with self.assertRaises(OSError):
+            controller.create_entries(self.entries)
+
+        # the shards before March are restored
+        self.assertEqual(len(controller), 0)
+
+    def test_delete_entries_rollback(self):
+        self.controller.shards[
+            datetime(2022, 3, 1, tzinfo=timezone.utc)
+        ].__class__ = FailingController
+
+        with self.assertRaises(OSError):
+            self.controller.delete_entries(self.entries)
+
+        self.assertEqual(
+            tuple(self.controller._iter_range(
+                self.entries[0].start_time,
+                self.entries[-1].end_time
+            )),
+            self.entries
+        )
+
+    def test_retract_entries_missing_shard(self):
+        with self.assertRaises(KeyError):
+            self.controller._retract_entries(self.entries + (Entry(
+                datetime(2030, 1, 1, tzinfo=timezone.utc),
+                datetime(2030, 1, 2, tzinfo=timezone.utc),
+                'Work'
+            ),))
+
+        self.assertEqual(len(self.controller), 40)
+
+    def test_by_year(self):
+        controller = ShardedController(lambda key: MemoryController(), by_year)
+        controller.create_entries(self.entries)
+
+        self.assertEqual(len(controller.shards), 2)
+        self.assertEqual(
+            controller.get_intersection(
+                datetime(2021, 12, 30, tzinfo=timezone.utc),
+                datetime(2022, 1, 10, tzinfo=timezone.utc)
+            ),
+            self.mock.get_intersection(
+                datetime(2021, 12, 30, tzinfo=timezone.utc),
+                datetime(2022, 1, 10, tzinfo=timezone.utc)
+            )
+        )
+
+    def test_by_month(self):
+        self.assertEqual(
+            by_month(datetime(2022, 2, 14, 12, tzinfo=timezone.utc)),
+            datetime(2022, 2, 1, tzinfo=timezone.utc)
+        )
@@ -0,0 +1,251 @@
+import unittest
+
+from logpy.model import Entry
+from logpy.sqlite import SQLiteController
+
+from .mock_controller import MockController
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+
+class SQLiteControllerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+        self.entries = tuple(
+            Entry(
+                start + timedelta(hours=i),
+                start + timedelta(hours=i, minutes=45),
+                ('Work', 'Personal', 'Sleep')[i % 3],
+                f'entry {i}' if i % 2 else ''
+            )
+            for i in range(50)
+        )
+
+        self.controller = SQLiteController()
+        self.controller.create_entries(self.entries)
+
+        self.mock = MockController(*self.entries)
+
+    def tearDown(self):
+        self.controller.close()
+
+    def test_len(self):
+        self.assertEqual(len(self.controller), 50)
+
+    def test_find(self):
+        for entry in self.entries[::7]:
+            for dt in (
+                entry.start_time - timedelta(minutes=1),
+                entry.start_time,
+                entry.start_time + timedelta(minutes=1)
+            ):
+                self.assertEqual(
+                    self.controller._find_first_after(dt),
+                    self.mock._find_first_after(dt)
+                )
+                self.assertEqual(
+                    self.controller._find_last_before(dt),
+                    self.mock._find_last_before(dt)
+                )
+
+    def test_find_not_utc(self):
+        with self.assertRaises(ValueError):
+            self.controller._find_last_before(datetime(2022, 1, 1))
+
+    def test_get_intersection(self):
+        start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+        for minutes in range(0, 60 * 50, 37):
+            interval = (
+                start + timedelta(minutes=minutes),
+                start + timedelta(minutes=minutes + 150)
+            )
+
+            self.assertEqual(
+                self.controller.get_intersection(*interval),
+                self.mock.get_intersection(*interval)
+            )
+            self.assertEqual(
+                self.controller.total_duration(*interval),
+                self.mock.total_duration(*interval)
+            )
+
+    def test_iter_range_chunks(self):
+        self.controller._chunk_size = 7
+
+        start = datetime(2022, 1, 1, 0, 30, tzinfo=timezone.utc)
+        end = datetime(2022, 1, 3, tzinfo=timezone.utc)
+
+        self.assertEqual(
+            tuple(self.controller._iter_range(start, end)),
+            tuple(self.mock._iter_range(start, end))
+        )
+
+    def test_iter_range_chunks_seek(self):
+        self.controller._chunk_size = 7
+
+        statements = []
+        self.controller._connection.set_trace_callback(statements.append)
+
+        start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+        end = datetime(2022, 1, 3, tzinfo=timezone.utc)
+
+        entries = tuple(self.controller._iter_range(start, end))
+        self.assertEqual(len(entries), 48)
+
+        self.controller._connection.set_trace_callback(None)
+
+        # only the first chunk looks up the lower bound of the interval, the
+        # later chunks seek past the last row of the chunk before them
+        self.assertEqual(len(statements), 7)
+        self.assertIn('max(start_us)', statements[0])
+
+        for statement in statements[1:]:
+            self.assertNotIn('max(start_us)', statement)
+            self.assertIn('start_us >', statement)
+
+    def test_iter_categories_chunks(self):
+        self.controller._chunk_size = 3
+
+        statements = []
+        self.controller._connection.set_trace_callback(statements.append)
+
+        start = datetime(2022, 1, 1, 0, 30, tzinfo=timezone.utc)
+        end = datetime(2022, 1, 2, 3, tzinfo=timezone.utc)
+        categories = frozenset({'Work', 'Sleep'})
+
+        self.assertEqual(
+            tuple(self.controller._iter_categories(start, end, categories)),
+            tuple(self.mock._iter_categories(start, end, categories))
+        )
+
+        self.controller._connection.set_trace_callback(None)
+
+        # every category is scanned separately in chunks of its own
+        self.assertEqual(len(statements), 2 * 4)
+
+        for statement in statements:
+            self.assertIn('category =', statement)
+            self.assertNotIn('IN (', statement)
+
+    def test_has_conflict(self):
+        start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+        for minutes in range(-60, 60 * 51, 5):
+            for duration in (1, 15, 20, 90):
+                interval = (
+                    start + timedelta(minutes=minutes),
+                    start + timedelta(minutes=minutes + duration)
+                )
+
+                self.assertEqual(
+                    self.controller._has_conflict(*interval),
+                    bool(self.mock.get_intersection(*interval))
+                )
+
+    def test_delete_range(self):
+        start = datetime(2022, 1, 1, 3, 30, tzinfo=timezone.utc)
+        end = datetime(2022, 1, 2, 5, 15, tzinfo=timezone.utc)
+
+        expected = self.mock.delete_range(start, end, ['Work', 'Sleep'])
+
+        self.assertEqual(
+            self.controller.delete_range(start, end, ['Work', 'Sleep']),
+            expected
+        )
+        self.assertEqual(len(self.controller), 50 - len(expected))
+        self.assertEqual(
+            self.controller.get_intersection(start, end),
+            self.mock.get_intersection(start, end)
+        )
+
+    def test_retract_entries_rollback(self):
+        with self.assertRaises(KeyError):
+            self.controller._retract_entries((
+                self.entries[0],
+                Entry(
+                    self.entries[1].start_time,
+                    self.entries[1].end_time,
+                    'Other'
+                )
+            ))
+
+        self.assertEqual(len(self.controller), 50)
+
+    def test_create_entry_conflict(self):
+        with self.assertRaises(KeyError):
+            self.controller.create_entry(Entry(
+                datetime(2022, 1, 1, 0, 30, tzinfo=timezone.utc),
+                datetime(2022, 1, 1, 0, 50, tzinfo=timezone.utc),
+                'Work'
+            ))
+
+        self.assertEqual(len(self.controller), 50)
+
+    def test_delete_entry(self):
+        self.controller.delete_entry(self.entries[3])
+
+        self.assertEqual(len(self.controller), 49)
+        self.assertEqual(
+            self.controller._find_first_after(self.entries[3].start_time),
+            self.entries[4]
+        )
+
+        with self.assertRaises(KeyError):
+            self.controller._retract_entry(self.entries[3])
+
+
+class SQLiteControllerFileTestCase(unittest.TestCase):
+
+    def test_persistence(self):
+        entry = Entry(
+            datetime(2022, 1, 1, tzinfo=timezone.utc),
+            datetime(2022, 1, 1, 1, tzinfo=timezone.utc),
+            'Work'
+        )
+
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / 'log.sqlite'
+
+            with SQLiteController(path) as controller:
+                controller.create_entry(entry)
+
+            with SQLiteController(path) as controller:
+                self.assertEqual(
+                    controller._find_first_after(entry.start_time),
+                    entry
+                )
+
+    def test_search_persistence(self):
+        entries = [
+            Entry(
+                datetime(2022, 1, 1, i, tzinfo=timezone.utc),
+                datetime(2022, 1, 1, i, 30, tzinfo=timezone.utc),
+                'Work',
+                f'standup {i}'
+            )
+            for i in range(3)
+        ]
+
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / 'log.sqlite'
+
+            with SQLiteController(path) as controller:
+                controller.create_entry(entries[0])
+
+            with SQLiteController(path) as controller:
+                # the index of the reopened database is extended
+                controller.create_entries(entries[1:])
+
+                self.assertEqual(controller.search('standup'), tuple(entries))
+
+                controller.delete_entry(entries[1])
+
+                self.assertEqual(
+                    controller.search('standup'),
+                    (entries[0], entries[2])
+                )
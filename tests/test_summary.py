@@ -0,0 +1,76 @@
+import unittest
+
+from logpy.memory import MemoryController
+from logpy.model import Entry
+from logpy.summary import CategoryTotals, DailyTotals
+
+from datetime import date, datetime, timedelta, timezone
+
+
+class MaterializedViewTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.controller = MemoryController(
+            Entry(
+                datetime(2022, 1, 1, 0, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 1, 1, 0, tzinfo=timezone.utc), 
+                'Work'
+            ),
+            Entry(
+                datetime(2022, 1, 1, 23, 0, tzinfo=timezone.utc), 
+                datetime(2022, 1, 2, 1, 30, tzinfo=timezone.utc), 
+                'Personal'
+            )
+        )
+
+        self.categories = CategoryTotals()
+        self.days = DailyTotals()
+
+        for view in (self.categories, self.days):
+            view.rebuild(self.controller)
+
+            self.controller.subscribe(view)
+
+    def test_rebuild(self):
+        self.assertEqual(
+            self.categories.totals(),
+            {'Work': timedelta(hours=1), 'Personal': timedelta(hours=2.5)}
+        )
+        self.assertEqual(
+            self.days.totals(date(2022, 1, 1)),
+            {'Work': timedelta(hours=1), 'Personal': timedelta(hours=1)}
+        )
+        self.assertEqual(
+            self.days.totals(date(2022, 1, 2)),
+            {'Personal': timedelta(hours=1.5)}
+        )
+
+    def test_incremental(self):
+        entry = Entry(
+            datetime(2022, 1, 2, 8, tzinfo=timezone.utc),
+            datetime(2022, 1, 2, 9, tzinfo=timezone.utc),
+            'Work'
+        )
+
+        self.controller.create_entry(entry)
+
+        self.assertEqual(
+            self.days.range_totals(date(2022, 1, 1), date(2022, 1, 3)),
+            self.controller.total_duration(
+                datetime(2022, 1, 1, tzinfo=timezone.utc),
+                datetime(2022, 1, 3, tzinfo=timezone.utc)
+            )
+        )
+
+        self.controller.delete_entry(entry)
+        self.controller.delete_entry(next(iter(self.controller)))
+
+        self.assertEqual(
+            self.categories.totals(), 
+            {'Personal': timedelta(hours=2.5)}
+        )
+        self.assertEqual(self.days.totals(date(2022, 1, 3)), {})
+        self.assertEqual(
+            self.days.totals(date(2022, 1, 1)), 
+            {'Personal': timedelta(hours=1)}
+        )